@@ -0,0 +1,66 @@
+#!/usr/bin/python
+"""
+@file __main__.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Benchmark Command Line
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+python -m pyserver.bench [load generator options]  (see loadgen)
+python -m pyserver.bench <benchmark> [options]     runs pyserver.bench.<benchmark>
+python -m pyserver.bench list                      names the benchmarks
+"""
+import importlib
+import os
+import pkgutil
+import sys
+
+from pyserver.bench import loadgen
+
+
+def get_bench_names():
+    return sorted(name for _, name, _ in pkgutil.iter_modules([os.path.dirname(__file__)])
+                  if name not in ('__main__', 'loadgen'))
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if len(argv) > 0 and argv[0] == 'list':
+        for name in get_bench_names():
+            print(name)
+        return None
+    if len(argv) > 0 and argv[0] in get_bench_names():
+        return importlib.import_module('pyserver.bench.' + argv[0]).main(argv[1:])
+    return loadgen.main(argv)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/python
+"""
+@file batch_frames.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Batch Frame Benchmark
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Reports messages/sec over loopback TCP for one frame per message (send) and
+batch frames (send_many) at small payload sizes.
+
+python -m pyserver.bench.batch_frames --sizes 16 64 256 --messages 200000
+"""
+import argparse
+import json
+import threading
+import time
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_tcp_client import AsyncTcpClient
+from pyserver.network.async_tcp_server import AsyncTcpServer
+from pyserver.network.callback_interface import *
+from pyserver.network.preamble import PROTOCOL_VERSION_2
+
+BATCH_SEND_SIZE = 256
+
+
+class CountCallback(ITcpSocketCallback):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.received = 0
+        self.expected = 0
+        self.done_event = threading.Event()
+
+    def expect(self, count):
+        with self.lock:
+            self.received = 0
+            self.expected = count
+            self.done_event.clear()
+
+    def add(self, count):
+        self.received += count
+        if self.received >= self.expected:
+            self.done_event.set()
+
+    def on_channel_received(self, sock, channel, data):
+        self.add(1)
+
+    def on_received_batch(self, sock, channel, data_list):
+        self.add(len(data_list))
+
+
+class CountAcceptor(IAcceptor):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_accept(self, server, addr):
+        return True
+
+    def get_socket_callback(self):
+        return self.callback
+
+
+def run_once(client, callback, size, count, use_batch):
+    payload = b'x' * size
+    callback.expect(count)
+    start_time = time.perf_counter()
+    if use_batch:
+        batch = [payload] * BATCH_SEND_SIZE
+        for _ in range(count // BATCH_SEND_SIZE):
+            client.send_many(batch)
+    else:
+        for _ in range(count):
+            client.send(payload)
+    callback.done_event.wait(60)
+    elapsed = time.perf_counter() - start_time
+    return {'size': size,
+            'mode': 'send_many' if use_batch else 'send',
+            'messages': callback.received,
+            'messages_per_sec': callback.received / elapsed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='send versus send_many messages/sec')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[16, 32, 64, 128, 256])
+    parser.add_argument('--messages', type=int, default=100000)
+    args = parser.parse_args(argv)
+    count = args.messages - args.messages % BATCH_SEND_SIZE
+
+    callback = CountCallback()
+    server = AsyncTcpServer(0, ITcpServerCallback(), CountAcceptor(callback), bind_addr='127.0.0.1',
+                            protocol_version=PROTOCOL_VERSION_2)
+    client = AsyncTcpClient('127.0.0.1', server.port, ITcpSocketCallback(), protocol_version=PROTOCOL_VERSION_2)
+    while client.get_negotiated_version() is None:
+        time.sleep(0.01)
+
+    results = []
+    for size in args.sizes:
+        results.append(run_once(client, callback, size, count, False))
+        results.append(run_once(client, callback, size, count, True))
+    client.close()
+    server.close()
+    AsyncController.instance().stop()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/python
+"""
+@file codec_decode.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Codec Decode Benchmark
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Reports records/sec for decoding arrays of fixed-size records: ad-hoc
+struct.unpack per record (format string parsed on every call), StructCodec
+with namedtuples, with plain tuples and (when NumPy is installed) as a
+structured array, then end to end over loopback TCP with the codec on the
+receiving connection.
+
+python -m pyserver.bench.codec_decode --records 1000 --messages 2000
+"""
+import argparse
+import json
+import struct
+import threading
+import time
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_tcp_client import AsyncTcpClient
+from pyserver.network.async_tcp_server import AsyncTcpServer
+from pyserver.network.callback_interface import *
+from pyserver.network.codec import StructCodec, numpy
+from pyserver.network.preamble import PROTOCOL_VERSION_2
+
+# a market data tick: id, timestamp, price, size, symbol
+FIELDS = [('id', 'I'), ('timestamp', 'Q'), ('price', 'd'), ('size', 'i'), ('symbol', '8s')]
+FORMAT = '<IQdi8s'
+
+
+class CountCallback(ITcpSocketCallback):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = 0
+        self.expected = 0
+        self.done_event = threading.Event()
+
+    def expect(self, count):
+        self.records = 0
+        self.expected = count
+        self.done_event.clear()
+
+    def on_channel_received(self, sock, channel, data):
+        self.records += len(data)
+        if self.records >= self.expected:
+            self.done_event.set()
+
+
+class CountAcceptor(IAcceptor):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_accept(self, server, addr):
+        return True
+
+    def get_socket_callback(self):
+        return self.callback
+
+
+def decode_adhoc(data):
+    record_size = struct.calcsize(FORMAT)
+    return [struct.unpack(FORMAT, data[offset:offset + record_size])
+            for offset in range(0, len(data), record_size)]
+
+
+def run_decode(name, decode, payload, record_count, message_count):
+    start_time = time.perf_counter()
+    for _ in range(message_count):
+        decode(payload)
+    elapsed = time.perf_counter() - start_time
+    return {'mode': name, 'records': record_count * message_count,
+            'records_per_sec': record_count * message_count / elapsed}
+
+
+def run_tcp(name, codec, payload, record_count, message_count):
+    callback = CountCallback()
+    server = AsyncTcpServer(0, ITcpServerCallback(), CountAcceptor(callback), bind_addr='127.0.0.1',
+                            protocol_version=PROTOCOL_VERSION_2, codec=codec)
+    client = AsyncTcpClient('127.0.0.1', server.port, ITcpSocketCallback(), protocol_version=PROTOCOL_VERSION_2)
+    while client.get_negotiated_version() is None:
+        time.sleep(0.01)
+    callback.expect(record_count * message_count)
+    start_time = time.perf_counter()
+    for _ in range(message_count):
+        client.send(payload)
+    callback.done_event.wait(60)
+    elapsed = time.perf_counter() - start_time
+    client.close()
+    server.close()
+    return {'mode': name, 'records': callback.records, 'records_per_sec': callback.records / elapsed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='records/sec of codec decoding')
+    parser.add_argument('--records', type=int, default=1000, help='records per message')
+    parser.add_argument('--messages', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    codec = StructCodec(FIELDS, is_array=True)
+    tuple_codec = StructCodec(FIELDS, is_array=True, as_tuple=True)
+    payload = bytes(codec.encode([(index, index * 1000, 100.0 + index, index % 100, b'PYSERVER')
+                                  for index in range(args.records)]))
+
+    results = [run_decode('adhoc_struct_unpack', decode_adhoc, payload, args.records, args.messages),
+               run_decode('struct_codec', codec.decode, payload, args.records, args.messages),
+               run_decode('struct_codec_tuple', tuple_codec.decode, payload, args.records, args.messages)]
+    if numpy is not None:
+        numpy_codec = StructCodec(FIELDS, is_array=True, use_numpy=True)
+        results.append(run_decode('struct_codec_numpy', numpy_codec.decode, payload, args.records, args.messages))
+    results.append(run_tcp('tcp_struct_codec_tuple', tuple_codec, payload, args.records, args.messages))
+    if numpy is not None:
+        results.append(run_tcp('tcp_struct_codec_numpy', numpy_codec, payload, args.records, args.messages))
+    AsyncController.instance().stop()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
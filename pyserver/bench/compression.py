@@ -0,0 +1,114 @@
+#!/usr/bin/python
+"""
+@file compression.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Compression Benchmark
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Reports compression ratio and CPU cost per message of ZlibCompressor, with
+and without a trained dictionary, for several message sizes.
+
+python -m pyserver.bench.compression --sizes 64 256 1024 4096 65536
+"""
+import argparse
+import json
+import random
+import time
+
+from pyserver.network.compressor import ZlibCompressor
+
+
+def make_record(rand, idx):
+    return {'id': idx,
+            'user': 'user-%06d' % rand.randint(0, 999999),
+            'event': rand.choice(['view', 'click', 'purchase', 'refund']),
+            'price': round(rand.random() * 1000, 2),
+            'currency': rand.choice(['USD', 'EUR', 'KRW']),
+            'timestamp': 1700000000 + idx}
+
+
+# a JSON array of records filled up to size bytes
+def make_message(rand, size, start_idx):
+    records = []
+    idx = start_idx
+    while True:
+        records.append(make_record(rand, idx))
+        idx += 1
+        message = json.dumps(records).encode()
+        if len(message) >= size:
+            return message[:size]
+
+
+def measure(compressor, messages, repeat):
+    compressed_list = [compressor.compress(message) for message in messages]
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            compressor.compress(message)
+    compress_time = (time.perf_counter() - start_time) / (repeat * len(messages))
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for compressed in compressed_list:
+            compressor.decompress(compressed)
+    decompress_time = (time.perf_counter() - start_time) / (repeat * len(messages))
+    raw_size = sum(len(message) for message in messages)
+    compressed_size = sum(len(compressed) for compressed in compressed_list)
+    return {'ratio': float(raw_size) / compressed_size,
+            'compress_us': compress_time * 1e6,
+            'decompress_us': decompress_time * 1e6}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='per-message zlib compression ratio and cost')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[64, 256, 1024, 4096, 65536])
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--level', type=int, default=6)
+    args = parser.parse_args(argv)
+
+    rand = random.Random(7)
+    samples = [make_message(rand, 512, idx * 100) for idx in range(200)]
+    zdict = ZlibCompressor.train_dictionary(samples)
+    plain = ZlibCompressor(level=args.level)
+    trained = ZlibCompressor(level=args.level, zdict=zdict)
+
+    results = []
+    for size in args.sizes:
+        messages = [make_message(rand, size, 100000 + idx * 1000) for idx in range(args.messages)]
+        results.append({'size': size,
+                        'plain': measure(plain, messages, args.repeat),
+                        'dictionary': measure(trained, messages, args.repeat)})
+    print(json.dumps({'dictionary_size': len(zdict), 'results': results}, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/python
+"""
+@file event_log_overhead.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Event Log Overhead Benchmark
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Reports what the EventLog costs when many connections go away at once: waves of
+plain client sockets connect to an AsyncTcpServer and are closed together, the
+time until the server has closed them all is taken with the hook off, with the
+default QueueLogger and with a hook printing synchronously on the loop thread
+(how the modules reported before), both loggers writing to --log-file (os.devnull,
+point it at a terminal or a pipe to see what a blocking stdout costs).
+
+python -m pyserver.bench.event_log_overhead --connections 10000 --wave 1000
+"""
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_tcp_server import AsyncTcpServer
+from pyserver.network.callback_interface import *
+from pyserver.network.event_log import *
+
+CONNECT_GROUP = 4  # connects in flight, below the listen backlog of the server (5)
+
+
+class PrintHook(IEventHook):
+    def __init__(self, stream):
+        self.stream = stream
+
+    def on_event(self, event_type, source, message, exc=None):
+        print(message, file=self.stream)
+        if exc is not None:
+            traceback.print_exception(type(exc), exc, exc.__traceback__, file=self.stream)
+
+
+class CountCallback(ITcpSocketCallback):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.closed = 0
+        self.expected = 0
+        self.done_event = threading.Event()
+
+    def on_disconnect(self, sock):
+        with self.lock:
+            self.closed += 1
+            if self.closed >= self.expected:
+                self.done_event.set()
+
+
+class CountServerCallback(ITcpServerCallback):
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.accepted = 0
+
+    def on_accepted(self, server, sock):
+        with self.cond:
+            self.accepted += 1
+            self.cond.notify_all()
+
+    def wait_accepted(self, count, timeout):
+        with self.cond:
+            return self.cond.wait_for(lambda: self.accepted >= count, timeout)
+
+
+class BenchAcceptor(IAcceptor):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_accept(self, server, addr):
+        return True
+
+    def get_socket_callback(self):
+        return self.callback
+
+
+# seconds for the server to close connection_count connections whose clients left together
+def run_disconnects(connection_count, wave):
+    callback = CountCallback()
+    server_callback = CountServerCallback()
+    server = AsyncTcpServer(0, server_callback, BenchAcceptor(callback), bind_addr='127.0.0.1')
+    elapsed = 0.0
+    done = 0
+    while done < connection_count:
+        count = min(wave, connection_count - done)
+        callback.done_event.clear()
+        callback.expected += count
+        sock_list = []
+        for index in range(count):
+            sock_list.append(socket.create_connection(('127.0.0.1', server.port)))
+            # a full accept queue makes the kernel drop SYNs for a second
+            if index % CONNECT_GROUP == CONNECT_GROUP - 1 and \
+                    not server_callback.wait_accepted(done + index + 1, 60):
+                raise Exception('connections were not accepted')
+        if not server_callback.wait_accepted(done + count, 60):
+            raise Exception('connections were not accepted')
+        start_time = time.perf_counter()
+        for sock in sock_list:
+            sock.close()
+        if not callback.done_event.wait(120):
+            raise Exception('connections were not closed')
+        elapsed += time.perf_counter() - start_time
+        done += count
+    server.close()
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='cost of the event log on a mass disconnect')
+    parser.add_argument('--connections', type=int, default=10000)
+    parser.add_argument('--wave', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--log-file', default=os.devnull)
+    args = parser.parse_args(argv)
+
+    event_log = EventLog.instance()
+    saved_hook = event_log.get_hook()
+    null_stream = open(args.log_file, 'w')
+    logger = QueueLogger(null_stream)
+    hook_map = {'off': None, 'queue': logger, 'print': PrintHook(null_stream)}
+    best = {}
+    # interleaved so drift and warm-up hit every mode alike
+    for index in range(args.repeat):
+        mode_list = sorted(hook_map)
+        if index % 2 == 1:
+            mode_list.reverse()
+        for mode in mode_list:
+            event_log.set_hook(hook_map[mode])
+            elapsed = run_disconnects(args.connections, args.wave)
+            best[mode] = min(best.get(mode, elapsed), elapsed)
+    event_log.set_hook(saved_hook)
+    AsyncController.instance().stop()
+    logger.close()
+    null_stream.close()
+    results = []
+    for mode in ('off', 'queue', 'print'):
+        results.append({'hook': mode,
+                        'connections': args.connections,
+                        'seconds': best[mode],
+                        'usec_per_disconnect': best[mode] / args.connections * 1e6,
+                        'overhead_percent': (best[mode] / best['off'] - 1.0) * 100.0})
+    results[1]['suppressed'] = logger.suppressed_count
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,417 @@
+#!/usr/bin/python
+"""
+@file loadgen.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Load Generator
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Starts an AsyncTcpServer, AsyncUDP or AsyncMulticast endpoint on loopback and
+drives it with --clients clients spread over --processes processes, each
+message carrying the client id, a sequence number and its send time.
+
+- echo: the endpoint sends every message back to its client, clients send at
+  --rate messages/sec each (0: as fast as --window unanswered messages allow)
+- fanout: the endpoint sends every message to all clients (multicast: to the
+  group every client joined), latency is taken by every receiver
+- reqresp: like echo with --depth requests in flight per client (closed loop)
+
+Prints throughput and p50/p99/p999 latency as JSON (--output also writes it
+to a file) so runs against two pyserver versions can be diffed. Latencies are
+bucketed 10% apart, quantiles are bucket upper bounds.
+
+python -m pyserver.bench --transport tcp --pattern echo --clients 64 --processes 4 --size 256 --duration 10
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import time
+from struct import Struct
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_multicast import AsyncMulticast
+from pyserver.network.async_tcp_client import AsyncTcpClient
+from pyserver.network.async_tcp_server import AsyncTcpServer
+from pyserver.network.async_udp import AsyncUDP
+from pyserver.network.callback_interface import *
+from pyserver.network.event_log import EventLog
+from pyserver.network.metrics import Histogram
+
+TRANSPORTS = ('tcp', 'udp', 'multicast')
+PATTERNS = ('echo', 'fanout', 'reqresp')
+MULTICAST_GROUP = '239.255.77.77'
+MAX_DATAGRAM_SIZE = 1400
+SETUP_TIMEOUT = 60.0
+IDLE_SLEEP = 0.0002
+
+# client id, sequence, send time (time.monotonic, one clock for every process of the host)
+_stamp = Struct('= I I d')
+# 1us to about 100s
+LATENCY_BUCKETS = tuple(1e-6 * 1.1 ** index for index in range(194))
+
+
+class EchoServerCallback(ITcpSocketCallback):
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.server = None
+
+    def on_channel_received(self, sock, channel, data):
+        if self.pattern != 'fanout':
+            sock.send(data, channel)
+            return
+        with self.server.lock:
+            peer_list = list(self.server.sock_set)
+        for peer in peer_list:
+            peer.send(data, channel)
+
+
+class ServerAcceptor(IAcceptor):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_accept(self, server, addr):
+        return True
+
+    def get_socket_callback(self):
+        return self.callback
+
+
+class DatagramServerCallback(IUdpCallback):
+    def __init__(self, pattern, group_port=None):
+        self.pattern = pattern
+        self.group_port = group_port
+        # udp fanout goes to every client heard from so far
+        self.peer_set = set([])
+
+    def on_received(self, server, addr, data):
+        if self.pattern != 'fanout':
+            server.send(addr[0], addr[1], data)
+        elif self.group_port is not None:
+            server.send(MULTICAST_GROUP, self.group_port, data)
+        else:
+            self.peer_set.add(addr)
+            for peer in list(self.peer_set):
+                server.send(peer[0], peer[1], data)
+
+
+# counters of one client process, only touched on its loop thread
+class ClientStats(object):
+    def __init__(self):
+        self.is_recording = False
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.max_latency = 0.0
+        self.received = 0
+        self.received_bytes = 0
+
+
+class LoadClient(object):
+    def __init__(self, client_id, stats, padding):
+        self.client_id = client_id
+        self.stats = stats
+        self.padding = padding
+        self.sequence = 0
+        self.acked = 0
+        self.next_send = 0.0
+        self.send_function = None
+
+    def on_message(self, data):
+        now = time.monotonic()
+        client_id, sequence, send_time = _stamp.unpack_from(data)
+        if client_id == self.client_id:
+            self.acked += 1
+        stats = self.stats
+        if stats.is_recording:
+            latency = now - send_time
+            stats.latency.observe(latency)
+            if latency > stats.max_latency:
+                stats.max_latency = latency
+            stats.received += 1
+            stats.received_bytes += len(data)
+
+    def send(self):
+        self.sequence += 1
+        self.send_function(_stamp.pack(self.client_id, self.sequence, time.monotonic()) + self.padding)
+
+
+class TcpLoadCallback(ITcpSocketCallback):
+    def __init__(self, client):
+        self.client = client
+
+    def on_channel_received(self, sock, channel, data):
+        self.client.on_message(data)
+
+
+class DatagramLoadCallback(IUdpCallback):
+    def __init__(self, client):
+        self.client = client
+
+    def on_received(self, server, addr, data):
+        self.client.on_message(data)
+
+
+def get_free_udp_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def start_server(options):
+    if options['transport'] == 'tcp':
+        callback = EchoServerCallback(options['pattern'])
+        server = AsyncTcpServer(0, ITcpServerCallback(), ServerAcceptor(callback), bind_addr='127.0.0.1',
+                                protocol_version=options['protocol_version'])
+        callback.server = server
+        return server, server.port, None
+    if options['transport'] == 'udp':
+        server = AsyncUDP(0, DatagramServerCallback(options['pattern']), '127.0.0.1')
+        return server, server.sock.getsockname()[1], None
+    group_port = options['group_port'] or get_free_udp_port()
+    server = AsyncMulticast(0, DatagramServerCallback(options['pattern'], group_port), enable_loopback=True)
+    return server, server.sock.getsockname()[1], group_port
+
+
+# one client and the modules it owns
+def create_client(options, client, port, group_port):
+    if options['transport'] == 'tcp':
+        connection = AsyncTcpClient('127.0.0.1', port, TcpLoadCallback(client),
+                                    protocol_version=options['protocol_version'])
+        client.send_function = connection.send
+        return [connection]
+    udp = AsyncUDP(0, DatagramLoadCallback(client), '127.0.0.1')
+    client.send_function = lambda data: udp.send('127.0.0.1', port, data)
+    if group_port is None or options['pattern'] != 'fanout':
+        return [udp]
+    receiver = AsyncMulticast(group_port, DatagramLoadCallback(client), enable_loopback=True)
+    receiver.join(MULTICAST_GROUP)
+    return [udp, receiver]
+
+
+def drive(options, client_list, stats):
+    window = options['depth'] if options['pattern'] == 'reqresp' else options['window']
+    interval = 1.0 / options['rate'] if options['rate'] > 0 else 0.0
+    start_time = time.monotonic()
+    measure_time = start_time + options['warmup']
+    end_time = measure_time + options['duration']
+    for client in client_list:
+        client.next_send = start_time
+    sent_before = 0
+    while True:
+        now = time.monotonic()
+        if now >= end_time:
+            break
+        if not stats.is_recording and now >= measure_time:
+            stats.is_recording = True
+            sent_before = sum(client.sequence for client in client_list)
+        is_idle = True
+        for client in client_list:
+            if client.sequence - client.acked >= window:
+                continue
+            if interval > 0:
+                if now < client.next_send:
+                    continue
+                # a client that fell behind does not burst to catch up
+                client.next_send = max(client.next_send + interval, now - interval)
+            client.send()
+            is_idle = False
+        if is_idle:
+            time.sleep(IDLE_SLEEP)
+    stats.is_recording = False
+    return sum(client.sequence for client in client_list) - sent_before
+
+
+def run_clients(options, first_id, client_count, port, group_port, ready_queue, start_event, result_queue):
+    if not options['verbose']:
+        EventLog.instance().set_hook(None)
+    stats = ClientStats()
+    padding = b'x' * (options['size'] - _stamp.size)
+    client_list = []
+    module_list = []
+    for index in range(client_count):
+        client = LoadClient(first_id + index, stats, padding)
+        client_list.append(client)
+        module_list.extend(create_client(options, client, port, group_port))
+    ready_queue.put(first_id)
+    start_event.wait(SETUP_TIMEOUT)
+    sent = drive(options, client_list, stats)
+    # what is still unanswered gets drain seconds before it counts as lost
+    deadline = time.monotonic() + options['drain']
+    while time.monotonic() < deadline and any(client.acked < client.sequence for client in client_list):
+        time.sleep(0.01)
+    lost = sum(client.sequence - client.acked for client in client_list)
+    for module in module_list:
+        module.close()
+    AsyncController.instance().stop()
+    result_queue.put({'sent': sent,
+                      'received': stats.received,
+                      'received_bytes': stats.received_bytes,
+                      'lost': lost,
+                      'latency': stats.latency,
+                      'max_latency': stats.max_latency})
+
+
+def get_version():
+    try:
+        from importlib.metadata import version
+        return version('pyserver3')
+    except Exception:
+        pass
+    try:
+        with open(os.path.join(os.path.dirname(__file__), '..', '..', 'VERSION.txt'), 'r') as version_file:
+            return version_file.read().strip()
+    except Exception:
+        return 'unknown'
+
+
+def to_ms(value, max_value=None):
+    if value is None:
+        return None
+    if max_value is not None:
+        # a bucket bound can lie past the largest sample
+        value = min(value, max_value)
+    return value * 1000.0
+
+
+def merge_results(options, result_list):
+    latency = Histogram(LATENCY_BUCKETS)
+    sent = 0
+    received = 0
+    received_bytes = 0
+    lost = 0
+    max_latency = 0.0
+    for result in result_list:
+        latency.merge(result['latency'])
+        sent += result['sent']
+        received += result['received']
+        received_bytes += result['received_bytes']
+        lost += result['lost']
+        max_latency = max(max_latency, result['max_latency'])
+    duration = options['duration']
+    config = dict(options)
+    del config['verbose']
+    return {'pyserver_version': get_version(),
+            'python': platform.python_version(),
+            'config': config,
+            'sent': sent,
+            'received': received,
+            'lost': lost,
+            'throughput': {'sent_per_sec': sent / duration,
+                           'received_per_sec': received / duration,
+                           'received_mb_per_sec': received_bytes / duration / (1024.0 * 1024.0)},
+            'latency_ms': {'p50': to_ms(latency.get_quantile(0.5), max_latency),
+                           'p99': to_ms(latency.get_quantile(0.99), max_latency),
+                           'p999': to_ms(latency.get_quantile(0.999), max_latency),
+                           'mean': to_ms(latency.sum / latency.count) if latency.count > 0 else None,
+                           'max': to_ms(max_latency)}}
+
+
+def run(options):
+    if options['size'] < _stamp.size:
+        raise ValueError('size must be at least %d' % _stamp.size)
+    if options['transport'] != 'tcp' and options['size'] > MAX_DATAGRAM_SIZE:
+        raise ValueError('size must be at most %d for datagrams' % MAX_DATAGRAM_SIZE)
+    if options['clients'] < 1 or options['processes'] < 1 or options['processes'] > options['clients']:
+        raise ValueError('need at least one client per process')
+    if not options['verbose']:
+        EventLog.instance().set_hook(None)
+    server, port, group_port = start_server(options)
+    # spawned, the controller thread of this process must not be forked
+    ctx = multiprocessing.get_context('spawn')
+    ready_queue = ctx.Queue()
+    start_event = ctx.Event()
+    result_queue = ctx.Queue()
+    process_list = []
+    first_id = 0
+    for index in range(options['processes']):
+        client_count = options['clients'] // options['processes'] + \
+            (1 if index < options['clients'] % options['processes'] else 0)
+        process = ctx.Process(target=run_clients, args=(options, first_id, client_count, port, group_port,
+                                                        ready_queue, start_event, result_queue))
+        process.start()
+        process_list.append(process)
+        first_id += client_count
+    result_list = []
+    try:
+        for _ in process_list:
+            ready_queue.get(timeout=SETUP_TIMEOUT)
+        start_event.set()
+        timeout = options['warmup'] + options['duration'] + options['drain'] + SETUP_TIMEOUT
+        for _ in process_list:
+            result_list.append(result_queue.get(timeout=timeout))
+    finally:
+        for process in process_list:
+            process.join(SETUP_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        server.close()
+        AsyncController.instance().stop()
+    return merge_results(options, result_list)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog='python -m pyserver.bench',
+                                     description='load generator, or the name of a benchmark module to run it')
+    parser.add_argument('--transport', default='tcp', choices=TRANSPORTS)
+    parser.add_argument('--pattern', default='echo', choices=PATTERNS)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--rate', type=float, default=0.0, help='messages/sec per client, 0 is unpaced')
+    parser.add_argument('--window', type=int, default=256, help='unanswered messages per client (echo, fanout)')
+    parser.add_argument('--depth', type=int, default=1, help='requests in flight per client (reqresp)')
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--warmup', type=float, default=1.0)
+    parser.add_argument('--drain', type=float, default=1.0)
+    parser.add_argument('--protocol-version', type=int, default=2, choices=[1, 2])
+    parser.add_argument('--group-port', type=int, default=0, help='multicast group port, 0 picks a free one')
+    parser.add_argument('--output', help='also write the JSON result to this file')
+    parser.add_argument('--verbose', action='store_true', help='keep the event log of the modules on')
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    options = vars(args).copy()
+    output = options.pop('output')
+    result = run(options)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if output is not None:
+        with open(output, 'w') as output_file:
+            output_file.write(text + '\n')
+    return result
+
+
+if __name__ == '__main__':
+    main()
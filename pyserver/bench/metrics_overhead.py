@@ -0,0 +1,158 @@
+#!/usr/bin/python
+"""
+@file metrics_overhead.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Metrics Overhead Benchmark
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Reports what the MetricsRegistry costs: small messages streamed one way over
+loopback TCP and echoed round trips, each run with metrics enabled and
+disabled (the modules created while disabled skip every counter), best of
+--repeat runs per mode.
+
+python -m pyserver.bench.metrics_overhead --messages 200000 --round-trips 20000 --size 64
+"""
+import argparse
+import json
+import threading
+import time
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_tcp_client import AsyncTcpClient
+from pyserver.network.async_tcp_server import AsyncTcpServer
+from pyserver.network.callback_interface import *
+from pyserver.network.metrics import MetricsRegistry
+
+
+class CountCallback(ITcpSocketCallback):
+    def __init__(self):
+        self.received = 0
+        self.expected = 0
+        self.done_event = threading.Event()
+
+    def on_received(self, sock, data):
+        self.received += 1
+        if self.received >= self.expected:
+            self.done_event.set()
+
+
+class EchoCallback(ITcpSocketCallback):
+    def on_received(self, sock, data):
+        sock.send(data)
+
+
+class BenchAcceptor(IAcceptor):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_accept(self, server, addr):
+        return True
+
+    def get_socket_callback(self):
+        return self.callback
+
+
+class PingCallback(ITcpSocketCallback):
+    def __init__(self, payload, count):
+        self.payload = payload
+        self.count = count
+        self.received = 0
+        self.done_event = threading.Event()
+
+    def on_received(self, sock, data):
+        self.received += 1
+        if self.received < self.count:
+            sock.send(self.payload)
+        else:
+            self.done_event.set()
+
+
+def run_stream(size, count):
+    callback = CountCallback()
+    callback.expected = count
+    server = AsyncTcpServer(0, ITcpServerCallback(), BenchAcceptor(callback), bind_addr='127.0.0.1')
+    client = AsyncTcpClient('127.0.0.1', server.port, ITcpSocketCallback())
+    payload = b'x' * size
+    start_time = time.perf_counter()
+    for _ in range(count):
+        client.send(payload)
+    callback.done_event.wait(120)
+    elapsed = time.perf_counter() - start_time
+    client.close()
+    server.close()
+    return count / elapsed
+
+
+def run_ping(size, count):
+    payload = b'x' * size
+    callback = PingCallback(payload, count)
+    server = AsyncTcpServer(0, ITcpServerCallback(), BenchAcceptor(EchoCallback()), bind_addr='127.0.0.1')
+    client = AsyncTcpClient('127.0.0.1', server.port, callback)
+    start_time = time.perf_counter()
+    client.send(payload)
+    callback.done_event.wait(120)
+    elapsed = time.perf_counter() - start_time
+    client.close()
+    server.close()
+    return count / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='cost of the metrics registry on the tcp hot path')
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--round-trips', type=int, default=20000)
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    registry = MetricsRegistry.instance()
+    best = {True: [0.0, 0.0], False: [0.0, 0.0]}
+    # interleaved, first one mode then the other, so drift and warm-up hit both alike
+    for index in range(args.repeat):
+        for enabled in ((False, True) if index % 2 == 0 else (True, False)):
+            registry.set_enabled(enabled)
+            best[enabled][0] = max(best[enabled][0], run_stream(args.size, args.messages))
+            best[enabled][1] = max(best[enabled][1], run_ping(args.size, args.round_trips))
+    registry.set_enabled(True)
+    AsyncController.instance().stop()
+    results = []
+    for index, name in enumerate(('stream_messages_per_sec', 'round_trips_per_sec')):
+        results.append({'workload': name,
+                        'size': args.size,
+                        'disabled': best[False][index],
+                        'enabled': best[True][index],
+                        'overhead_percent': (best[False][index] / best[True][index] - 1.0) * 100.0})
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
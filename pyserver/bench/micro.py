@@ -0,0 +1,327 @@
+#!/usr/bin/python
+"""
+@file micro.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Micro Benchmarks
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Micro-benchmarks of the framing, preamble and controller hot paths, run
+in-process against a fake transport (no sockets): Preamble packing and
+checks, AsyncTcpConnection.data_received fed one byte at a time, whole
+streams at once and chunks cutting through the headers, send plus pump
+framing, AsyncController.add/discard from several threads and
+Singleton.instance(). Each benchmark is calibrated to run at least
+--min-time seconds and the best of --repeat runs is kept.
+
+python -m pyserver.bench micro --save baseline.json
+python -m pyserver.bench micro --baseline baseline.json
+
+With --baseline, any benchmark slower than the saved one by more than its
+threshold (or --threshold) is reported and the command exits with status 1.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_tcp_connection import AsyncTcpConnection
+from pyserver.network.callback_interface import *
+from pyserver.network.event_log import EventLog
+from pyserver.network.preamble import *
+from pyserver.network.server_conf import *
+
+DEFAULT_THRESHOLD = 0.2  # 20% slower than the baseline
+# thread scheduling makes these noisier
+THRESHOLD_MAP = {'controller_add_discard': 0.35}
+CONTENTION_THREADS = 4
+FRAME_SIZE = 64
+STREAM_FRAMES = 256
+
+
+class FakeTransport(object):
+    def __init__(self):
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+
+    def writelines(self, data_list):
+        for data in data_list:
+            self.written += len(data)
+
+    def get_write_buffer_size(self):
+        return 0
+
+    def get_write_buffer_limits(self):
+        return 0, 1 << 40
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        pass
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+    def is_closing(self):
+        return False
+
+    def close(self):
+        pass
+
+
+class CountCallback(ITcpSocketCallback):
+    def __init__(self):
+        self.received = 0
+
+    def on_channel_received(self, sock, channel, data):
+        self.received += 1
+
+
+class DummyModule(object):
+    def close(self):
+        pass
+
+
+def create_connection(version):
+    connection = AsyncTcpConnection(protocol_version=version)
+    connection.set_callback(CountCallback())
+    connection.negotiated_version = version
+    connection.transport = FakeTransport()
+    return connection
+
+
+def make_stream(version, count):
+    payload = b'x' * FRAME_SIZE
+    if version >= PROTOCOL_VERSION_2:
+        header = Preamble.to_preamble_packet(len(payload), 0, MessageType.DATA, 1)
+    else:
+        header = Preamble.to_preamble_packet(len(payload))
+    return (header + payload) * count
+
+
+# each benchmark runs count operations and returns the seconds they took
+
+def bench_preamble_pack(count):
+    to_preamble_packet = Preamble.to_preamble_packet
+    start_time = time.perf_counter()
+    for _ in range(count):
+        to_preamble_packet(FRAME_SIZE, 0, MessageType.DATA, 1)
+    return time.perf_counter() - start_time
+
+
+def bench_preamble_should_receive(count):
+    packet = Preamble.to_preamble_packet(FRAME_SIZE)
+    to_should_receive = Preamble.to_should_receive
+    start_time = time.perf_counter()
+    for _ in range(count):
+        to_should_receive(packet)
+    return time.perf_counter() - start_time
+
+
+def bench_preamble_check(count):
+    # the preamble behind some garbage, as after a resync
+    packet = b'\x01\x02\x03' + Preamble.to_preamble_packet(FRAME_SIZE)
+    check_preamble = Preamble.check_preamble
+    start_time = time.perf_counter()
+    for _ in range(count):
+        check_preamble(packet)
+    return time.perf_counter() - start_time
+
+
+def run_decode(count, chunk_size, version=PROTOCOL_VERSION_2):
+    frame_count = max(1, count)
+    stream = make_stream(version, frame_count)
+    if chunk_size is None:
+        chunk_list = [stream]
+    else:
+        chunk_list = [stream[offset:offset + chunk_size] for offset in range(0, len(stream), chunk_size)]
+    connection = create_connection(version)
+    start_time = time.perf_counter()
+    for chunk in chunk_list:
+        connection.data_received(chunk)
+    elapsed = time.perf_counter() - start_time
+    if connection.callback.received != frame_count:
+        raise Exception('decoded %d of %d frames' % (connection.callback.received, frame_count))
+    return elapsed
+
+
+# counts are frames from here on
+def bench_decode_dribble(count):
+    return run_decode(count, 1)
+
+
+def bench_decode_many_per_chunk(count):
+    elapsed = 0.0
+    for offset in range(0, count, STREAM_FRAMES):
+        elapsed += run_decode(min(STREAM_FRAMES, count - offset), None)
+    return elapsed
+
+
+def bench_decode_split_headers(count):
+    # 37 bytes per read, most headers arrive in two pieces
+    return run_decode(count, 37)
+
+
+def run_send(count, version):
+    connection = create_connection(version)
+    payload = b'x' * FRAME_SIZE
+    start_time = time.perf_counter()
+    for offset in range(0, count, STREAM_FRAMES):
+        for _ in range(min(STREAM_FRAMES, count - offset)):
+            connection.send(payload)
+        connection.pump()
+    elapsed = time.perf_counter() - start_time
+    if connection.transport.written != count * (SIZE_PACKET_LENGTH + FRAME_SIZE):
+        raise Exception('framed %d bytes' % connection.transport.written)
+    return elapsed
+
+
+def bench_send_framing_v1(count):
+    return run_send(count, PROTOCOL_VERSION_1)
+
+
+def bench_send_framing_v2(count):
+    return run_send(count, PROTOCOL_VERSION_2)
+
+
+def bench_controller_add_discard(count):
+    controller = AsyncController.instance()
+    per_thread = max(1, count // CONTENTION_THREADS)
+    start_event = threading.Event()
+
+    def run_thread():
+        module = DummyModule()
+        start_event.wait()
+        for _ in range(per_thread):
+            controller.add(module)
+            controller.discard(module)
+
+    thread_list = [threading.Thread(target=run_thread) for _ in range(CONTENTION_THREADS)]
+    for thread in thread_list:
+        thread.start()
+    start_time = time.perf_counter()
+    start_event.set()
+    for thread in thread_list:
+        thread.join()
+    return time.perf_counter() - start_time
+
+
+def bench_singleton_instance(count):
+    get_instance = AsyncController.instance
+    start_time = time.perf_counter()
+    for _ in range(count):
+        get_instance()
+    return time.perf_counter() - start_time
+
+
+BENCHMARKS = (('preamble_pack', bench_preamble_pack),
+              ('preamble_should_receive', bench_preamble_should_receive),
+              ('preamble_check', bench_preamble_check),
+              ('decode_dribble', bench_decode_dribble),
+              ('decode_many_per_chunk', bench_decode_many_per_chunk),
+              ('decode_split_headers', bench_decode_split_headers),
+              ('send_framing_v1', bench_send_framing_v1),
+              ('send_framing_v2', bench_send_framing_v2),
+              ('controller_add_discard', bench_controller_add_discard),
+              ('singleton_instance', bench_singleton_instance))
+
+
+# operations per second, best of repeat runs of at least min_time seconds
+def measure(function, min_time, repeat):
+    count = 64
+    while True:
+        elapsed = function(count)
+        if elapsed >= min_time or count >= 1 << 30:
+            break
+        # aim a little past min_time so the next try usually ends the calibration
+        count = int(count * min(100.0, max(2.0, 1.2 * min_time / max(elapsed, 1e-9))))
+    best = count / elapsed
+    for _ in range(repeat - 1):
+        best = max(best, count / function(count))
+    return best
+
+
+def compare(results, baseline, threshold=None):
+    regressed_list = []
+    for name, entry in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        limit = threshold if threshold is not None else THRESHOLD_MAP.get(name, DEFAULT_THRESHOLD)
+        entry['baseline'] = base['ops_per_sec']
+        entry['change_percent'] = (entry['ops_per_sec'] / base['ops_per_sec'] - 1.0) * 100.0
+        entry['threshold_percent'] = -limit * 100.0
+        entry['regressed'] = entry['ops_per_sec'] < base['ops_per_sec'] * (1.0 - limit)
+        if entry['regressed']:
+            regressed_list.append(name)
+    return regressed_list
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='micro-benchmarks of the framing and controller hot paths')
+    parser.add_argument('--only', nargs='+', choices=[name for name, _ in BENCHMARKS])
+    parser.add_argument('--min-time', type=float, default=0.2)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', help='results of an earlier --save to compare against')
+    parser.add_argument('--threshold', type=float, help='allowed slowdown for every benchmark, 0.2 is 20%%')
+    parser.add_argument('--save', help='write the results to this file')
+    args = parser.parse_args(argv)
+
+    # the controller benchmark would time the event log otherwise
+    event_log = EventLog.instance()
+    saved_hook = event_log.get_hook()
+    event_log.set_hook(None)
+    results = {}
+    try:
+        for name, function in BENCHMARKS:
+            if args.only is not None and name not in args.only:
+                continue
+            results[name] = {'ops_per_sec': measure(function, args.min_time, args.repeat)}
+    finally:
+        event_log.set_hook(saved_hook)
+        AsyncController.instance().stop()
+    if args.save is not None:
+        with open(args.save, 'w') as save_file:
+            json.dump(results, save_file, indent=2)
+    regressed_list = []
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as baseline_file:
+            regressed_list = compare(results, json.load(baseline_file), args.threshold)
+    print(json.dumps(results, indent=2))
+    if len(regressed_list) > 0:
+        print('regressed: %s' % ', '.join(regressed_list), file=sys.stderr)
+        sys.exit(1)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/python
+"""
+@file priority_latency.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Priority Latency Benchmark
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Reports round-trip latency (p50/p99) of small echoed messages over loopback TCP
+while the same connection streams bulk messages, once with every frame in
+Priority.NORMAL and no chunking (fifo) and once with the small messages in
+Priority.HIGH and the bulk ones chunked in Priority.LOW (priority).
+
+python -m pyserver.bench.priority_latency --duration 5 --bulk-size 4194304
+"""
+import argparse
+import json
+import struct
+import threading
+import time
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_tcp_client import AsyncTcpClient
+from pyserver.network.async_tcp_server import AsyncTcpServer
+from pyserver.network.callback_interface import *
+from pyserver.network.preamble import PROTOCOL_VERSION_2
+from pyserver.network.server_conf import Priority
+
+PING_CHANNEL = 0
+BULK_CHANNEL = 1
+NO_CHUNK_SIZE = 1 << 31
+
+_timestamp = struct.Struct('= d')
+
+
+class EchoCallback(ITcpSocketCallback):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bulk_bytes = 0
+        self.ping_priority = Priority.NORMAL
+
+    def on_channel_received(self, sock, channel, data):
+        if channel == PING_CHANNEL:
+            sock.send(data, PING_CHANNEL, self.ping_priority)
+        else:
+            with self.lock:
+                self.bulk_bytes += len(data)
+
+
+class EchoAcceptor(IAcceptor):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_accept(self, server, addr):
+        return True
+
+    def get_socket_callback(self):
+        return self.callback
+
+
+class PingCallback(ITcpSocketCallback):
+    def __init__(self):
+        self.latency_list = []
+
+    def on_channel_received(self, sock, channel, data):
+        if channel == PING_CHANNEL:
+            self.latency_list.append(time.perf_counter() - _timestamp.unpack_from(data)[0])
+
+
+def get_percentile(sorted_list, percent):
+    if len(sorted_list) == 0:
+        return 0.0
+    return sorted_list[min(len(sorted_list) - 1, int(len(sorted_list) * percent / 100.0))]
+
+
+def run_once(mode, args):
+    use_priority = mode == 'priority'
+    chunk_size = args.chunk_size if use_priority else NO_CHUNK_SIZE
+    ping_priority = Priority.HIGH if use_priority else Priority.NORMAL
+    bulk_priority = Priority.LOW if use_priority else Priority.NORMAL
+
+    echo_callback = EchoCallback()
+    echo_callback.ping_priority = ping_priority
+    server = AsyncTcpServer(0, ITcpServerCallback(), EchoAcceptor(echo_callback), bind_addr='127.0.0.1',
+                            protocol_version=PROTOCOL_VERSION_2, chunk_size=chunk_size)
+    ping_callback = PingCallback()
+    client = AsyncTcpClient('127.0.0.1', server.port, ping_callback, protocol_version=PROTOCOL_VERSION_2,
+                            chunk_size=chunk_size)
+    while client.get_negotiated_version() is None:
+        time.sleep(0.01)
+
+    bulk = b'x' * args.bulk_size
+    bulk_sent = 0
+    start_time = time.perf_counter()
+    end_time = start_time + args.duration
+    next_ping = start_time
+    while time.perf_counter() < end_time:
+        # keep about `window` bulk messages in flight
+        with echo_callback.lock:
+            in_flight = bulk_sent - echo_callback.bulk_bytes
+        if in_flight < args.window * args.bulk_size:
+            client.send(bulk, BULK_CHANNEL, bulk_priority)
+            bulk_sent += len(bulk)
+        now = time.perf_counter()
+        if now >= next_ping:
+            client.send(_timestamp.pack(now) + b'p' * (args.ping_size - _timestamp.size), PING_CHANNEL,
+                        ping_priority)
+            next_ping = now + args.ping_interval
+        time.sleep(0.0005)
+    elapsed = time.perf_counter() - start_time
+    time.sleep(0.5)
+    client.close()
+    server.close()
+
+    latency_list = sorted(ping_callback.latency_list)
+    return {'mode': mode,
+            'pings': len(latency_list),
+            'p50_ms': get_percentile(latency_list, 50) * 1000.0,
+            'p99_ms': get_percentile(latency_list, 99) * 1000.0,
+            'max_ms': (latency_list[-1] if len(latency_list) > 0 else 0.0) * 1000.0,
+            'bulk_mb_per_sec': echo_callback.bulk_bytes / elapsed / (1024.0 * 1024.0)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='p99 latency of small messages under bulk load')
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--bulk-size', type=int, default=4 * 1024 * 1024)
+    parser.add_argument('--window', type=int, default=4)
+    parser.add_argument('--ping-size', type=int, default=64)
+    parser.add_argument('--ping-interval', type=float, default=0.005)
+    parser.add_argument('--chunk-size', type=int, default=16 * 1024)
+    parser.add_argument('--modes', nargs='+', default=['fifo', 'priority'], choices=['fifo', 'priority'])
+    args = parser.parse_args(argv)
+
+    results = []
+    for mode in args.modes:
+        results.append(run_once(mode, args))
+    AsyncController.instance().stop()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/python
+"""
+@file relay.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Relay Benchmark
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Reports throughput and CPU seconds per GB relayed over loopback TCP through
+a decode/re-encode hop (AsyncTcpServer forwarding on_received to an
+AsyncTcpClient) and through AsyncTcpRelay. Sender, hop and sink share the
+process, so CPU per GB includes the same sender and sink cost in both modes.
+
+python -m pyserver.bench.relay --sizes 1024 65536 --megabytes 256
+"""
+import argparse
+import json
+import threading
+import time
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_tcp_client import AsyncTcpClient
+from pyserver.network.async_tcp_relay import AsyncTcpRelay
+from pyserver.network.async_tcp_server import AsyncTcpServer
+from pyserver.network.callback_interface import *
+
+
+class SinkCallback(ITcpSocketCallback):
+    def __init__(self):
+        self.received = 0
+        self.expected = 0
+        self.done_event = threading.Event()
+
+    def expect(self, size):
+        self.received = 0
+        self.expected = size
+        self.done_event.clear()
+
+    def on_received(self, sock, data):
+        self.received += len(data)
+        if self.received >= self.expected:
+            self.done_event.set()
+
+
+class ForwardCallback(ITcpSocketCallback):
+    def __init__(self, upstream):
+        self.upstream = upstream
+
+    def on_received(self, sock, data):
+        self.upstream.send(data)
+
+
+class SimpleAcceptor(IAcceptor):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_accept(self, server, addr):
+        return True
+
+    def get_socket_callback(self):
+        return self.callback
+
+
+def run_once(mode, sink, sink_callback, size, total_size):
+    if mode == 'reencode':
+        upstream = AsyncTcpClient('127.0.0.1', sink.port, ITcpSocketCallback())
+        hop = AsyncTcpServer(0, ITcpServerCallback(), SimpleAcceptor(ForwardCallback(upstream)),
+                             bind_addr='127.0.0.1')
+    else:
+        upstream = None
+        hop = AsyncTcpRelay(0, ('127.0.0.1', sink.port), ITcpServerCallback(), SimpleAcceptor(None),
+                            bind_addr='127.0.0.1')
+    client = AsyncTcpClient('127.0.0.1', hop.port, ITcpSocketCallback())
+    payload = b'x' * size
+    count = total_size // size
+    sink_callback.expect(count * size)
+    start_time = time.perf_counter()
+    start_cpu = time.process_time()
+    for _ in range(count):
+        client.send(payload)
+    sink_callback.done_event.wait(120)
+    elapsed = time.perf_counter() - start_time
+    cpu = time.process_time() - start_cpu
+    client.close()
+    if upstream is not None:
+        upstream.close()
+    hop.close()
+    gigabytes = sink_callback.received / float(1 << 30)
+    return {'mode': mode,
+            'size': size,
+            'megabytes': sink_callback.received / float(1 << 20),
+            'mb_per_sec': sink_callback.received / elapsed / float(1 << 20),
+            'cpu_sec_per_gb': cpu / gigabytes if gigabytes > 0 else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='decode/re-encode hop versus AsyncTcpRelay')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1024, 65536])
+    parser.add_argument('--megabytes', type=int, default=256)
+    args = parser.parse_args(argv)
+
+    sink_callback = SinkCallback()
+    sink = AsyncTcpServer(0, ITcpServerCallback(), SimpleAcceptor(sink_callback), bind_addr='127.0.0.1')
+    results = []
+    for size in args.sizes:
+        for mode in ('reencode', 'relay'):
+            results.append(run_once(mode, sink, sink_callback, size, args.megabytes << 20))
+    sink.close()
+    AsyncController.instance().stop()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
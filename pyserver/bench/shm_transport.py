@@ -0,0 +1,183 @@
+#!/usr/bin/python
+"""
+@file shm_transport.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Shared Memory Transport Benchmark
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Reports messages/sec (one way, counted by the receiver) and ping-pong
+round-trip latency of small messages over loopback TCP, a unix domain socket
+and the shared-memory ring transport.
+
+python -m pyserver.bench.shm_transport --messages 200000 --round-trips 20000 --size 64
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_shm_client import AsyncShmClient
+from pyserver.network.async_shm_server import AsyncShmServer
+from pyserver.network.async_tcp_client import AsyncTcpClient
+from pyserver.network.async_tcp_server import AsyncTcpServer
+from pyserver.network.async_unix_client import AsyncUnixClient
+from pyserver.network.async_unix_server import AsyncUnixServer
+from pyserver.network.callback_interface import *
+
+
+class ServerCallback(ITcpSocketCallback):
+    def __init__(self):
+        self.received = 0
+        self.expected = 0
+        self.is_echo = False
+        self.done_event = threading.Event()
+
+    def expect(self, count, is_echo):
+        self.received = 0
+        self.expected = count
+        self.is_echo = is_echo
+        self.done_event.clear()
+
+    def on_channel_received(self, sock, channel, data):
+        if self.is_echo:
+            sock.send(data)
+            return
+        self.received += 1
+        if self.received >= self.expected:
+            self.done_event.set()
+
+
+class ServerAcceptor(IAcceptor):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_accept(self, server, addr):
+        return True
+
+    def get_socket_callback(self):
+        return self.callback
+
+
+class PingCallback(ITcpSocketCallback):
+    def __init__(self):
+        self.payload = b''
+        self.count = 0
+        self.latency_list = []
+        self.sent_time = 0.0
+        self.done_event = threading.Event()
+
+    def start(self, sock, payload, count):
+        self.payload = payload
+        self.count = count
+        self.latency_list = []
+        self.done_event.clear()
+        self.ping(sock)
+
+    def ping(self, sock):
+        self.sent_time = time.perf_counter()
+        sock.send(self.payload)
+
+    def on_channel_received(self, sock, channel, data):
+        self.latency_list.append(time.perf_counter() - self.sent_time)
+        if len(self.latency_list) < self.count:
+            self.ping(sock)
+        else:
+            self.done_event.set()
+
+
+def get_percentile(sorted_list, percent):
+    if len(sorted_list) == 0:
+        return 0.0
+    return sorted_list[min(len(sorted_list) - 1, int(len(sorted_list) * percent / 100.0))]
+
+
+def create_pair(transport, server_callback, client_callback, path):
+    if transport == 'tcp':
+        server = AsyncTcpServer(0, ITcpServerCallback(), ServerAcceptor(server_callback), bind_addr='127.0.0.1')
+        client = AsyncTcpClient('127.0.0.1', server.port, client_callback)
+    elif transport == 'uds':
+        server = AsyncUnixServer(path, ITcpServerCallback(), ServerAcceptor(server_callback))
+        client = AsyncUnixClient(path, client_callback)
+    else:
+        server = AsyncShmServer(path, ITcpServerCallback(), ServerAcceptor(server_callback))
+        client = AsyncShmClient(path, client_callback)
+    return server, client
+
+
+def run_once(transport, args):
+    path = os.path.join(tempfile.gettempdir(), 'pyserver_shm_transport_%d.sock' % os.getpid())
+    server_callback = ServerCallback()
+    client_callback = PingCallback()
+    server, client = create_pair(transport, server_callback, client_callback, path)
+    payload = b'x' * args.size
+
+    server_callback.expect(args.messages, False)
+    start_time = time.perf_counter()
+    for _ in range(args.messages):
+        client.send(payload)
+    server_callback.done_event.wait(120)
+    messages_per_sec = server_callback.received / (time.perf_counter() - start_time)
+
+    server_callback.expect(0, True)
+    client_callback.start(client, payload, args.round_trips)
+    client_callback.done_event.wait(120)
+    client.close()
+    server.close()
+    latency_list = sorted(client_callback.latency_list)
+    return {'transport': transport,
+            'size': args.size,
+            'messages_per_sec': messages_per_sec,
+            'round_trips': len(latency_list),
+            'p50_us': get_percentile(latency_list, 50) * 1000000.0,
+            'p99_us': get_percentile(latency_list, 99) * 1000000.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TCP loopback versus unix socket versus shared-memory rings')
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--round-trips', type=int, default=20000)
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--transports', nargs='+', default=['tcp', 'uds', 'shm'], choices=['tcp', 'uds', 'shm'])
+    args = parser.parse_args(argv)
+
+    results = []
+    for transport in args.transports:
+        results.append(run_once(transport, args))
+    AsyncController.instance().stop()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+"""
+@file udp_buffer.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief UDP Buffer Benchmark
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Sends bursts at an AsyncUDP receiver and reports the loss and the kernel
+drop counter for several receive buffer sizes.
+
+python -m pyserver.bench.udp_buffer --buffers 65536 262144 1048576 --burst 20000
+"""
+import argparse
+import json
+import multiprocessing
+import socket
+import threading
+import time
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_udp import AsyncUDP
+from pyserver.network.callback_interface import IUdpCallback
+
+
+class CountCallback(IUdpCallback):
+    def __init__(self):
+        self.received = 0
+        self.last_received_time = time.monotonic()
+
+    def on_received(self, server, addr, data):
+        self.received += 1
+        self.last_received_time = time.monotonic()
+
+
+def burst(port, size, count):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    payload = b'x' * size
+    for _ in range(count):
+        try:
+            sock.sendto(payload, ('127.0.0.1', port))
+        except OSError:
+            pass
+    sock.close()
+
+
+def run_once(buffer_size, size, count, auto_tune):
+    callback = CountCallback()
+    server = AsyncUDP(0, callback, bindaddress='127.0.0.1', recv_buffer_size=buffer_size, count_drops=True,
+                      auto_tune_buffer=auto_tune)
+    port = server.sock.getsockname()[1]
+    start_stats = server.get_socket_stats()
+    sender = multiprocessing.get_context('fork').Process(target=burst, args=(port, size, count))
+    sender.start()
+    sender.join()
+    # wait for the receiver to drain its queue
+    while time.monotonic() - callback.last_received_time < 0.5:
+        time.sleep(0.1)
+    stats = server.get_socket_stats()
+    server.close()
+    return {'recv_buffer_size': start_stats['recv_buffer_size'],
+            'final_recv_buffer_size': stats['recv_buffer_size'],
+            'sent': count,
+            'received': callback.received,
+            'loss': 1.0 - float(callback.received) / count,
+            'kernel_drops': stats['drops']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='UDP burst loss versus receive buffer size')
+    parser.add_argument('--buffers', type=int, nargs='+', default=[65536, 262144, 1048576, 4194304])
+    parser.add_argument('--size', type=int, default=512)
+    parser.add_argument('--burst', type=int, default=20000)
+    parser.add_argument('--auto-tune', action='store_true', help='let the receiver grow its buffer on drops')
+    args = parser.parse_args(argv)
+
+    results = [run_once(buffer_size, args.size, args.burst, args.auto_tune) for buffer_size in args.buffers]
+    AsyncController.instance().stop()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/python
+"""
+@file udp_reuseport.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief AsyncUDPGroup Benchmark
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Measures datagrams/sec received by AsyncUDPGroup on loopback for several
+worker counts.
+
+python -m pyserver.bench.udp_reuseport --workers 1 2 4 --duration 3
+"""
+import argparse
+import json
+import multiprocessing
+import socket
+import time
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_udp_group import AsyncUDPGroup
+from pyserver.network.callback_interface import IUdpCallback
+
+
+def blast(port, size, duration, ready_event):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    # a new source port per socket so the kernel hash spreads the senders across the workers
+    sock.connect(('127.0.0.1', port))
+    payload = b'x' * size
+    ready_event.wait()
+    end_time = time.monotonic() + duration
+    while time.monotonic() < end_time:
+        for _ in range(64):
+            try:
+                sock.send(payload)
+            except OSError:
+                pass
+    sock.close()
+
+
+def run_once(worker_count, sender_count, size, duration, use_process):
+    group = AsyncUDPGroup(0, IUdpCallback(), worker_count=worker_count, bindaddress='127.0.0.1',
+                          use_process=use_process)
+    ctx = multiprocessing.get_context('fork')
+    ready_event = ctx.Event()
+    senders = [ctx.Process(target=blast, args=(group.port, size, duration, ready_event))
+               for _ in range(sender_count)]
+    for sender in senders:
+        sender.start()
+    ready_event.set()
+    start_time = time.monotonic()
+    for sender in senders:
+        sender.join()
+    time.sleep(0.2)
+    elapsed = time.monotonic() - start_time
+    stats = group.get_stats()
+    group.close()
+    received = sum(stats_item['received'] for stats_item in stats)
+    return {'workers': worker_count,
+            'senders': sender_count,
+            'size': size,
+            'datagrams_per_sec': received / elapsed,
+            'per_worker': [stats_item['received'] for stats_item in stats]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='AsyncUDPGroup SO_REUSEPORT scaling benchmark')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--senders', type=int, default=4)
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--process', action='store_true', help='run the workers as processes')
+    args = parser.parse_args(argv)
+
+    results = [run_once(worker_count, args.senders, args.size, args.duration, args.process)
+               for worker_count in args.workers]
+    AsyncController.instance().stop()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
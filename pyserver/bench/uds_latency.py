@@ -0,0 +1,134 @@
+#!/usr/bin/python
+"""
+@file uds_latency.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Unix Socket Latency Benchmark
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Reports round-trip latency (p50/p99) of small messages echoed over loopback
+TCP and over a unix domain socket, one message in flight at a time, the next
+one is sent from the callback of the previous reply.
+
+python -m pyserver.bench.uds_latency --round-trips 20000 --size 64
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_tcp_client import AsyncTcpClient
+from pyserver.network.async_tcp_server import AsyncTcpServer
+from pyserver.network.async_unix_client import AsyncUnixClient
+from pyserver.network.async_unix_server import AsyncUnixServer
+from pyserver.network.callback_interface import *
+
+
+class EchoCallback(ITcpSocketCallback):
+    def on_received(self, sock, data):
+        sock.send(data)
+
+
+class EchoAcceptor(IAcceptor):
+    def on_accept(self, server, addr):
+        return True
+
+    def get_socket_callback(self):
+        return EchoCallback()
+
+
+class PingCallback(ITcpSocketCallback):
+    def __init__(self, payload, count):
+        self.payload = payload
+        self.count = count
+        self.latency_list = []
+        self.sent_time = 0.0
+        self.done_event = threading.Event()
+
+    def ping(self, sock):
+        self.sent_time = time.perf_counter()
+        sock.send(self.payload)
+
+    def on_received(self, sock, data):
+        self.latency_list.append(time.perf_counter() - self.sent_time)
+        if len(self.latency_list) < self.count:
+            self.ping(sock)
+        else:
+            self.done_event.set()
+
+
+def get_percentile(sorted_list, percent):
+    if len(sorted_list) == 0:
+        return 0.0
+    return sorted_list[min(len(sorted_list) - 1, int(len(sorted_list) * percent / 100.0))]
+
+
+def run_once(transport, size, count):
+    callback = PingCallback(b'x' * size, count)
+    if transport == 'tcp':
+        server = AsyncTcpServer(0, ITcpServerCallback(), EchoAcceptor(), bind_addr='127.0.0.1')
+        client = AsyncTcpClient('127.0.0.1', server.port, callback)
+    else:
+        path = os.path.join(tempfile.gettempdir(), 'pyserver_uds_latency_%d.sock' % os.getpid())
+        server = AsyncUnixServer(path, ITcpServerCallback(), EchoAcceptor())
+        client = AsyncUnixClient(path, callback)
+    start_time = time.perf_counter()
+    callback.ping(client)
+    callback.done_event.wait(120)
+    elapsed = time.perf_counter() - start_time
+    client.close()
+    server.close()
+    latency_list = sorted(callback.latency_list)
+    return {'transport': transport,
+            'size': size,
+            'round_trips': len(latency_list),
+            'round_trips_per_sec': len(latency_list) / elapsed,
+            'p50_us': get_percentile(latency_list, 50) * 1000000.0,
+            'p99_us': get_percentile(latency_list, 99) * 1000000.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='loopback TCP versus unix socket round-trip latency')
+    parser.add_argument('--round-trips', type=int, default=20000)
+    parser.add_argument('--size', type=int, default=64)
+    args = parser.parse_args(argv)
+
+    results = [run_once('tcp', args.size, args.round_trips),
+               run_once('uds', args.size, args.round_trips)]
+    AsyncController.instance().stop()
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
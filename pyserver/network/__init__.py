@@ -1,8 +1,32 @@
 from .server_conf import *
+from .event_log import *
 from .async_controller import *
+from .metrics import *
+from .loop_monitor import *
+from .tracing import *
 from .preamble import *
 from .callback_interface import *
 from .async_udp import *
+from .async_udp_group import *
+from .socket_buffer import *
+from .paced_sender import *
 from .async_multicast import *
+from .batch_packet import *
+from .multicast_batcher import *
+from .compressor import *
+from .codec import *
+from .frame_decoder import *
+from .write_scheduler import *
+from .file_transfer import *
+from .message_spool import *
+from .listener_handoff import *
+from .async_tcp_connection import *
 from .async_tcp_server import *
 from .async_tcp_client import *
+from .async_tcp_relay import *
+from .async_unix_server import *
+from .async_unix_client import *
+from .shm_ring import *
+from .async_shm_connection import *
+from .async_shm_server import *
+from .async_shm_client import *
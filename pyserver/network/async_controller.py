@@ -39,10 +39,28 @@ import asyncio
 import threading
 
 from pyserver.util.singleton import Singleton
-# noinspection PyDeprecation
-import traceback
+from .event_log import *
 import copy
 
+DEFAULT_SHUTDOWN_DEADLINE = 5.0
+SHUTDOWN_POLL_INTERVAL = 0.01
+
+'''
+Interfaces
+functions
+- def add(module)
+- def discard(module)
+- def stop() # close every module right away and stop the loop
+- def shutdown(deadline=DEFAULT_SHUTDOWN_DEADLINE) # flush, then stop, returns the counts
+- def set_monitor(monitor) # called by LoopMonitor
+infos
+- shutdown stops the servers accepting, lets every tcp connection hand its queued messages
+  and transport buffer to the socket and closes them together, what is still queued at the
+  deadline is dropped, returns {'flushed': messages, 'dropped': messages, 'aborted': messages,
+  'dropped_bytes': bytes}, a message only counts as flushed once its connection's transport
+  buffer emptied, those handed to the transport of a connection aborted at the deadline count
+  as aborted (dropped_bytes of them were never written)
+'''
 
 @Singleton
 class AsyncController(threading.Thread):
@@ -53,8 +71,13 @@ class AsyncController(threading.Thread):
         self.resume_event = threading.Event()
         self.resume_event.set()
         self.lock = threading.RLock()
+        # held by whichever thread is running the loop, pause() takes it away from the controller thread
+        self.loop_lock = threading.Lock()
+        self.is_paused = False
         self.module_set = set([])
         self.timeout = 0.1
+        # LoopMonitor, times the callbacks of every module added
+        self.monitor = None
 
         self.loop = asyncio.get_event_loop()
 
@@ -65,45 +88,114 @@ class AsyncController(threading.Thread):
         while not self.should_stop_event.is_set():
             self.has_module_event.wait()
             self.resume_event.wait()
-            try:
-                self.loop.run_forever()
-            except Exception as e:
-                print(e)
-                traceback.print_exc()
-                self.loop.stop()
+            with self.loop_lock:
+                if not self.resume_event.is_set() or self.should_stop_event.is_set():
+                    continue
+                try:
+                    self.loop.run_forever()
+                except Exception as e:
+                    EventLog.instance().error(self, e)
+                    self.loop.stop()
 
         self.loop.close()
         self.has_module_event.wait()
         self.has_module_event.clear()
-        print('async Thread exiting...')
-    
+        EventLog.instance().emit(EventType.INFO, self, 'async Thread exiting...')
+
+    def stop_paused_loop(self):
+        # may also run on the pausing thread if the loop was idle, only the controller thread stops here
+        if not self.resume_event.is_set() and threading.current_thread() is self:
+            self.loop.stop()
+
+    # Stops the loop on the controller thread and waits until it is released, so the calling
+    # thread can run the loop itself (run_until_complete) until resume() is called
     def pause(self):
         self.resume_event.clear()
-        self.loop.stop()
+        if threading.current_thread() is self:
+            self.loop.stop()
+            return
+        self.loop.call_soon_threadsafe(self.stop_paused_loop)
+        self.loop_lock.acquire()
+        self.is_paused = True
 
     def resume(self):
+        if self.is_paused:
+            self.is_paused = False
+            self.loop_lock.release()
         self.resume_event.set()
 
     def stop(self):
+        # set first so run() cannot restart the loop between the stop and the flag
+        self.should_stop_event.set()
         with self.lock:
             delete_set = copy.copy(self.module_set)
             for item in delete_set:
                 try:
                     item.close()
                 except Exception as e:
-                    print(e)
-                    traceback.print_exc()
+                    EventLog.instance().error(self, e)
             self.module_set = set([])
-            self.loop.stop()
-        self.should_stop_event.set()
+            # wake the selector up, a plain stop() from another thread is only seen on the next event
+            self.loop.call_soon_threadsafe(self.loop.stop)
         self.resume_event.set()
         self.has_module_event.set()
 
+    def shutdown(self, deadline=DEFAULT_SHUTDOWN_DEADLINE):
+        if threading.current_thread() is self:
+            raise Exception('shutdown waits for the loop, call it from another thread')
+        result = {'flushed': 0, 'dropped': 0, 'aborted': 0, 'dropped_bytes': 0}
+        with self.lock:
+            module_list = list(self.module_set)
+        if len(module_list) > 0 and not self.should_stop_event.is_set():
+            future = asyncio.run_coroutine_threadsafe(self.drain_modules(module_list, deadline, result), self.loop)
+            try:
+                future.result(deadline + 1.0)
+            except Exception as e:
+                EventLog.instance().error(self, e)
+                future.cancel()
+        self.stop()
+        return result
+
+    async def drain_modules(self, module_list, deadline, result):
+        end = self.loop.time() + deadline
+        connection_list = [module for module in module_list if hasattr(module, 'flush_close')]
+        start_map = {}
+        for module in module_list:
+            if hasattr(module, 'drain'):
+                module.drain(deadline)
+        for connection in connection_list:
+            start_map[connection] = (connection.sent_count, connection.dropped_count)
+        for connection in connection_list:
+            connection.flush_close()
+        try:
+            while True:
+                if all(connection.is_flushed() for connection in connection_list) or self.loop.time() >= end:
+                    break
+                await asyncio.sleep(SHUTDOWN_POLL_INTERVAL)
+        finally:
+            for connection in connection_list:
+                sent_count, dropped_count = start_map[connection]
+                if connection.is_flushed():
+                    result['flushed'] += connection.sent_count - sent_count
+                else:
+                    result['dropped_bytes'] += connection.abort()
+                    result['aborted'] += connection.sent_count - sent_count
+                result['dropped'] += connection.dropped_count - dropped_count
+
     def add(self, module):
         with self.lock:
             self.module_set.add(module)
+            if self.monitor is not None:
+                self.monitor.watch(module)
         self.has_module_event.set()
 
+    def set_monitor(self, monitor):
+        with self.lock:
+            self.monitor = monitor
+            if monitor is not None:
+                for module in self.module_set:
+                    monitor.watch(module)
+
     def clear(self):
         with self.lock:
             delete_set = copy.copy(self.module_set)
@@ -111,14 +203,13 @@ class AsyncController(threading.Thread):
                 try:
                     item.close()
                 except Exception as e:
-                    print(e)
-                    traceback.print_exc()
+                    EventLog.instance().error(self, e)
             self.module_set = set([])
         if not self.should_stop_event.is_set():
             self.has_module_event.clear()
 
     def discard(self, module):
-        print('asyncController discard called')
+        EventLog.instance().emit(EventType.INFO, module, 'asyncController discard called')
         with self.lock:
             self.module_set.discard(module)
             if len(self.module_set) == 0 and not self.should_stop_event.is_set():
@@ -38,11 +38,17 @@ AsyncMulticast Class.
 
 import asyncio
 import socket
-import traceback
+import time
 import threading
 
 from .callback_interface import *
 from .async_controller import AsyncController
+from .batch_packet import *
+from .socket_buffer import *
+from .paced_sender import *
+from .server_conf import *
+from .metrics import MetricsRegistry
+from .event_log import *
 # noinspection PyDeprecation
 import copy
 
@@ -51,17 +57,31 @@ IP_PMTUDISC_DONT = 0  # Never send DF frames.
 IP_PMTUDISC_WANT = 1  # Use per route hints.
 IP_PMTUDISC_DO = 2  # Always DF.
 IP_PMTUDISC_PROBE = 3  # Ignore dst pmtu.
+IP_PKTINFO = getattr(socket, 'IP_PKTINFO', 8)  # Linux value, not exported by every python build
+
+MAX_DATAGRAM_SIZE = 65535
+MAX_READ_PER_EVENT = 64
 
 '''
 Interfaces
 variables
 - callback_obj
 functions
-- def send(multicast_addr,port,data)
+- def send(multicast_addr,port,data,priority=Priority.NORMAL)
 - def close() # close the socket
-- def join(multicast_addr) # start receiving datagram from given multicast group
+- def join(multicast_addr, callback_obj=None) # start receiving datagram from given multicast group
 - def leave(multicast_addr) # stop receiving datagram from given multicast group
 - def getgrouplist() # get group list
+- def enable_pacing(rate, burst, queue_size, drop_policy) # send through a token-bucket PacedSender
+- def disable_pacing()
+- unbatch=True unpacks datagrams packed by MulticastBatcher into on_received_batch
+- group_demux=True recovers the destination group of each datagram (IP_PKTINFO)
+  and dispatches it to on_group_received of the callback registered at join(),
+  datagrams for groups not joined are dropped before any callback
+- recv_buffer_size/send_buffer_size set SO_RCVBUF/SO_SNDBUF
+- count_drops=True reads the kernel drop counter (SO_RXQ_OVFL) with every datagram
+- auto_tune_buffer=True doubles SO_RCVBUF up to max_buffer_size whenever drops are seen
+- get_socket_stats() returns drops, queue depth and buffer sizes
 infos
 - multicast address range: 224.0.0.0 - 239.255.255.255
 - linux : route add -net 224.0.0.0 netmask 240.0.0.0 dev eth0 
@@ -77,9 +97,20 @@ class AsyncMulticast(asyncio.Protocol):
     #     64 - restricted to the same region
     #    128 - restricted to the same continent
     #    255 - unrestricted in scope
-    def __init__(self, port, callback_obj, ttl=1, enable_loopback=False, bind_addr=''):
+    def __init__(self, port, callback_obj, ttl=1, enable_loopback=False, bind_addr='', unbatch=False,
+                 group_demux=False, recv_buffer_size=None, send_buffer_size=None, count_drops=False,
+                 auto_tune_buffer=False, max_buffer_size=DEFAULT_MAX_BUFFER_SIZE):
         # self.lock = threading.RLock()
         self.MAX_MTU = 1500
+        self.is_closing = False
+        self.paced_sender = None
+        self.metrics = None
+        self.unbatch = unbatch
+        self.group_demux = group_demux
+        self.count_drops = count_drops or auto_tune_buffer
+        # packed group address (inet_aton) -> (multicast_addr, callback_obj), replaced as a whole on join/leave
+        self.group_index = {}
+        self.dropped_count = 0
         self.callback_obj = None
         self.port = port
         self.multicastSet = set([])
@@ -111,22 +142,43 @@ class AsyncMulticast(asyncio.Protocol):
                 self.bind_addr = socket.gethostbyname(socket.gethostname())
                 # for both SENDER and RECEIVER to bind to specific network adapter
             self.sock.setsockopt(socket.SOL_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.bind_addr))
+            if self.group_demux:
+                # for RECEIVER to get the destination group of each datagram
+                self.sock.setsockopt(socket.IPPROTO_IP, IP_PKTINFO, 1)
 
             # for RECEIVE to receive from multiple multicast groups
             self.sock.bind(('', port))
+            self.socket_buffer = SocketBuffer(self.sock, recv_buffer_size, send_buffer_size, auto_tune_buffer,
+                                              max_buffer_size)
+            if self.count_drops:
+                self.count_drops = self.socket_buffer.enable_drop_counter()
         except Exception as e:
-            print(e)
-            traceback.print_exc()
+            EventLog.instance().error(self, e)
         
         self.transport = None
+        self.anc_buffer_size = 0
+        if hasattr(socket, 'CMSG_SPACE'):
+            self.anc_buffer_size = socket.CMSG_SPACE(12) + SocketBuffer.get_ancillary_size()
+        self.metrics = MetricsRegistry.instance().create('multicast', str((self.bind_addr, port)))
+        if self.metrics is not None:
+            self.metrics.set_source(self.get_metrics_source)
         AsyncController.instance().add(self)
         if self.callback_obj is not None:
             self.callback_obj.on_started(self)
 
         self.loop = asyncio.get_event_loop()
-        coro = self.loop.create_datagram_endpoint(lambda: self, sock=self.sock)
+        self.use_recvmsg = self.group_demux or self.count_drops
+        if self.use_recvmsg:
+            # the transport reads with recvfrom which loses the ancillary data, so it only sends
+            # (through a duplicate of the socket) and the original socket is read with recvmsg
+            coro = self.loop.create_datagram_endpoint(lambda: self, sock=self.sock.dup())
+        else:
+            coro = self.loop.create_datagram_endpoint(lambda: self, sock=self.sock)
         AsyncController.instance().pause()
         (self.transport, _) = self.loop.run_until_complete(coro)
+        if self.use_recvmsg:
+            self.transport.pause_reading()
+            self.loop.add_reader(self.sock.fileno(), self.read_ready)
         AsyncController.instance().resume()
 
     # Even though UDP is connectionless this is called when it binds to a port
@@ -134,25 +186,99 @@ class AsyncMulticast(asyncio.Protocol):
         self.transport = transport
 
     # This is called everytime there is something to read
-    def data_received(self, data, addr):
+    def datagram_received(self, data, addr):
+        metrics = self.metrics
         try:
             if data and self.callback_obj is not None:
-                self.callback_obj.on_received(self, addr, data)
+                if metrics is not None:
+                    start = time.perf_counter()
+                    metrics.reads += 1
+                    metrics.bytes_in += len(data)
+                count = 1
+                messages = None
+                if self.unbatch and BatchPacket.is_batch_packet(data):
+                    messages = BatchPacket.to_messages(data)
+                if messages is not None:
+                    self.callback_obj.on_received_batch(self, addr, messages)
+                    count = len(messages)
+                else:
+                    self.callback_obj.on_received(self, addr, data)
+                if metrics is not None:
+                    metrics.callback_seconds.observe(time.perf_counter() - start)
+                    metrics.messages_in += count
         except Exception as e:
-            print(e)
-            traceback.print_exc()
-    
+            EventLog.instance().error(self, e)
+
+    # Called by the loop instead of the transport when group_demux or count_drops is enabled
+    def read_ready(self):
+        for _ in range(MAX_READ_PER_EVENT):
+            try:
+                data, ancdata, flags, addr = self.sock.recvmsg(MAX_DATAGRAM_SIZE, self.anc_buffer_size)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                self.error_received(e)
+                return
+            if self.count_drops:
+                self.socket_buffer.update(ancdata)
+            if not self.group_demux:
+                self.datagram_received(data, addr)
+                continue
+            group = None
+            for cmsg_level, cmsg_type, cmsg_data in ancdata:
+                if cmsg_level == socket.IPPROTO_IP and cmsg_type == IP_PKTINFO:
+                    # struct in_pktinfo { int ipi_ifindex; in_addr ipi_spec_dst; in_addr ipi_addr; }
+                    group = self.group_index.get(cmsg_data[8:12])
+                    break
+            if group is None or not data:
+                self.dropped_count += 1
+                continue
+            multicast_addr, callback_obj = group
+            metrics = self.metrics
+            try:
+                if metrics is not None:
+                    start = time.perf_counter()
+                    metrics.reads += 1
+                    metrics.bytes_in += len(data)
+                count = 1
+                messages = None
+                if self.unbatch and BatchPacket.is_batch_packet(data):
+                    messages = BatchPacket.to_messages(data)
+                if messages is not None:
+                    callback_obj.on_group_received_batch(self, multicast_addr, addr, messages)
+                    count = len(messages)
+                else:
+                    callback_obj.on_group_received(self, multicast_addr, addr, data)
+                if metrics is not None:
+                    metrics.callback_seconds.observe(time.perf_counter() - start)
+                    metrics.messages_in += count
+            except Exception as e:
+                EventLog.instance().error(self, e)
+
+    # datagrams dropped by the group demux (the kernel drops are in get_socket_stats)
+    def get_dropped_count(self):
+        return self.dropped_count
+
+    def get_socket_stats(self):
+        return self.socket_buffer.get_stats()
+
+    # demux and kernel drops, collected by the MetricsRegistry
+    def get_metrics_source(self):
+        return {'dropped': self.dropped_count + self.socket_buffer.drop_count}
+
     def connection_lost(self, exc):
         self.close()
 
     def close(self):
-        self.handle_close()
+        if not self.is_closing:
+            self.handle_close()
 
     def error_received(self, exc):
-        self.handle_close()
+        if not self.is_closing:
+            self.handle_close()
 
     def handle_close(self):
-
+        self.is_closing = True
         try:
             delete_set = self.getgrouplist()
             for multicast_addr in delete_set:
@@ -162,33 +288,71 @@ class AsyncMulticast(asyncio.Protocol):
                     self.callback_obj.on_leave(self, multicast_addr)
             with self.lock:
                 self.multicastSet = set([])
+                self.group_index = {}
         except Exception as e:
-            print(e)
+            EventLog.instance().error(self, e)
 
-        print('asyncUdp close called')
+        EventLog.instance().emit(EventType.CLOSE, self, 'asyncUdp close called')
+        self.disable_pacing()
+        if self.use_recvmsg:
+            self.loop.remove_reader(self.sock.fileno())
+            self.sock.close()
         self.transport.close()
         AsyncController.instance().discard(self)
+        MetricsRegistry.instance().release(self.metrics)
         try:
             if self.callback_obj is not None:
                 self.callback_obj.on_stopped(self)
         except Exception as e:
-            print(e)
-            traceback.print_exc()
+            EventLog.instance().error(self, e)
 
     # noinspection PyMethodOverriding
-    def send(self, hostname, port, data):
+    # priority is only used when pacing is enabled, returns False if the pacing queue dropped the data
+    def send(self, hostname, port, data, priority=Priority.NORMAL):
         if len(data) <= self.MAX_MTU:
+            metrics = self.metrics
+            if metrics is not None:
+                metrics.messages_out += 1
+                metrics.bytes_out += len(data)
+            if self.paced_sender is not None:
+                return self.paced_sender.send(hostname, port, data, priority)
             self.transport.sendto(data, (hostname, port))
+            return True
         else:
             raise ValueError("The data size is too large")
 
+    # rate/burst in bytes, use paced_sender.set_destination_rate() to also pace single destinations
+    def enable_pacing(self, rate, burst, queue_size=1024, drop_policy=DropPolicy.DROP_OLDEST):
+        self.disable_pacing()
+        self.paced_sender = PacedSender(self, rate, burst, queue_size, drop_policy)
+        return self.paced_sender
+
+    def disable_pacing(self):
+        paced_sender = self.paced_sender
+        self.paced_sender = None
+        if paced_sender is not None:
+            paced_sender.close()
+
+    def get_pacing_stats(self):
+        if self.paced_sender is None:
+            return None
+        return self.paced_sender.get_stats()
+
     # for RECEIVER to receive datagram from the multicast group
-    def join(self, multicast_addr):
+    # callback_obj: handler for this group when group_demux is enabled, defaults to the server callback_obj
+    def join(self, multicast_addr, callback_obj=None):
+        if callback_obj is None:
+            callback_obj = self.callback_obj
+        elif not isinstance(callback_obj, IUdpCallback):
+            raise Exception('callback_obj is not an instance of IUdpCallback class')
         with self.lock:
             if multicast_addr not in self.multicastSet:
                 self.sock.setsockopt(socket.SOL_IP, socket.IP_ADD_MEMBERSHIP,
                                      socket.inet_aton(multicast_addr) + socket.inet_aton(self.bind_addr))
                 self.multicastSet.add(multicast_addr)
+                group_index = dict(self.group_index)
+                group_index[socket.inet_aton(multicast_addr)] = (multicast_addr, callback_obj)
+                self.group_index = group_index
                 if self.callback_obj is not None:
                     self.callback_obj.on_join(self, multicast_addr)
 
@@ -197,13 +361,17 @@ class AsyncMulticast(asyncio.Protocol):
         with self.lock:
             try:
                 if multicast_addr in self.multicastSet:
+                    # stop dispatching first so datagrams still queued for the group are dropped
+                    group_index = dict(self.group_index)
+                    group_index.pop(socket.inet_aton(multicast_addr), None)
+                    self.group_index = group_index
                     self.sock.setsockopt(socket.SOL_IP, socket.IP_DROP_MEMBERSHIP,
                                          socket.inet_aton(multicast_addr) + socket.inet_aton('0.0.0.0'))
                     self.multicastSet.discard(multicast_addr)
                     if self.callback_obj is not None:
                         self.callback_obj.on_leave(self, multicast_addr)
             except Exception as e:
-                print(e)
+                EventLog.instance().error(self, e)
 
     def getgrouplist(self):
         with self.lock:
@@ -0,0 +1,114 @@
+#!/usr/bin/python
+"""
+@file async_shm_client.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Asynchronous Shared Memory Client Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Asynchronous Shared Memory Client Class.
+"""
+import os
+import threading
+
+from .async_shm_connection import *
+from .async_unix_client import AsyncUnixClient
+from .callback_interface import *
+from .preamble import PROTOCOL_VERSION_2
+from .event_log import *
+
+
+class ShmClientControlCallback(ITcpSocketCallback):
+    def __init__(self, client):
+        self.client = client
+
+    def on_fds_received(self, sock, channel, data, fds):
+        try:
+            in_name, out_name = data.decode().split()
+            in_ring = ShmRing(in_name)
+            out_ring = ShmRing(out_name)
+            self.client.start_connection(in_ring, out_ring, ShmNotifier(fds[0], fds[0]),
+                                         ShmNotifier(fds[1], fds[1]))
+            # the server may drop the names now
+            sock.send(b'attached')
+        except Exception as e:
+            EventLog.instance().error(self, e)
+            for fd in fds:
+                os.close(fd)
+            sock.close()
+        self.client.setup_event.set()
+
+    def on_disconnect(self, sock):
+        self.client.setup_event.set()
+        self.client.close()
+
+
+'''
+Interfaces
+variables
+- path
+- addr = path
+- callback
+functions
+- def send(data, channel=0)
+- def send_many(data_list, channel=0)
+- def close()
+infos
+- connects to an AsyncShmServer at path and waits up to setup_timeout for the rings,
+  then calls callback.on_newconnection like AsyncTcpClient (err set on failure),
+  do not create it on the AsyncController loop thread
+'''
+
+
+class AsyncShmClient(AsyncShmConnection):
+    def __init__(self, path, callback, setup_timeout=DEFAULT_SETUP_TIMEOUT):
+        AsyncShmConnection.__init__(self)
+        self.set_callback(callback)
+        self.path = path
+        self.addr = path
+        self.setup_event = threading.Event()
+        err = None
+        try:
+            self.control = AsyncUnixClient(path, ShmClientControlCallback(self), protocol_version=PROTOCOL_VERSION_2)
+            if not self.setup_event.wait(setup_timeout):
+                raise Exception('shared memory setup timed out')
+            if self.in_ring is None:
+                raise Exception('shared memory setup failed')
+        except Exception as e:
+            err = e
+        finally:
+            def callback_connection():
+                if self.callback is not None:
+                    self.callback.on_newconnection(self, err)
+
+            thread = threading.Thread(target=callback_connection)
+            thread.start()
+        if err is not None:
+            self.close()
@@ -0,0 +1,234 @@
+#!/usr/bin/python
+"""
+@file async_shm_connection.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Asynchronous Shared Memory Connection Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Asynchronous Shared Memory Connection Class.
+"""
+import asyncio
+import threading
+from collections import deque
+
+from .async_controller import AsyncController
+from .callback_interface import *
+from .server_conf import *
+from .preamble import MAX_CHANNEL
+from .shm_ring import *
+from .event_log import *
+
+DEFAULT_SETUP_TIMEOUT = 5.0
+# one more look at the ring after going idle, covers a write racing with the idle check
+RECHECK_DELAY = 0.001
+
+'''
+Interfaces
+variables
+- addr
+- callback
+functions
+- def send(data, channel=0)
+- def send_many(data_list, channel=0)
+- def close()
+infos
+- two ShmRing (one per direction) and two ShmNotifier, set up over a unix socket
+  (the control connection) that stays open to tell either side when the other is gone
+- the producer signals only when the consumer had caught up, the consumer drains the
+  whole ring per wakeup and delivers to callback.on_channel_received on the loop thread
+- a message that does not fit waits in a local queue until the consumer frees room,
+  a message larger than the ring raises ValueError
+'''
+
+
+class AsyncShmConnection(object):
+    def __init__(self):
+        self.is_closing = False
+        self.loop = None
+        self.callback = None
+        self.addr = None
+        self.lock = threading.RLock()
+        self.control = None
+        self.in_ring = None
+        self.out_ring = None
+        self.in_notifier = None
+        self.out_notifier = None
+        # (channel, data) waiting for room in out_ring
+        self.pending_queue = deque()
+        self.recheck_handle = None
+
+    def set_callback(self, callback):
+        if callback is not None and isinstance(callback, ITcpSocketCallback):
+            self.callback = callback
+        else:
+            raise Exception('callback is None or not an instance of ITcpSocketCallback class')
+
+    # called on the loop thread once both rings and notifiers are there
+    def start_connection(self, in_ring, out_ring, in_notifier, out_notifier):
+        self.loop = asyncio.get_event_loop()
+        with self.lock:
+            self.in_ring = in_ring
+            self.out_ring = out_ring
+            self.in_notifier = in_notifier
+            self.out_notifier = out_notifier
+        self.loop.add_reader(in_notifier.read_fd, self.on_notified)
+        AsyncController.instance().add(self)
+        self.receive()
+
+    def on_notified(self):
+        self.in_notifier.drain()
+        self.receive()
+
+    def on_recheck(self):
+        self.recheck_handle = None
+        self.receive()
+
+    def receive(self):
+        if self.is_closing or self.in_ring is None:
+            return
+        message_list = self.in_ring.read()
+        if self.in_ring.is_writer_waiting():
+            self.in_ring.set_writer_waiting(False)
+            self.out_notifier.signal()
+        self.flush()
+        if len(message_list) > 0 and self.recheck_handle is None:
+            self.recheck_handle = self.loop.call_later(RECHECK_DELAY, self.on_recheck)
+        try:
+            if self.callback is not None:
+                for channel, data in message_list:
+                    self.callback.on_channel_received(self, channel, data)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+    # writes what was waiting for room, call on the loop thread
+    def flush(self):
+        with self.lock:
+            if len(self.pending_queue) == 0 or self.out_ring is None:
+                return
+            position = self.out_ring.head
+            while len(self.pending_queue) > 0:
+                channel, data = self.pending_queue[0]
+                if not self.out_ring.write(data, channel):
+                    self.out_ring.set_writer_waiting(True)
+                    break
+                self.pending_queue.popleft()
+            self.notify(position)
+
+    def notify(self, position):
+        if self.out_ring.head != position and self.out_ring.is_drained(position):
+            self.out_notifier.signal()
+
+    def check_message(self, data, channel):
+        if channel < 0 or channel > MAX_CHANNEL:
+            raise ValueError('channel out of range')
+        if self.out_ring is not None and SIZE_RECORD_HEADER + len(data) > self.out_ring.capacity:
+            raise ValueError('message larger than the ring')
+
+    def send(self, data, channel=0):
+        self.check_message(data, channel)
+        state = State.SUCCESS
+        with self.lock:
+            if self.is_closing:
+                state = State.FAIL_SOCKET_ERROR
+            elif self.out_ring is None or len(self.pending_queue) > 0:
+                self.pending_queue.append((channel, data))
+            else:
+                position = self.out_ring.head
+                if not self.out_ring.write(data, channel):
+                    self.pending_queue.append((channel, data))
+                    self.out_ring.set_writer_waiting(True)
+                self.notify(position)
+        try:
+            if self.callback is not None:
+                self.callback.on_sent(self, state, data)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+    def send_many(self, data_list, channel=0):
+        for data in data_list:
+            self.check_message(data, channel)
+        state = State.SUCCESS
+        with self.lock:
+            if self.is_closing:
+                state = State.FAIL_SOCKET_ERROR
+            elif self.out_ring is None or len(self.pending_queue) > 0:
+                self.pending_queue.extend([(channel, data) for data in data_list])
+            else:
+                position = self.out_ring.head
+                count = self.out_ring.write_many(data_list, channel)
+                if count < len(data_list):
+                    self.pending_queue.extend([(channel, data) for data in data_list[count:]])
+                    self.out_ring.set_writer_waiting(True)
+                self.notify(position)
+        try:
+            if self.callback is not None:
+                for data in data_list:
+                    self.callback.on_sent(self, state, data)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+    def close(self):
+        if not self.is_closing:
+            self.handle_close()
+
+    def handle_close(self):
+        try:
+            with self.lock:
+                self.is_closing = True
+                self.pending_queue.clear()
+            if self.control is not None:
+                self.control.close()
+            if self.loop is not None:
+                self.loop.call_soon_threadsafe(self.release)
+            AsyncController.instance().discard(self)
+            if self.callback is not None:
+                self.callback.on_disconnect(self)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+    # unmaps the rings and closes the notifiers on the loop thread
+    def release(self):
+        if self.recheck_handle is not None:
+            self.recheck_handle.cancel()
+            self.recheck_handle = None
+        with self.lock:
+            if self.in_notifier is not None:
+                self.loop.remove_reader(self.in_notifier.read_fd)
+                self.in_notifier.close()
+                self.out_notifier.close()
+                self.in_notifier = None
+                self.out_notifier = None
+            for ring in (self.in_ring, self.out_ring):
+                if ring is not None:
+                    ring.unlink()
+                    ring.close()
+            self.in_ring = None
+            self.out_ring = None
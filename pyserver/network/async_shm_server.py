@@ -0,0 +1,211 @@
+#!/usr/bin/python
+"""
+@file async_shm_server.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Asynchronous Shared Memory Server Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Asynchronous Shared Memory Server Class.
+"""
+import copy
+import os
+import threading
+
+from .async_controller import AsyncController
+from .async_shm_connection import *
+from .async_unix_server import AsyncUnixServer
+from .callback_interface import *
+from .preamble import PROTOCOL_VERSION_2
+from .event_log import *
+
+'''
+Interfaces
+variable
+- addr
+- callback
+function
+- def send(data, channel=0)
+- def send_many(data_list, channel=0)
+- def close()
+'''
+
+
+class AsyncShmSocket(AsyncShmConnection):
+    def __init__(self, server, control):
+        AsyncShmConnection.__init__(self)
+        self.server = server
+        self.control = control
+        self.client_notifiers = None
+
+    # control connection made: create both directions and hand the client its ends
+    def on_control_connected(self):
+        client_to_server = ShmNotifier()
+        server_to_client = ShmNotifier()
+        in_ring = ShmRing(size=self.server.ring_size, create=True)
+        out_ring = ShmRing(size=self.server.ring_size, create=True)
+        try:
+            self.control.send_fds([server_to_client.read_fd, client_to_server.write_fd],
+                                  ('%s %s' % (out_ring.name, in_ring.name)).encode())
+        finally:
+            # send_fds keeps its own duplicates
+            if client_to_server.write_fd != client_to_server.read_fd:
+                os.close(client_to_server.write_fd)
+            if server_to_client.read_fd != server_to_client.write_fd:
+                os.close(server_to_client.read_fd)
+        self.start_connection(in_ring, out_ring, ShmNotifier(client_to_server.read_fd, client_to_server.read_fd),
+                              ShmNotifier(server_to_client.write_fd, server_to_client.write_fd))
+
+    # the client mapped both rings, the names are no longer needed
+    def on_control_attached(self):
+        with self.lock:
+            for ring in (self.in_ring, self.out_ring):
+                if ring is not None:
+                    ring.unlink()
+
+    def handle_close(self):
+        AsyncShmConnection.handle_close(self)
+        self.server.discard_socket(self)
+
+
+class ShmServerControlCallback(ITcpSocketCallback):
+    def __init__(self, server):
+        self.server = server
+        self.shm_socket = None
+
+    def on_newconnection(self, sock, err):
+        try:
+            self.shm_socket = AsyncShmSocket(self.server, sock)
+            self.shm_socket.set_callback(self.server.acceptor.get_socket_callback())
+            self.shm_socket.on_control_connected()
+            self.shm_socket.callback.on_newconnection(self.shm_socket, None)
+            self.server.add_socket(self.shm_socket)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+            sock.close()
+
+    def on_received(self, sock, data):
+        if self.shm_socket is not None:
+            self.shm_socket.on_control_attached()
+
+    def on_disconnect(self, sock):
+        if self.shm_socket is not None:
+            self.shm_socket.close()
+
+
+class ShmServerControlAcceptor(IAcceptor):
+    def __init__(self, server):
+        self.server = server
+
+    def on_accept(self, server, addr):
+        return self.server.acceptor.on_accept(self.server, addr)
+
+    def get_socket_callback(self):
+        return ShmServerControlCallback(self.server)
+
+
+'''
+Interfaces
+variables
+- path
+- callback
+- acceptor
+functions
+- def close()
+- def get_socket_list()
+infos
+- clients connect to the unix socket at path, every accepted control connection gets
+  two rings of ring_size bytes (a power of two) and the socket from
+  acceptor.get_socket_callback(), which sees the same ITcpSocketCallback calls as with
+  AsyncTcpServer (on_channel_received, on_disconnect, ...)
+- both processes must be on the same host, the rings are in /dev/shm
+'''
+
+
+class AsyncShmServer(object):
+    def __init__(self, path, callback, acceptor, ring_size=DEFAULT_RING_SIZE):
+        self.is_closing = False
+        self.lock = threading.RLock()
+        self.sock_set = set([])
+
+        self.acceptor = None
+        if acceptor is not None and isinstance(acceptor, IAcceptor):
+            self.acceptor = acceptor
+        else:
+            raise Exception('acceptor is None or not an instance of IAcceptor class')
+        self.callback = None
+        if callback is not None and isinstance(callback, ITcpServerCallback):
+            self.callback = callback
+        else:
+            raise Exception('callback is None or not an instance of ITcpServerCallback class')
+        if ring_size <= 0 or ring_size & (ring_size - 1) != 0:
+            raise Exception('ring_size must be a power of two')
+
+        self.path = path
+        self.ring_size = ring_size
+        self.control_server = AsyncUnixServer(path, ITcpServerCallback(), ShmServerControlAcceptor(self),
+                                              protocol_version=PROTOCOL_VERSION_2)
+        AsyncController.instance().add(self)
+        if self.callback is not None:
+            self.callback.on_started(self)
+
+    def add_socket(self, sock_obj):
+        with self.lock:
+            self.sock_set.add(sock_obj)
+        if self.callback is not None:
+            self.callback.on_accepted(self, sock_obj)
+
+    def discard_socket(self, sock):
+        with self.lock:
+            self.sock_set.discard(sock)
+
+    def get_socket_list(self):
+        with self.lock:
+            return list(self.sock_set)
+
+    def close(self):
+        if not self.is_closing:
+            self.handle_close()
+
+    def handle_close(self):
+        try:
+            EventLog.instance().emit(EventType.CLOSE, self, 'asyncShmServer close called')
+            self.is_closing = True
+            with self.lock:
+                delete_set = copy.copy(self.sock_set)
+                for item in delete_set:
+                    item.close()
+                self.sock_set = set([])
+            self.control_server.close()
+            AsyncController.instance().discard(self)
+            if self.callback is not None:
+                self.callback.on_stopped(self)
+        except Exception as e:
+            EventLog.instance().error(self, e)
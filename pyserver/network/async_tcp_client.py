@@ -37,10 +37,10 @@ AsyncTcpClient Class.
 """
 import asyncio
 import socket
-from collections import deque
 import threading
 
 from .async_controller import AsyncController
+from .async_tcp_connection import *
 from .callback_interface import *
 from .server_conf import *
 # noinspection PyDeprecation
@@ -54,34 +54,41 @@ variables
 - addr = (hostname,port)
 - callback
 functions
-- def send(data)
+- def send(data, channel=0, priority=Priority.NORMAL)
+- def send_many(data_list, channel=0, priority=Priority.NORMAL)
+- def send_file(path_or_fd, offset=0, count=None, progress_callback=None, channel=0, priority=Priority.NORMAL)
 - def close() # close the socket
+infos
+- protocol_version/handshake_timeout/compressor/max_batch_size/coalesce_writes/cork_delay/
+  chunk_size/priority_weights/write_buffer_limit/max_message_size/spool_threshold/
+  spool_mode/spool_dir/codec/tracer,
+  see AsyncTcpConnection
 '''
 
 
-class AsyncTcpClient(asyncio.Protocol):
-    def __init__(self, hostname, port, callback, no_delay=True):
-        self.is_closing = False
-        self.callback = None
-        if callback is not None and isinstance(callback, ITcpSocketCallback):
-            self.callback = callback
-        else:
-            raise Exception('callback is None or not an instance of ITcpSocketCallback class')
+class AsyncTcpClient(AsyncTcpConnection):
+    def __init__(self, hostname, port, callback, no_delay=True, protocol_version=PROTOCOL_VERSION_1,
+                 handshake_timeout=DEFAULT_HANDSHAKE_TIMEOUT, compressor=None, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 coalesce_writes=True, cork_delay=0.0, chunk_size=DEFAULT_CHUNK_SIZE,
+                 priority_weights=DEFAULT_PRIORITY_WEIGHTS, write_buffer_limit=None, max_message_size=None,
+                 spool_threshold=None, spool_mode=SpoolMode.MMAP, spool_dir=None, codec=None,
+                 tracer=None):
+        AsyncTcpConnection.__init__(self, protocol_version=protocol_version, handshake_timeout=handshake_timeout,
+                                    compressor=compressor, max_batch_size=max_batch_size,
+                                    coalesce_writes=coalesce_writes, cork_delay=cork_delay,
+                                    chunk_size=chunk_size, priority_weights=priority_weights,
+                                    write_buffer_limit=write_buffer_limit, max_message_size=max_message_size,
+                                    spool_threshold=spool_threshold, spool_mode=spool_mode, spool_dir=spool_dir,
+                                    codec=codec, tracer=tracer)
+        self.set_callback(callback)
         self.hostname = hostname
         self.port = port
-        self.addr = (hostname, port)
-        self.send_queue = deque()  # thread-safe dequeue
-        self.transport_dict = {'packet': None, 'type': PacketType.SIZE, 'size': SIZE_PACKET_LENGTH, 'offset': 0}
-        
-        self.recv_buffer = []
+        self.addr = self.get_address()
 
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        if no_delay:
-            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock = self.create_socket(no_delay)
         err = None
         try:
-            self.sock.connect((hostname, port))
+            self.sock.connect(self.addr)
             AsyncController.instance().add(self)
         except Exception as e:
             err = e
@@ -99,81 +106,16 @@ class AsyncTcpClient(asyncio.Protocol):
         (self.transport, _) = self.loop.run_until_complete(coro)
         AsyncController.instance().resume()
 
-    def connection_made(self, transport):
-        self.transport = transport
-
-    def data_received(self, data):
-        try:
-            if data is None or len(data) == 0:
-                return
-
-            self.recv_buffer.concat(data)
-            data = self.recv_buffer[:self.transport_dict['size']]
-            self.recv_buffer = self.recv_buffer[self.transport_dict['size']:]
-
-            if self.transport_dict['packet'] is None:
-                self.transport_dict['packet'] = data
-            else:
-                self.transport_dict['packet'] += data
-            read_size = len(data)
-            if read_size < self.transport_dict['size']:
-                self.transport_dict['offset'] += read_size
-                self.transport_dict['size'] -= read_size
-            else:
-                if self.transport_dict['type'] == PacketType.SIZE:
-                    should_receive = Preamble.to_should_receive(self.transport_dict['packet'])
-                    if should_receive < 0:
-                        preamble_offset = Preamble.check_preamble(self.transport_dict['packet'])
-                        self.transport_dict['offset'] = len(self.transport_dict['packet']) - preamble_offset
-                        self.transport_dict['size'] = preamble_offset
-                        # self.transport_dict['packet'] = self.transport_dict['packet'][
-                        #                           len(self.transport_dict['packet']) - preamble_offset:]
-                        self.transport_dict['packet'] = self.transport_dict['packet'][preamble_offset:]
-                        return
-                    self.transport_dict = {'packet': None, 'type': PacketType.DATA, 'size': should_receive, 'offset': 0}
-                else:
-                    receive_packet = self.transport_dict
-                    self.transport_dict = {'packet': None, 'type': PacketType.SIZE, 'size': SIZE_PACKET_LENGTH,
-                                           'offset': 0}
-                    self.callback.on_received(self, receive_packet['packet'])
-        except Exception as e:
-            print(e)
-            traceback.print_exc()
-
-    def connection_lost(self, exc):
-        self.close()
-
-    def close(self):
-        if not self.is_closing:
-            self.handle_close()
-
-    def error_received(self, exc):
-        if not self.is_closing:
-            self.handle_close()
+    # address and socket to connect, overridden by the unix socket client
+    def get_address(self):
+        return self.hostname, self.port
 
-    def handle_close(self):
-        try:
-            self.is_closing = True
-            self.transport.close()
-            AsyncTcpClient.instance().discard(self)
-            if self.callback is not None:
-                self.callback.on_disconnect(self)
-        except Exception as e:
-            print(e)
-            traceback.print_exc()
-
-    def send(self, data):
-        state = State.SUCCESS
-        self.transport.write({'data': Preamble.to_preamble_packet(len(data)) + data, 'offset': 0})
-        try:
-            if self.callback is not None:
-                self.callback.on_sent(self, state, data)
-        except Exception as e:
-            print(e)
-            traceback.print_exc()
-
-    def gethostbyname(self, arg):
-        return self.sock.gethostbyname(arg)
+    def create_socket(self, no_delay):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if no_delay:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        return sock
 
-    def gethostname(self):
-        return self.sock.gethostname()
+    def connection_made(self, transport):
+        self.start_connection(transport)
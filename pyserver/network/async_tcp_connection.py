@@ -0,0 +1,902 @@
+#!/usr/bin/python
+"""
+@file async_tcp_connection.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief AsyncTcpConnection Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+AsyncTcpConnection Class, the framing and write scheduling shared by
+AsyncTcpSocket and AsyncTcpClient.
+"""
+import asyncio
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+from .async_controller import AsyncController
+from .callback_interface import *
+from .server_conf import *
+from .preamble import *
+from .frame_decoder import FrameDecoder
+from .write_scheduler import *
+from .compressor import ZlibCompressor
+from .batch_packet import *
+from .file_transfer import *
+from .message_spool import *
+from .unix_socket import *
+from .metrics import MetricsRegistry
+from .tracing import *
+from .event_log import *
+
+DEFAULT_HANDSHAKE_TIMEOUT = 1.0
+DEFAULT_MAX_BATCH_SIZE = 64 * 1024
+DEFAULT_CHUNK_SIZE = 16 * 1024
+# flush_close looks at the queue again after this long
+FLUSH_RETRY_DELAY = 0.01
+
+'''
+Interfaces
+variables
+- addr
+- callback
+- protocol_version # configured version
+- negotiated_version # version in use, None while the handshake is pending
+functions
+- def send(data, channel=0, priority=Priority.NORMAL)
+- def send_many(data_list, channel=0, priority=Priority.NORMAL) # batch frames (FLAG_BATCHED) under protocol version 2
+- def send_file(path_or_fd, offset=0, count=None, progress_callback=None, channel=0, priority=Priority.NORMAL)
+- def set_compressor(compressor) # ZlibCompressor or None
+- def set_codec(codec) # ICodec or None
+- def send_fds(fds, data=b'', channel=0, priority=Priority.NORMAL) # unix sockets, protocol version 2
+- def close() # close the socket
+- def flush_close() # close once the queued messages are handed to the socket
+- def get_trace_stats() # TraceStats of the traced messages received and echoes, None before the first
+infos
+- protocol_version=PROTOCOL_VERSION_2 sends a handshake frame (MessageType.HANDSHAKE,
+  version in the channel field, no payload) as soon as the connection is made and
+  holds every outbound frame until the peer answers or handshake_timeout passes,
+  the connection then uses min(local, peer) or PROTOCOL_VERSION_1 on timeout
+- a PROTOCOL_VERSION_1 connection answers a handshake with version 1 so a v2
+  peer does not wait for the timeout, a v1-only peer sees the handshake as one
+  empty message
+- channels are only carried by version 2, frames of independent channels are
+  written round-robin once the transport pushes back (pause_writing)
+- with a compressor, messages of at least compressor.threshold bytes are sent
+  compressed (FLAG_COMPRESSED) when version 2 is in use and it makes them
+  smaller, messages of at least compressor.offload_threshold bytes are
+  compressed off the loop while later messages of other channels keep going,
+  a FLAG_COMPRESSED frame arriving on a connection without a compressor closes it
+- send_many packs up to max_batch_size bytes of messages (each below 64KB)
+  behind one preamble with a 2-byte length table per message, the receiver
+  hands a batch to on_received_batch which defaults to on_channel_received
+  per message, without version 2 the messages are sent one frame each
+- an exception raised by a callback is logged and the following messages are still
+  delivered, a malformed frame (batch, compression, chunk) closes the connection
+- with coalesce_writes (default) the frames queued during one loop iteration
+  are written together with one writelines at the start of the next one,
+  cork_delay > 0 holds them for that many seconds instead (bulk connections),
+  so several small sends per inbound message cost one syscall and packet
+  even though TCP_NODELAY is on; frames are only ever written on the loop thread
+- priority picks the scheduler class of the frames (see WriteScheduler, priority_weights
+  per Priority), the transport is only fed up to its high-water mark (write_buffer_limit
+  if given) so a Priority.HIGH frame does not wait behind megabytes already handed over
+- under version 2 messages larger than chunk_size go out in chunk_size frames flagged
+  FLAG_FRAGMENT, other frames can be written between them and the receiver joins them
+  per channel and priority before decompressing and dispatching the message
+- send_file streams the file with loop.sendfile in slices (see FileTransfer), under
+  version 2 every slice is a FLAG_FRAGMENT frame that takes its turn in the scheduler
+  like a chunk, without it the file is one frame and nothing else is written until its
+  body is out and its size is limited to MAX_FILE_FRAME_SIZE, files are never compressed
+  and a failed transfer closes the connection
+- a frame (or chunked message) larger than max_message_size closes the connection as
+  soon as its header (or the chunk crossing the limit) arrives, so does a compressed
+  message (or batch) that would decompress to more than max_message_size
+- messages of at least spool_threshold bytes are not buffered in memory: with
+  SpoolMode.MMAP they go to a temporary file in spool_dir and the callback gets a
+  read-only mmap instead of bytes, with SpoolMode.STREAM the pieces go to
+  callback.on_stream_received as they arrive (compressed or batched messages are
+  always spooled to mmap since they have to be decoded as a whole)
+- with a codec, send/send_many take objects encoded by codec.encode and the callback
+  gets codec.decode of every received message (streamed pieces stay raw)
+- with pass_fds (unix socket connections) the connection reads with recvmsg and
+  send_fds writes one FLAG_FDS frame with sendmsg once the transport buffer is
+  empty, the descriptors received with it go to callback.on_fds_received
+- with a tracer (protocol version 2), the messages its sampler picks are sent flagged
+  FLAG_TRACED with a trace header stamped at enqueue and again when the frame is written,
+  the receiver strips it and records queue, one way and receive times, with tracer.echo
+  it answers with a MessageType.TRACE_ECHO frame after the callback for round trips
+'''
+
+
+class AsyncTcpConnection(asyncio.Protocol):
+    # set by the unix socket classes before the connection is made
+    pass_fds = False
+
+    def __init__(self, protocol_version=PROTOCOL_VERSION_1, handshake_timeout=DEFAULT_HANDSHAKE_TIMEOUT,
+                 compressor=None, max_batch_size=DEFAULT_MAX_BATCH_SIZE, coalesce_writes=True, cork_delay=0.0,
+                 chunk_size=DEFAULT_CHUNK_SIZE, priority_weights=DEFAULT_PRIORITY_WEIGHTS, write_buffer_limit=None,
+                 max_message_size=None, spool_threshold=None, spool_mode=SpoolMode.MMAP, spool_dir=None,
+                 codec=None, tracer=None):
+        if chunk_size <= 0:
+            raise Exception('chunk_size must be positive')
+        if spool_threshold is not None and spool_threshold <= 0:
+            raise Exception('spool_threshold must be positive')
+        self.is_closing = False
+        self.loop = None
+        self.callback = None
+        self.transport = None
+        self.sock = None
+        self.addr = None
+        self.lock = threading.RLock()
+        self.protocol_version = protocol_version
+        self.negotiated_version = None
+        self.handshake_timeout = handshake_timeout
+        self.handshake_handle = None
+        self.is_handshake_sent = False
+        self.max_message_size = max_message_size
+        self.spool_threshold = spool_threshold
+        self.spool_mode = spool_mode
+        self.spool_dir = spool_dir
+        self.decoder = FrameDecoder(max_message_size, spool_threshold,
+                                    None if spool_threshold is None else self.create_spool)
+        # channel, priority -> [size, chunk list, spool] of a fragmented message
+        self.fragment_map = {}
+        self.chunk_size = chunk_size
+        self.write_buffer_limit = write_buffer_limit
+        self.scheduler = WriteScheduler(priority_weights, chunk_size + SIZE_PACKET_LENGTH, self.get_item_cost)
+        self.is_write_paused = False
+        self.is_file_sending = False
+        # second descriptor of the socket for recvmsg/sendmsg (pass_fds)
+        self.fd_sock = None
+        self.fd_list_queue = deque()
+        self.is_fd_waiting = False
+        self.compressor = compressor
+        self.codec = codec
+        self.max_batch_size = max_batch_size
+        self.coalesce_writes = coalesce_writes
+        self.cork_delay = cork_delay
+        self.is_pump_scheduled = False
+        self.pump_handle = None
+        self.is_lost = False
+        self.is_eof_sent = False
+        self.is_eof_received = False
+        # data messages handed to the transport and dropped from the queue on close
+        self.sent_count = 0
+        self.dropped_count = 0
+        self.metrics = None
+        self.tracer = tracer
+        self.trace_stats = None
+        # loop time of the read being dispatched, traces of fragmented messages per channel and priority
+        self.read_time = 0.0
+        self.trace_map = {}
+        # trace headers the decoder's spools kept apart, in the order of their frames
+        self.spool_trace_queue = deque()
+
+    def set_callback(self, callback):
+        if callback is not None and isinstance(callback, ITcpSocketCallback):
+            self.callback = callback
+        else:
+            raise Exception('callback is None or not an instance of ITcpSocketCallback class')
+
+    def set_compressor(self, compressor):
+        self.compressor = compressor
+
+    def set_codec(self, codec):
+        self.codec = codec
+
+    def start_connection(self, transport):
+        self.transport = transport
+        self.sock = transport.get_extra_info('socket')
+        self.loop = asyncio.get_event_loop()
+        self.metrics = MetricsRegistry.instance().create('unix' if self.pass_fds else 'tcp',
+                                                         str(transport.get_extra_info('peername')))
+        if self.metrics is not None:
+            self.metrics.set_source(self.get_metrics_source)
+        EventLog.instance().emit(EventType.CONNECT, self, 'connected %s' % (transport.get_extra_info('peername'),))
+        if self.write_buffer_limit is not None:
+            transport.set_write_buffer_limits(high=self.write_buffer_limit)
+        if self.pass_fds:
+            self.start_fd_reader()
+        if self.protocol_version >= PROTOCOL_VERSION_2:
+            self.send_handshake()
+            self.handshake_handle = self.loop.call_later(self.handshake_timeout, self.on_handshake_timeout)
+        else:
+            with self.lock:
+                self.negotiated_version = PROTOCOL_VERSION_1
+            # sends queued before the transport existed (on_newconnection) go out now
+            self.pump()
+
+    def start_fd_reader(self):
+        # the transport drops ancillary data, read through a duplicate of the socket instead
+        self.fd_sock = socket.socket(fileno=os.dup(self.transport.get_extra_info('socket').fileno()))
+        self.fd_sock.setblocking(False)
+        self.transport.pause_reading()
+        self.loop.add_reader(self.fd_sock.fileno(), self.read_fd_ready)
+
+    def read_fd_ready(self):
+        try:
+            data, ancdata, msg_flags, addr = self.fd_sock.recvmsg(MAX_READ_SIZE, FD_ANCILLARY_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except Exception as e:
+            EventLog.instance().error(self, e)
+            self.close()
+            return
+        # one list per FLAG_FDS frame, in order
+        self.fd_list_queue.extend(FdMessage.to_fd_lists(ancdata))
+        if len(data) == 0:
+            self.close()
+            return
+        self.data_received(data)
+
+    def on_fd_writable(self):
+        if self.fd_sock is not None:
+            self.loop.remove_writer(self.fd_sock.fileno())
+        self.pump()
+
+    def send_handshake(self):
+        self.is_handshake_sent = True
+        self.transport.write(Preamble.to_preamble_packet(0, 0, MessageType.HANDSHAKE, self.protocol_version))
+
+    def on_handshake(self, peer_version):
+        with self.lock:
+            if self.handshake_handle is not None:
+                self.handshake_handle.cancel()
+                self.handshake_handle = None
+            if not self.is_handshake_sent:
+                self.send_handshake()
+            self.negotiated_version = max(PROTOCOL_VERSION_1, min(self.protocol_version, peer_version))
+        self.pump()
+
+    def on_handshake_timeout(self):
+        with self.lock:
+            self.handshake_handle = None
+            if self.negotiated_version is None:
+                self.negotiated_version = PROTOCOL_VERSION_1
+        self.pump()
+
+    def data_received(self, data):
+        if data is None or len(data) == 0 or self.is_closing:
+            return
+        self.read_time = time.monotonic()
+        resync_count = self.decoder.resync_count
+        frames = self.decoder.feed(data)
+        if self.decoder.resync_count != resync_count:
+            EventLog.instance().emit(EventType.RESYNC, self, 'skipped to the next preamble, %d resyncs so far' %
+                                     self.decoder.resync_count)
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.perf_counter()
+        for flags, msg_type, channel, payload in frames:
+            if self.is_closing:
+                # a limit or a callback closed the connection, the rest is not delivered
+                break
+            try:
+                self.dispatch_frame(flags, msg_type, channel, payload)
+            except Exception as e:
+                # a failing callback loses its own message only
+                EventLog.instance().error(self, e)
+        if metrics is not None:
+            # once per read, the callbacks of all its frames together
+            metrics.callback_seconds.observe(time.perf_counter() - start)
+            metrics.reads += 1
+            metrics.bytes_in += len(data)
+            metrics.frames_per_read.observe(len(frames))
+        if self.decoder.error is not None and not self.is_closing:
+            # oversized frame or failing spool, the frames before it are delivered, the rest cannot be read
+            EventLog.instance().error(self, self.decoder.error)
+            self.close()
+
+    # spool_factory of the decoder and, with size None, of receive_fragment
+    def create_spool(self, flags, msg_type, channel, size):
+        if self.spool_mode == SpoolMode.STREAM and not flags & (FLAG_COMPRESSED | FLAG_BATCHED | FLAG_TRACED):
+            return MessageStream(self, self.callback, channel)
+        if flags & FLAG_TRACED and size is not None:
+            # the mmap starts at the message, not at the trace header
+            return PrefixSpool(MessageSpool(self.spool_dir), SIZE_TRACE_HEADER, self.spool_trace_queue.append)
+        return MessageSpool(self.spool_dir)
+
+    # returns the whole message once its last chunk arrived, None otherwise (or when streamed)
+    def receive_fragment(self, flags, msg_type, channel, payload):
+        key = (channel, flags & FLAG_PRIORITY_MASK)
+        entry = self.fragment_map.get(key)
+        if entry is None:
+            entry = [0, [], None]
+            self.fragment_map[key] = entry
+        entry[0] += len(payload)
+        if self.max_message_size is not None and entry[0] > self.max_message_size:
+            raise Exception('chunked message exceeds max_message_size')
+        if entry[2] is None and self.spool_threshold is not None and entry[0] >= self.spool_threshold:
+            entry[2] = self.create_spool(flags, msg_type, channel, None)
+            for chunk in entry[1]:
+                entry[2].write(chunk)
+            entry[1] = None
+        if entry[2] is None:
+            entry[1].append(payload)
+        else:
+            entry[2].write(payload)
+        if flags & FLAG_FRAGMENT:
+            return None
+        del self.fragment_map[key]
+        if entry[2] is None:
+            return b''.join(entry[1])
+        return entry[2].finish()
+
+    def dispatch_frame(self, flags, msg_type, channel, payload):
+        if msg_type == MessageType.HANDSHAKE:
+            self.on_handshake(channel)
+            return
+        if flags & FLAG_FDS:
+            fds = self.fd_list_queue.popleft() if len(self.fd_list_queue) > 0 else []
+            if self.callback is None:
+                for fd in fds:
+                    os.close(fd)
+                return
+            self.callback.on_fds_received(self, channel, payload, fds)
+            return
+        if msg_type == MessageType.TRACE_ECHO:
+            self.on_trace_echo(payload)
+            return
+        trace = None
+        if flags & FLAG_TRACED:
+            if isinstance(payload, bytes):
+                trace = self.read_trace(payload)
+                payload = payload[SIZE_TRACE_HEADER:]
+            else:
+                # spooled, the header was kept apart
+                trace = self.read_trace(self.spool_trace_queue.popleft())
+            if flags & FLAG_FRAGMENT:
+                # held until the last chunk is dispatched
+                self.trace_map[(channel, flags & FLAG_PRIORITY_MASK)] = trace
+                trace = None
+        elif self.trace_map and not flags & FLAG_FRAGMENT:
+            trace = self.trace_map.pop((channel, flags & FLAG_PRIORITY_MASK), None)
+        if flags & FLAG_FRAGMENT or (channel, flags & FLAG_PRIORITY_MASK) in self.fragment_map:
+            try:
+                payload = self.receive_fragment(flags, msg_type, channel, payload)
+            except Exception as e:
+                EventLog.instance().error(self, e)
+                self.close()
+                return
+            if payload is None:
+                return
+        if flags & FLAG_COMPRESSED:
+            try:
+                if self.compressor is None:
+                    raise Exception('compressed frame on a connection without a compressor')
+                # covers batches and joined chunks too, they are decompressed as one payload
+                payload = self.compressor.decompress(payload, self.max_message_size)
+            except Exception as e:
+                EventLog.instance().error(self, e)
+                self.close()
+                return
+        if self.callback is None:
+            return
+        if trace is not None:
+            self.add_trace(trace)
+        if flags & FLAG_BATCHED:
+            data_list = BatchPacket.to_messages(payload)
+            if data_list is None:
+                EventLog.instance().error(self, Exception('malformed batch frame'))
+                self.close()
+                return
+            if self.codec is not None:
+                data_list = [self.codec.decode(data) for data in data_list]
+            self.callback.on_received_batch(self, channel, data_list)
+            count = len(data_list)
+        else:
+            if self.codec is not None:
+                payload = self.codec.decode(payload)
+            self.callback.on_channel_received(self, channel, payload)
+            count = 1
+        if self.metrics is not None:
+            self.metrics.messages_in += count
+        if trace is not None and trace[3] & TRACE_FLAG_ECHO:
+            self.send_trace_echo(channel, trace)
+
+    # trace header of a received frame with the read time moved to the sender's clock
+    def read_trace(self, payload):
+        trace_id, enqueue_time, write_time, trace_flags = Tracer.from_header(payload)
+        elapsed = time.monotonic() - self.read_time
+        return trace_id, enqueue_time, write_time, trace_flags, get_clock(trace_flags) - elapsed, self.read_time
+
+    def get_trace_stats_list(self):
+        if self.trace_stats is None:
+            self.trace_stats = TraceStats()
+        if self.tracer is None:
+            return [self.trace_stats]
+        return [self.trace_stats, self.tracer.stats]
+
+    def add_trace(self, trace):
+        trace_id, enqueue_time, write_time, trace_flags, read_time, loop_read_time = trace
+        dispatch_time = read_time + time.monotonic() - loop_read_time
+        for stats in self.get_trace_stats_list():
+            stats.add_trace(enqueue_time, write_time, read_time, dispatch_time)
+
+    def send_trace_echo(self, channel, trace):
+        trace_id, enqueue_time, write_time, trace_flags, read_time, loop_read_time = trace
+        hold = time.monotonic() - loop_read_time
+        with self.lock:
+            self.queue_frame(channel, MessageType.TRACE_ECHO, 0,
+                             Tracer.to_echo(trace_id, write_time, hold, trace_flags), Priority.HIGH)
+            self.schedule_pump()
+
+    def on_trace_echo(self, payload):
+        trace_id, write_time, hold, trace_flags = Tracer.from_echo(payload)
+        round_trip = get_clock(trace_flags) - write_time
+        for stats in self.get_trace_stats_list():
+            stats.add_echo(round_trip, hold)
+
+    def pause_writing(self):
+        self.is_write_paused = True
+
+    def resume_writing(self):
+        self.is_write_paused = False
+        self.pump()
+
+    def encode_header(self, channel, msg_type, flags, size):
+        if self.negotiated_version < PROTOCOL_VERSION_2:
+            return Preamble.to_preamble_packet(size)
+        return Preamble.to_preamble_packet(size, flags, msg_type, channel)
+
+    @staticmethod
+    def is_item_ready(item):
+        return item[4] is None or item[4].done()
+
+    # what the scheduler charges a priority class for the next frame of the item
+    def get_item_cost(self, item):
+        if isinstance(item[3], FileTransfer):
+            return item[3].get_slice_size() + SIZE_PACKET_LENGTH
+        if isinstance(item[3], FdMessage):
+            return len(item[3]) + SIZE_PACKET_LENGTH
+        return min(len(item[3]), self.chunk_size) + SIZE_PACKET_LENGTH
+
+    def pump(self):
+        with self.lock:
+            self.is_pump_scheduled = False
+            if self.pump_handle is not None:
+                self.pump_handle.cancel()
+                self.pump_handle = None
+            if self.transport is None or self.is_closing or self.negotiated_version is None or \
+                    self.is_file_sending or self.is_eof_sent:
+                return
+            if self.is_fd_waiting:
+                # the transport drained for a FLAG_FDS frame, back to the usual watermark
+                self.is_fd_waiting = False
+                self.transport.set_write_buffer_limits(high=self.write_buffer_limit)
+            scheduler = self.scheduler
+            if self.is_write_paused or len(scheduler) == 0:
+                return
+            # stop at the high-water mark so the scheduler, not the transport buffer, orders what is left
+            budget = self.transport.get_write_buffer_limits()[1] - self.transport.get_write_buffer_size()
+            start_budget = budget
+            frame_list = []
+            while len(scheduler) > 0 and (budget > 0 or len(frame_list) == 0):
+                item = scheduler.pop(AsyncTcpConnection.is_item_ready)
+                if item is None:
+                    # only channels waiting for off-loop compression are left
+                    break
+                channel, msg_type, flags, data, pending, priority, trace = item
+                if pending is not None:
+                    try:
+                        compressed = pending.result()
+                        if len(compressed) < len(data):
+                            flags |= FLAG_COMPRESSED
+                            data = compressed
+                    except Exception as e:
+                        EventLog.instance().error(self, e)
+                if self.negotiated_version >= PROTOCOL_VERSION_2:
+                    flags |= priority << FLAG_PRIORITY_SHIFT
+                if isinstance(data, FdMessage):
+                    if self.negotiated_version < PROTOCOL_VERSION_2:
+                        EventLog.instance().emit(EventType.ERROR, self, 'descriptors dropped, the connection does '
+                                                                        'not use protocol version 2')
+                        data.close()
+                        continue
+                    if len(frame_list) > 0:
+                        self.transport.writelines(frame_list)
+                        frame_list = []
+                    if self.transport.get_write_buffer_size() > 0:
+                        # the descriptors must ride on the frame's own bytes, resume_writing
+                        # (low-water mark 0) comes back once everything before it is out
+                        scheduler.push_front(channel, item, priority)
+                        self.is_fd_waiting = True
+                        self.transport.set_write_buffer_limits(high=0)
+                        return
+                    header = self.encode_header(channel, msg_type, flags, len(data))
+                    try:
+                        sent = data.send(self.fd_sock, header)
+                    except (BlockingIOError, InterruptedError):
+                        scheduler.push_front(channel, item, priority)
+                        self.loop.add_writer(self.fd_sock.fileno(), self.on_fd_writable)
+                        return
+                    if sent < SIZE_PACKET_LENGTH + len(data):
+                        # the descriptors went with the first byte, the rest is plain data
+                        self.transport.write((header + bytes(data.data))[sent:])
+                    data.close()
+                    self.sent_count += 1
+                    budget -= SIZE_PACKET_LENGTH + len(data)
+                    continue
+                if isinstance(data, FileTransfer):
+                    if self.negotiated_version >= PROTOCOL_VERSION_2:
+                        # one slice per frame, the transfer goes back to its channel after it
+                        size = data.get_slice_size()
+                        if data.sent + size < len(data):
+                            flags |= FLAG_FRAGMENT
+                        frame_list.append(self.encode_header(channel, msg_type, flags, size))
+                    elif len(data) > MAX_FILE_FRAME_SIZE:
+                        # queued before the handshake fell back to version 1
+                        EventLog.instance().emit(EventType.ERROR, self, 'file dropped, it exceeds the maximum '
+                                                                        'frame size of protocol version 1')
+                        data.close()
+                        self.dropped_count += 1
+                        continue
+                    else:
+                        frame_list.append(self.encode_header(channel, msg_type, flags, len(data)))
+                    if len(data) == 0:
+                        data.close()
+                        self.sent_count += 1
+                        continue
+                    # the transport refuses writes until the body (or slice) is out, hold the queue
+                    self.is_file_sending = True
+                    self.transport.writelines(frame_list)
+                    self.loop.create_task(self.send_file_body(
+                        data, item if self.negotiated_version >= PROTOCOL_VERSION_2 else None))
+                    return
+                if self.negotiated_version >= PROTOCOL_VERSION_2:
+                    if len(data) > self.chunk_size:
+                        # the rest waits for the channel's next turn, other frames can go in between
+                        view = memoryview(data)
+                        scheduler.push_front(channel, (channel, msg_type, flags, view[self.chunk_size:], None,
+                                                       priority, None), priority)
+                        data = view[:self.chunk_size]
+                        flags |= FLAG_FRAGMENT
+                    if trace is not None:
+                        # write time is taken here, as late as the frame can be stamped
+                        frame_list.append(self.encode_header(channel, msg_type, flags | FLAG_TRACED,
+                                                             SIZE_TRACE_HEADER + len(data)))
+                        frame_list.append(Tracer.to_header(trace))
+                        budget -= SIZE_TRACE_HEADER
+                    else:
+                        frame_list.append(self.encode_header(channel, msg_type, flags, len(data)))
+                else:
+                    frame_list.append(self.encode_header(channel, msg_type, flags, len(data)))
+                frame_list.append(data)
+                if not flags & FLAG_FRAGMENT and msg_type == MessageType.DATA:
+                    self.sent_count += 1
+                budget -= SIZE_PACKET_LENGTH + len(data)
+            if len(frame_list) > 0:
+                # one syscall for the whole tick, pause_writing follows if it crossed the high-water mark
+                self.transport.writelines(frame_list)
+            metrics = self.metrics
+            if metrics is not None:
+                metrics.bytes_out += start_budget - budget
+                metrics.write_buffer_depth.observe(self.transport.get_write_buffer_size())
+            if budget <= 0 and len(scheduler) > 0 and not self.is_write_paused:
+                # the socket took it all without pushing back, continue on the next iteration
+                self.is_pump_scheduled = True
+                self.loop.call_soon(self.pump)
+
+    def is_loop_thread(self):
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    # called by send from any thread, the frames go out once per loop iteration (or cork_delay)
+    def schedule_pump(self):
+        if self.loop is None:
+            return
+        if not self.coalesce_writes:
+            if self.is_loop_thread():
+                self.pump()
+            else:
+                self.loop.call_soon_threadsafe(self.pump)
+            return
+        with self.lock:
+            if self.is_pump_scheduled:
+                return
+            self.is_pump_scheduled = True
+        callback = self.start_cork if self.cork_delay > 0 else self.pump
+        # call_soon_threadsafe also writes to the loop's self-pipe, only needed from other threads
+        if self.is_loop_thread():
+            self.loop.call_soon(callback)
+        else:
+            self.loop.call_soon_threadsafe(callback)
+
+    def start_cork(self):
+        with self.lock:
+            if self.is_pump_scheduled and self.pump_handle is None:
+                self.pump_handle = self.loop.call_later(self.cork_delay, self.pump)
+
+    def on_compressed(self, future):
+        if self.loop is not None and not self.is_closing:
+            self.loop.call_soon_threadsafe(self.pump)
+
+    # compresses the frame (or starts compressing it) and queues it, call with the lock held
+    def queue_frame(self, channel, msg_type, flags, data, priority=Priority.NORMAL, trace=None):
+        pending = None
+        compressor = self.compressor
+        if compressor is not None and len(data) >= compressor.threshold and \
+                self.negotiated_version is not None and self.negotiated_version >= PROTOCOL_VERSION_2:
+            if len(data) >= compressor.offload_threshold:
+                pending = compressor.compress_async(data)
+                pending.add_done_callback(self.on_compressed)
+            else:
+                compressed = compressor.compress(data)
+                if len(compressed) < len(data):
+                    flags |= FLAG_COMPRESSED
+                    data = compressed
+        self.scheduler.push(channel, (channel, msg_type, flags, data, pending, priority, trace), priority)
+
+    # a batch is traced as one frame
+    def sample_trace(self, channel, payload):
+        if self.tracer is None:
+            return None
+        return self.tracer.sample(channel, payload)
+
+    def send(self, data, channel=0, priority=Priority.NORMAL):
+        if channel < 0 or channel > MAX_CHANNEL:
+            raise ValueError('channel out of range')
+        if priority < 0 or priority >= len(Priority):
+            raise ValueError('priority out of range')
+        state = State.SUCCESS
+        payload = data if self.codec is None else self.codec.encode(data)
+        trace = self.sample_trace(channel, payload)
+        with self.lock:
+            self.queue_frame(channel, MessageType.DATA, 0, payload, priority, trace)
+            self.schedule_pump()
+        try:
+            if self.callback is not None:
+                self.callback.on_sent(self, state, data)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+    def send_many(self, data_list, channel=0, priority=Priority.NORMAL):
+        if channel < 0 or channel > MAX_CHANNEL:
+            raise ValueError('channel out of range')
+        if priority < 0 or priority >= len(Priority):
+            raise ValueError('priority out of range')
+        state = State.SUCCESS
+        payload_list = data_list if self.codec is None else [self.codec.encode(data) for data in data_list]
+        with self.lock:
+            if self.negotiated_version is None or self.negotiated_version < PROTOCOL_VERSION_2:
+                for data in payload_list:
+                    self.queue_frame(channel, MessageType.DATA, 0, data, priority, self.sample_trace(channel, data))
+            else:
+                batch = []
+                batch_size = 0
+                for data in payload_list:
+                    if len(data) > MAX_BATCH_ENTRY:
+                        self.queue_batch(channel, batch, priority)
+                        batch = []
+                        batch_size = 0
+                        self.queue_frame(channel, MessageType.DATA, 0, data, priority,
+                                         self.sample_trace(channel, data))
+                        continue
+                    if len(batch) == MAX_BATCH_ENTRY or \
+                            (len(batch) > 0 and BatchPacket.get_packet_size(len(batch) + 1, batch_size + len(data)) >
+                             self.max_batch_size):
+                        self.queue_batch(channel, batch, priority)
+                        batch = []
+                        batch_size = 0
+                    batch.append(data)
+                    batch_size += len(data)
+                self.queue_batch(channel, batch, priority)
+            self.schedule_pump()
+        try:
+            if self.callback is not None:
+                for data in data_list:
+                    self.callback.on_sent(self, state, data)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+    def queue_batch(self, channel, batch, priority=Priority.NORMAL):
+        if len(batch) == 1:
+            self.queue_frame(channel, MessageType.DATA, 0, batch[0], priority, self.sample_trace(channel, batch[0]))
+        elif len(batch) > 1:
+            packet = BatchPacket.to_batch_packet(batch)
+            self.queue_frame(channel, MessageType.DATA, FLAG_BATCHED, packet, priority,
+                             self.sample_trace(channel, packet))
+
+    def send_fds(self, fds, data=b'', channel=0, priority=Priority.NORMAL):
+        if not self.pass_fds:
+            raise Exception('descriptors can only be passed on unix socket connections')
+        if channel < 0 or channel > MAX_CHANNEL:
+            raise ValueError('channel out of range')
+        if priority < 0 or priority >= len(Priority):
+            raise ValueError('priority out of range')
+        message = FdMessage(fds, data)
+        with self.lock:
+            self.scheduler.push(channel, (channel, MessageType.DATA, FLAG_FDS, message, None, priority, None),
+                                priority)
+            self.schedule_pump()
+
+    def send_file(self, path_or_fd, offset=0, count=None, progress_callback=None, channel=0,
+                  priority=Priority.NORMAL):
+        if channel < 0 or channel > MAX_CHANNEL:
+            raise ValueError('channel out of range')
+        if priority < 0 or priority >= len(Priority):
+            raise ValueError('priority out of range')
+        transfer = FileTransfer(path_or_fd, offset, count, progress_callback)
+        if self.negotiated_version == PROTOCOL_VERSION_1 and len(transfer) > MAX_FILE_FRAME_SIZE:
+            transfer.close()
+            raise ValueError('count exceeds the maximum frame size of protocol version 1')
+        with self.lock:
+            self.scheduler.push(channel, (channel, MessageType.DATA, 0, transfer, None, priority, None), priority)
+            self.schedule_pump()
+
+    # with item (version 2) only one slice is sent and the item is queued again for the next
+    async def send_file_body(self, transfer, item=None):
+        try:
+            while not transfer.is_done():
+                await transfer.send_slice(self.loop, self.transport)
+                if transfer.progress_callback is not None:
+                    try:
+                        transfer.progress_callback(self, transfer.sent, transfer.count)
+                    except Exception as e:
+                        EventLog.instance().error(self, e)
+                if item is not None:
+                    break
+        except Exception as e:
+            EventLog.instance().error(self, e)
+            # the peer is left in the middle of the frame
+            transfer.close()
+            self.close()
+            return
+        if not transfer.is_done():
+            with self.lock:
+                self.is_file_sending = False
+                if self.is_closing:
+                    transfer.close()
+                    return
+                self.scheduler.push_front(item[0], item, item[5])
+            self.pump()
+            return
+        transfer.close()
+        if self.metrics is not None:
+            self.metrics.bytes_out += transfer.sent
+        with self.lock:
+            self.is_file_sending = False
+            self.sent_count += 1
+        self.pump()
+
+    def connection_lost(self, exc):
+        self.is_lost = True
+        self.close()
+
+    # the peer is done sending, what is queued for it still goes out before the close
+    def eof_received(self):
+        if self.is_closing or self.is_eof_sent:
+            return False
+        self.is_eof_received = True
+        self.flush_close()
+        return True
+
+    # call on the loop thread, retries until the queue is empty
+    def flush_close(self):
+        with self.lock:
+            if self.is_closing or self.is_eof_sent:
+                return
+            if self.transport is not None and \
+                    (len(self.scheduler) > 0 or self.is_file_sending or self.negotiated_version is None):
+                self.pump()
+                self.loop.call_later(FLUSH_RETRY_DELAY, self.flush_close)
+                return
+            if not self.is_eof_received and self.transport is not None and self.transport.can_write_eof():
+                # the transport writes out its buffer first, the peer closes on the eof and
+                # what it already sent is still received
+                self.is_eof_sent = True
+                self.transport.write_eof()
+                return
+        self.close()
+
+    # True once the transport wrote everything and closed
+    def is_flushed(self):
+        return self.transport is None or self.is_lost
+
+    # closes without flushing, returns the bytes left in the transport buffer
+    def abort(self):
+        size = 0
+        if self.transport is not None and not self.is_lost:
+            size = self.transport.get_write_buffer_size()
+        self.close()
+        if self.transport is not None:
+            self.transport.abort()
+        return size
+
+    def close(self):
+        if not self.is_closing:
+            self.handle_close()
+
+    def error_received(self, exc):
+        if not self.is_closing:
+            self.handle_close()
+
+    def handle_close(self):
+        try:
+            self.is_closing = True
+            for entry in self.fragment_map.values():
+                if entry[2] is not None:
+                    entry[2].close()
+            self.fragment_map = {}
+            self.trace_map = {}
+            self.spool_trace_queue.clear()
+            self.decoder.reset()
+            with self.lock:
+                for item in self.scheduler.clear():
+                    self.dropped_count += 1
+                    if isinstance(item[3], FileTransfer) or isinstance(item[3], FdMessage):
+                        item[3].close()
+            while len(self.fd_list_queue) > 0:
+                for fd in self.fd_list_queue.popleft():
+                    os.close(fd)
+            if self.handshake_handle is not None:
+                self.handshake_handle.cancel()
+                self.handshake_handle = None
+            if self.transport is not None:
+                if self.loop is None or self.is_loop_thread():
+                    self.close_transport()
+                else:
+                    # the transport only tells the socket on the loop, wake it up
+                    self.loop.call_soon_threadsafe(self.close_transport)
+            AsyncController.instance().discard(self)
+            MetricsRegistry.instance().release(self.metrics)
+            if self.callback is not None:
+                self.callback.on_disconnect(self)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+    def close_transport(self):
+        if self.fd_sock is not None:
+            self.loop.remove_reader(self.fd_sock.fileno())
+            self.loop.remove_writer(self.fd_sock.fileno())
+            self.fd_sock.close()
+            self.fd_sock = None
+        self.transport.close()
+
+    # counters kept by the connection itself, collected by the MetricsRegistry
+    def get_metrics_source(self):
+        return {'messages_out': self.sent_count, 'dropped': self.dropped_count, 'resync': self.decoder.resync_count}
+
+    def get_trace_stats(self):
+        return self.trace_stats
+
+    def get_negotiated_version(self):
+        return self.negotiated_version
+
+    def gethostbyname(self, arg):
+        return self.sock.gethostbyname(arg)
+
+    def gethostname(self):
+        return self.sock.gethostname()
@@ -0,0 +1,298 @@
+#!/usr/bin/python
+"""
+@file async_tcp_relay.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Asynchronous TCP Relay Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Asynchronous TCP Relay Class.
+"""
+import asyncio
+import socket
+import threading
+
+from .async_controller import AsyncController
+from .callback_interface import *
+from .server_conf import *
+from .frame_decoder import FrameScanner
+from .event_log import *
+import copy
+
+# direction index of AsyncTcpRelay.frame_counts/byte_counts
+RELAY_UPSTREAM = 0  # downstream client -> upstream server
+RELAY_DOWNSTREAM = 1  # upstream server -> downstream client
+
+'''
+Interfaces
+variables
+- addr
+- peer # the other side of the pair, None until the upstream connection is made
+functions
+- def close() # close both sides
+'''
+
+
+class AsyncTcpRelaySocket(asyncio.Protocol):
+    # downstream sockets are created by the relay's protocol factory, upstream ones with their peer
+    def __init__(self, relay, peer=None):
+        self.is_closing = False
+        self.relay = relay
+        self.peer = peer
+        self.transport = None
+        self.sock = None
+        self.addr = None
+        self.direction = RELAY_UPSTREAM if peer is None else RELAY_DOWNSTREAM
+        self.scanner = FrameScanner(relay.max_message_size)
+        # received before the upstream connection was made
+        self.pending_list = []
+
+    def connection_made(self, transport):
+        try:
+            self.transport = transport
+            self.sock = transport.get_extra_info('socket')
+            self.addr = transport.get_extra_info('peername')
+            if self.relay.no_delay:
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.peer is None:
+                if not self.relay.acceptor.on_accept(self.relay, self.addr):
+                    self.is_closing = True
+                    transport.close()
+                    return
+                # nothing to forward to yet
+                transport.pause_reading()
+                AsyncController.instance().add(self)
+                self.relay.add_socket(self)
+                self.relay.loop.create_task(self.relay.connect_upstream(self))
+                return
+            if self.peer.is_closing:
+                self.is_closing = True
+                transport.close()
+                return
+            self.peer.peer = self
+            AsyncController.instance().add(self)
+            for data in self.peer.pending_list:
+                transport.write(data)
+            self.peer.pending_list = []
+            self.peer.transport.resume_reading()
+        except Exception as e:
+            EventLog.instance().error(self, e)
+            self.is_closing = True
+            transport.close()
+
+    def data_received(self, data):
+        try:
+            self.relay.frame_counts[self.direction] += self.scanner.feed(data)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+            self.close()
+            return
+        self.relay.byte_counts[self.direction] += len(data)
+        if self.peer is None or self.peer.transport is None:
+            self.pending_list.append(data)
+        else:
+            # the bytes go out as they came in, frames are never decoded or rebuilt
+            self.peer.transport.write(data)
+
+    # the transport of this side is full, stop reading from the other side until it drains
+    def pause_writing(self):
+        if self.peer is not None and self.peer.transport is not None:
+            self.peer.transport.pause_reading()
+
+    def resume_writing(self):
+        if self.peer is not None and self.peer.transport is not None and not self.peer.is_closing:
+            self.peer.transport.resume_reading()
+
+    def connection_lost(self, exc):
+        self.close()
+
+    def close(self):
+        if self.is_closing:
+            return
+        try:
+            is_loop_thread = asyncio.get_running_loop() is self.relay.loop
+        except RuntimeError:
+            is_loop_thread = False
+        if is_loop_thread:
+            self.handle_close()
+        else:
+            # both transports belong to the loop
+            self.relay.loop.call_soon_threadsafe(self.close)
+
+    def handle_close(self):
+        try:
+            self.is_closing = True
+            self.pending_list = []
+            if self.transport is not None:
+                # buffered bytes are still flushed
+                self.transport.close()
+            AsyncController.instance().discard(self)
+            if self.peer is not None:
+                self.peer.close()
+            if self.direction == RELAY_UPSTREAM:
+                self.relay.discard_socket(self)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+
+'''
+Interfaces
+variables
+- port
+- callback
+- acceptor
+- frame_counts # frames forwarded per direction (RELAY_UPSTREAM, RELAY_DOWNSTREAM)
+- byte_counts # bytes forwarded per direction
+functions
+- def close() # close the relay and every pair
+- def get_socket_list() # downstream sockets
+- def get_stats()
+infos
+- every accepted (downstream) socket is paired with a new connection to upstream,
+  a (hostname, port) or a function upstream(relay, addr) returning one
+- bytes are forwarded as they are read, the framing (see FrameScanner) is only walked
+  to count frames and reject frames above max_message_size, so the handshake, flags,
+  channels and compressed or batched payloads pass through untouched and both ends
+  negotiate with each other as if connected directly
+- a side whose transport is above its high-water mark pauses reading on the other side
+- callback.on_accepted gets the downstream AsyncTcpRelaySocket, acceptor.on_accept
+  decides as for AsyncTcpServer (get_socket_callback is not used)
+'''
+
+
+class AsyncTcpRelay(object):
+    def __init__(self, port, upstream, callback, acceptor, bind_addr='', no_delay=True, max_message_size=None):
+        self.is_closing = False
+        self.lock = threading.RLock()
+        self.sock_set = set([])
+
+        self.acceptor = None
+        if acceptor is not None and isinstance(acceptor, IAcceptor):
+            self.acceptor = acceptor
+        else:
+            raise Exception('acceptor is None or not an instance of IAcceptor class')
+        self.callback = None
+        if callback is not None and isinstance(callback, ITcpServerCallback):
+            self.callback = callback
+        else:
+            raise Exception('callback is None or not an instance of ITcpServerCallback class')
+
+        self.port = port
+        self.upstream = upstream
+        self.no_delay = no_delay
+        self.max_message_size = max_message_size
+        self.frame_counts = [0, 0]
+        self.byte_counts = [0, 0]
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        self.sock.bind((bind_addr, port))
+        self.sock.listen(5)
+        if self.port == 0:
+            self.port = self.sock.getsockname()[1]
+
+        AsyncController.instance().add(self)
+
+        self.loop = asyncio.get_event_loop()
+        coro = self.loop.create_server(lambda: AsyncTcpRelaySocket(self), sock=self.sock)
+        AsyncController.instance().pause()
+        self.server = self.loop.run_until_complete(coro)
+        AsyncController.instance().resume()
+
+        if self.callback is not None:
+            self.callback.on_started(self)
+
+    async def connect_upstream(self, downstream):
+        try:
+            if callable(self.upstream):
+                hostname, port = self.upstream(self, downstream.addr)
+            else:
+                hostname, port = self.upstream
+            await self.loop.create_connection(lambda: AsyncTcpRelaySocket(self, downstream), hostname, port)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+            downstream.close()
+
+    def add_socket(self, sock_obj):
+        with self.lock:
+            self.sock_set.add(sock_obj)
+        if self.callback is not None:
+            self.callback.on_accepted(self, sock_obj)
+
+    def close(self):
+        if not self.is_closing:
+            self.handle_close()
+
+    def handle_close(self):
+        try:
+            EventLog.instance().emit(EventType.CLOSE, self, 'asyncTcpRelay close called')
+            self.is_closing = True
+            with self.lock:
+                delete_set = copy.copy(self.sock_set)
+                for item in delete_set:
+                    item.close()
+                self.sock_set = set([])
+            if self.loop.is_running() and not self.is_loop_thread():
+                # asyncio.Server is not thread-safe, the loop closes it
+                self.loop.call_soon_threadsafe(self.close_server)
+            else:
+                self.close_server()
+            AsyncController.instance().discard(self)
+            if self.callback is not None:
+                self.callback.on_stopped(self)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+    def close_server(self):
+        self.server.close()
+
+    def is_loop_thread(self):
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def discard_socket(self, sock):
+        with self.lock:
+            self.sock_set.discard(sock)
+
+    def get_socket_list(self):
+        with self.lock:
+            return list(self.sock_set)
+
+    def get_stats(self):
+        with self.lock:
+            connection_count = len(self.sock_set)
+        return {'connections': connection_count,
+                'upstream_frames': self.frame_counts[RELAY_UPSTREAM],
+                'upstream_bytes': self.byte_counts[RELAY_UPSTREAM],
+                'downstream_frames': self.frame_counts[RELAY_DOWNSTREAM],
+                'downstream_bytes': self.byte_counts[RELAY_DOWNSTREAM]}
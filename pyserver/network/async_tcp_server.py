@@ -38,14 +38,14 @@ AsyncTcpServer Class.
 import asyncio
 import socket
 import threading
-from collections import deque
 
 from .async_controller import AsyncController
+from .listener_handoff import *
+from .async_tcp_connection import *
 from .callback_interface import *
 from .server_conf import *
 from .preamble import *
-# noinspection PyDeprecation
-import traceback
+from .event_log import *
 import copy
 
 '''
@@ -54,108 +54,44 @@ variable
 - addr
 - callback
 function
-- def send(data)
+- def send(data, channel=0, priority=Priority.NORMAL)
+- def send_many(data_list, channel=0, priority=Priority.NORMAL)
+- def send_file(path_or_fd, offset=0, count=None, progress_callback=None, channel=0, priority=Priority.NORMAL)
+- def send_fds(fds, data=b'', channel=0, priority=Priority.NORMAL) # AsyncUnixServer sockets only
 - def close() # close the socket
 '''
 
 
-class AsyncTcpSocket(asyncio.Protocol):
-    def __init__(self, server, transport, addr, callback):
+class AsyncTcpSocket(AsyncTcpConnection):
+    # created by the server's protocol factory, the acceptor decides in connection_made
+    def __init__(self, server):
+        AsyncTcpConnection.__init__(self, **server.connection_options)
         self.server = server
-        self.is_closing = False
-        self.callback = None
-        if callback is not None and isinstance(callback, ITcpSocketCallback):
-            self.callback = callback
-        else:
-            raise Exception('callback is None or not an instance of ITcpSocketCallback class')
-        self.sock = transport.get_extra_info('socket')
-        self.addr = addr
-        self.transport = transport
-        self.recv_buffer = []
-        self.transport_dict = {'packet': None, 'type': PacketType.SIZE, 'size': SIZE_PACKET_LENGTH, 'offset': 0}
-        self.send_queue = deque()  # thread-safe queue
-        if self.server.no_delay:
-            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-        AsyncController.instance().add(self)
-        if callback is not None:
-            self.callback.on_newconnection(self, None)
 
-    def data_received(self, data):
+    def connection_made(self, transport):
         try:
-            if data is None or len(data) == 0:
+            addr = transport.get_extra_info('peername')
+            if not self.server.acceptor.on_accept(self.server, addr):
+                self.is_closing = True
+                transport.close()
                 return
-
-            self.recv_buffer.concat(data)
-            data = self.recv_buffer[:self.transport_dict['size']]
-            self.recv_buffer = self.recv_buffer[self.transport_dict['size']:]
-
-            if self.transport_dict['packet'] is None:
-                self.transport_dict['packet'] = data
-            else:
-                self.transport_dict['packet'] += data
-            read_size = len(data)
-            if read_size < self.transport_dict['size']:
-                self.transport_dict['offset'] += read_size
-                self.transport_dict['size'] -= read_size
-            else:
-                if self.transport_dict['type'] == PacketType.SIZE:
-                    should_receive = Preamble.to_should_receive(self.transport_dict['packet'])
-                    if should_receive < 0:
-                        preamble_offset = Preamble.check_preamble(self.transport_dict['packet'])
-                        self.transport_dict['offset'] = len(self.transport_dict['packet']) - preamble_offset
-                        self.transport_dict['size'] = preamble_offset
-                        # self.transport_dict['packet'] = self.transport_dict['packet'][
-                        #                           len(self.transport_dict['packet']) - preamble_offset:]
-                        self.transport_dict['packet'] = self.transport_dict['packet'][preamble_offset:]
-                        return
-                    self.transport_dict = {'packet': None, 'type': PacketType.DATA, 'size': should_receive, 'offset': 0}
-                else:
-                    receive_packet = self.transport_dict
-                    self.transport_dict = {'packet': None, 'type': PacketType.SIZE, 'size': SIZE_PACKET_LENGTH, 'offset': 0}
-                    self.callback.on_received(self, receive_packet['packet'])
+            self.set_callback(self.server.acceptor.get_socket_callback())
+            self.addr = addr
+            self.start_connection(transport)
+            if self.server.no_delay:
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            AsyncController.instance().add(self)
+            self.callback.on_newconnection(self, None)
+            self.server.add_socket(self)
         except Exception as e:
-            print(e)
-            traceback.print_exc()
-
-    def connection_lost(self, exc):
-        self.close()
-
-    def close(self):
-        if not self.is_closing:
-            self.handle_close()
-
-    def error_received(self, exc):
-        if not self.is_closing:
-            self.handle_close()
-
-    def handle_close(self):
-        try:
-            print('asyncTcpSocket close called')
+            EventLog.instance().error(self, e)
             self.is_closing = True
-            self.transport.close()
-            self.server.discard_socket(self)
-            AsyncController.instance().discard(self)
-            if self.callback is not None:
-                self.callback.on_disconnect(self)
-        except Exception as e:
-            print(e)
-            traceback.print_exc()
+            transport.close()
 
-    def send(self, data):
-        state = State.SUCCESS
-        self.transport.write({'data': Preamble.to_preamble_packet(len(data)) + data, 'offset': 0})
-        try:
-            if self.callback is not None:
-                self.callback.on_sent(self, state, data)
-        except Exception as e:
-            print(e)
-            traceback.print_exc()
-
-    def gethostbyname(self, arg):
-        return self.sock.gethostbyname(arg)
-
-    def gethostname(self):
-        return self.sock.gethostname()
+    def handle_close(self):
+        EventLog.instance().emit(EventType.CLOSE, self, 'asyncTcpSocket close called')
+        AsyncTcpConnection.handle_close(self)
+        self.server.discard_socket(self)
 
 
 '''
@@ -165,14 +101,31 @@ variables
 - acceptor
 functions
 - def close() # close the socket
+- def drain(deadline=DEFAULT_DRAIN_DEADLINE) # stop accepting, close after the sockets or the deadline
 - def getSockList()
 - def shutdownAllClient()
+infos
+- a server created in a process started by a listener handoff accepts on the inherited
+  listening socket of the same address (see ListenerHandoff)
+- protocol_version/handshake_timeout/compressor/max_batch_size/coalesce_writes/cork_delay/
+  chunk_size/priority_weights/write_buffer_limit/max_message_size/spool_threshold/
+  spool_mode/spool_dir/codec/tracer
+  apply to every accepted socket (see AsyncTcpConnection)
 '''
 
 
-class AsyncTcpServer(asyncio.Protocol):
-    def __init__(self, port, callback, acceptor, bind_addr='', no_delay=True):
+class AsyncTcpServer(object):
+    def __init__(self, port, callback, acceptor, bind_addr='', no_delay=True, protocol_version=PROTOCOL_VERSION_1,
+                 handshake_timeout=DEFAULT_HANDSHAKE_TIMEOUT, compressor=None, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 coalesce_writes=True, cork_delay=0.0, chunk_size=DEFAULT_CHUNK_SIZE,
+                 priority_weights=DEFAULT_PRIORITY_WEIGHTS, write_buffer_limit=None, max_message_size=None,
+                 spool_threshold=None, spool_mode=SpoolMode.MMAP, spool_dir=None, codec=None,
+                 tracer=None):
         self.is_closing = False
+        self.is_draining = False
+        self.is_handed_off = False
+        self.drain_handle = None
+        self.stopped_event = threading.Event()
         self.lock = threading.RLock()
         self.sock_set = set([])
 
@@ -189,39 +142,64 @@ class AsyncTcpServer(asyncio.Protocol):
 
         self.port = port
         self.no_delay = no_delay
-
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-
-        self.sock.bind((bind_addr, port))
-        self.sock.listen(5)
+        self.connection_options = {'protocol_version': protocol_version,
+                                   'handshake_timeout': handshake_timeout,
+                                   'compressor': compressor,
+                                   'max_batch_size': max_batch_size,
+                                   'coalesce_writes': coalesce_writes,
+                                   'cork_delay': cork_delay,
+                                   'chunk_size': chunk_size,
+                                   'priority_weights': priority_weights,
+                                   'write_buffer_limit': write_buffer_limit,
+                                   'max_message_size': max_message_size,
+                                   'spool_threshold': spool_threshold,
+                                   'spool_mode': spool_mode,
+                                   'spool_dir': spool_dir,
+                                   'codec': codec,
+                                   'tracer': tracer}
+
+        self.listener_key = self.get_listener_key(bind_addr)
+        self.sock = ListenerHandoff.instance().take_listener(self.listener_key)
+        if self.sock is None:
+            self.sock = self.create_socket(bind_addr)
+        elif self.port == 0:
+            self.port = self.sock.getsockname()[1]
 
         AsyncController.instance().add(self)
-        
+        ListenerHandoff.instance().add(self)
+
         self.loop = asyncio.get_event_loop()
-        # coro = self.loop.create_server(lambda: self, sock=self.sock)
-        # (self.server,_)=self.loop.run_until_complete(coro)
-        self.server = self.loop.create_server(lambda: self, sock=self.sock)
+        coro = self.loop.create_server(self.create_protocol, sock=self.sock)
+        AsyncController.instance().pause()
+        self.server = self.loop.run_until_complete(coro)
+        AsyncController.instance().resume()
 
         if self.callback is not None:
             self.callback.on_started(self)
 
-    def connection_made(self, transport):
-        try:
-            if transport is not None:
-                addr = transport.get_extra_info('peername')
-                if not self.acceptor.on_accept(self, addr):
-                    transport.close()
-                else:
-                    sockcallback = self.acceptor.get_socket_callback()
-                    sock_obj = AsyncTcpSocket(self, transport, addr, sockcallback)
-                    with self.lock:
-                        self.sock_set.add(sock_obj)
-                    if self.callback is not None:
-                        self.callback.on_accepted(self, sock_obj)
-        except Exception as e:
-            print(e)
-            traceback.print_exc()
+    # listening socket, overridden by the unix socket server
+    def create_socket(self, bind_addr):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        sock.bind((bind_addr, self.port))
+        sock.listen(5)
+        if self.port == 0:
+            self.port = sock.getsockname()[1]
+        return sock
+
+    def create_protocol(self):
+        return AsyncTcpSocket(self)
+
+    # matches the listening socket across a handoff
+    def get_listener_key(self, bind_addr):
+        return '%s:%d' % (bind_addr, self.port)
+
+    def add_socket(self, sock_obj):
+        with self.lock:
+            self.sock_set.add(sock_obj)
+        if self.callback is not None:
+            self.callback.on_accepted(self, sock_obj)
 
     def close(self):
         if not self.is_closing:
@@ -231,27 +209,63 @@ class AsyncTcpServer(asyncio.Protocol):
         if not self.is_closing:
             self.handle_close()
 
+    def drain(self, deadline=DEFAULT_DRAIN_DEADLINE):
+        with self.lock:
+            if self.is_closing or self.is_draining:
+                return
+            self.is_draining = True
+        self.loop.call_soon_threadsafe(self.start_drain, deadline)
+
+    def start_drain(self, deadline):
+        EventLog.instance().emit(EventType.INFO, self, 'asyncTcpServer drain called')
+        self.server.close()
+        with self.lock:
+            if len(self.sock_set) > 0:
+                self.drain_handle = self.loop.call_later(deadline, self.close)
+                return
+        self.close()
+
     def handle_close(self):
         try:
-            print('asyncTcpServer close called')
+            EventLog.instance().emit(EventType.CLOSE, self, 'asyncTcpServer close called')
             self.is_closing = True
             with self.lock:
                 delete_set = copy.copy(self.sock_set)
                 for item in delete_set:
                     item.close()
                 self.sock_set = set([])
-            self.server.close()
+            if self.loop.is_running() and not self.is_loop_thread():
+                # asyncio.Server is not thread-safe, the loop closes it
+                self.loop.call_soon_threadsafe(self.close_server)
+            else:
+                self.close_server()
             AsyncController.instance().discard(self)
+            ListenerHandoff.instance().discard(self)
             if self.callback is not None:
                 self.callback.on_stopped(self)
         except Exception as e:
-            print(e)
-            traceback.print_exc()
+            EventLog.instance().error(self, e)
+        self.stopped_event.set()
+
+    def close_server(self):
+        if self.drain_handle is not None:
+            self.drain_handle.cancel()
+            self.drain_handle = None
+        self.server.close()
+
+    def is_loop_thread(self):
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
 
     def discard_socket(self, sock):
-        print('asyncTcpServer discard socket called')
+        EventLog.instance().emit(EventType.INFO, sock, 'asyncTcpServer discard socket called')
         with self.lock:
             self.sock_set.discard(sock)
+            is_drained = self.is_draining and len(self.sock_set) == 0
+        if is_drained:
+            self.close()
 
     def shutdown_all(self):
         with self.lock:
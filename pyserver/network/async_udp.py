@@ -37,9 +37,14 @@ AsyncUDP Class.
 """
 import asyncio
 import socket
-import traceback
+import time
 from .callback_interface import *
 from .async_controller import AsyncController
+from .socket_buffer import *
+from .paced_sender import *
+from .server_conf import *
+from .metrics import MetricsRegistry
+from .event_log import *
 
 IP_MTU_DISCOVER = 10
 IP_PMTUDISC_DONT = 0  # Never send DF frames.
@@ -47,20 +52,35 @@ IP_PMTUDISC_WANT = 1  # Use per route hints.
 IP_PMTUDISC_DO = 2  # Always DF.
 IP_PMTUDISC_PROBE = 3  # Ignore dst pmtu.
 
+MAX_DATAGRAM_SIZE = 65535
+MAX_READ_PER_EVENT = 64
+
 '''
 Interfaces
 variables
 - callback
 functions
-- def send(host,port,data)
+- def send(host,port,data,priority=Priority.NORMAL)
 - def close() # close the socket
+- def get_socket_stats() # drops, queue depth and buffer sizes
+- def enable_pacing(rate, burst, queue_size, drop_policy) # send through a token-bucket PacedSender
+- def disable_pacing()
+infos
+- recv_buffer_size/send_buffer_size set SO_RCVBUF/SO_SNDBUF
+- count_drops=True reads the kernel drop counter (SO_RXQ_OVFL) with every datagram
+- auto_tune_buffer=True doubles SO_RCVBUF up to max_buffer_size whenever drops are seen
 '''
 
 
 class AsyncUDP(asyncio.Protocol):
-    def __init__(self, port, callback, bindaddress=''):
+    def __init__(self, port, callback, bindaddress='', recv_buffer_size=None, send_buffer_size=None,
+                 count_drops=False, auto_tune_buffer=False, max_buffer_size=DEFAULT_MAX_BUFFER_SIZE):
         # self.lock = threading.RLock()
         self.MAX_MTU = 1500
+        self.is_closing = False
+        self.paced_sender = None
+        self.metrics = None
+        self.count_drops = count_drops or auto_tune_buffer
         self.callback = None
         self.port = port
         if callback is not None and isinstance(callback, IUdpCallback):
@@ -72,19 +92,34 @@ class AsyncUDP(asyncio.Protocol):
             self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
             self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.sock.bind((bindaddress, port))
+            self.socket_buffer = SocketBuffer(self.sock, recv_buffer_size, send_buffer_size, auto_tune_buffer,
+                                              max_buffer_size)
+            if self.count_drops:
+                self.count_drops = self.socket_buffer.enable_drop_counter()
         except Exception as e:
-            print(e)
-            traceback.print_exc()
+            EventLog.instance().error(self, e)
         
         self.transport = None
+        self.metrics = MetricsRegistry.instance().create('udp', str((bindaddress, port)))
+        if self.metrics is not None:
+            self.metrics.set_source(self.get_metrics_source)
         AsyncController.instance().add(self)
         if self.callback is not None:
             self.callback.on_started(self)
 
         self.loop = asyncio.get_event_loop()
-        coro = self.loop.create_datagram_endpoint(lambda: self, sock=self.sock)
+        self.use_recvmsg = self.count_drops
+        if self.use_recvmsg:
+            # the transport reads with recvfrom which loses the ancillary data, so it only sends
+            # (through a duplicate of the socket) and the original socket is read with recvmsg
+            coro = self.loop.create_datagram_endpoint(lambda: self, sock=self.sock.dup())
+        else:
+            coro = self.loop.create_datagram_endpoint(lambda: self, sock=self.sock)
         AsyncController.instance().pause()
         (self.transport, _) = self.loop.run_until_complete(coro)
+        if self.use_recvmsg:
+            self.transport.pause_reading()
+            self.loop.add_reader(self.sock.fileno(), self.read_ready)
         AsyncController.instance().resume()
 
     # Even though UDP is connectionless this is called when it binds to a port
@@ -92,41 +127,102 @@ class AsyncUDP(asyncio.Protocol):
         self.transport = transport
 
     # This is called everytime there is something to read
-    def data_received(self, data, addr):
+    def datagram_received(self, data, addr):
+        metrics = self.metrics
         try:
-            if data and self.callback_obj is not None:
-                self.callback_obj.on_received(self, addr, data)
+            if data and self.callback is not None:
+                if metrics is None:
+                    self.callback.on_received(self, addr, data)
+                    return
+                start = time.perf_counter()
+                self.callback.on_received(self, addr, data)
+                metrics.callback_seconds.observe(time.perf_counter() - start)
+                metrics.reads += 1
+                metrics.messages_in += 1
+                metrics.bytes_in += len(data)
         except Exception as e:
-            print(e)
-            traceback.print_exc()
+            EventLog.instance().error(self, e)
+
+    # Called by the loop instead of the transport when count_drops is enabled
+    def read_ready(self):
+        anc_buffer_size = SocketBuffer.get_ancillary_size()
+        for _ in range(MAX_READ_PER_EVENT):
+            try:
+                data, ancdata, flags, addr = self.sock.recvmsg(MAX_DATAGRAM_SIZE, anc_buffer_size)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                self.error_received(e)
+                return
+            self.socket_buffer.update(ancdata)
+            self.datagram_received(data, addr)
+
+    def get_socket_stats(self):
+        return self.socket_buffer.get_stats()
+
+    # counters kept by the socket buffer, collected by the MetricsRegistry
+    def get_metrics_source(self):
+        return {'dropped': self.socket_buffer.drop_count}
 
     def connection_lost(self, exc):
         self.close()
 
     def close(self):
-        self.handle_close()
+        if not self.is_closing:
+            self.handle_close()
 
     def error_received(self, exc):
-        self.handle_close()
+        if not self.is_closing:
+            self.handle_close()
 
     def handle_close(self):
-        print('asyncUdp close called')
+        EventLog.instance().emit(EventType.CLOSE, self, 'asyncUdp close called')
+        self.is_closing = True
+        self.disable_pacing()
+        if self.use_recvmsg:
+            self.loop.remove_reader(self.sock.fileno())
+            self.sock.close()
         self.transport.close()
         AsyncController.instance().discard(self)
+        MetricsRegistry.instance().release(self.metrics)
         try:
             if self.callback is not None:
                 self.callback.on_stopped(self)
         except Exception as e:
-            print(e)
-            traceback.print_exc()
+            EventLog.instance().error(self, e)
 
     # noinspection PyMethodOverriding
-    def send(self, hostname, port, data):
+    # priority is only used when pacing is enabled, returns False if the pacing queue dropped the data
+    def send(self, hostname, port, data, priority=Priority.NORMAL):
         if len(data) <= self.MAX_MTU:
+            metrics = self.metrics
+            if metrics is not None:
+                metrics.messages_out += 1
+                metrics.bytes_out += len(data)
+            if self.paced_sender is not None:
+                return self.paced_sender.send(hostname, port, data, priority)
             self.transport.sendto(data, (hostname, port))
+            return True
         else:
             raise ValueError("The data size is too large")
 
+    # rate/burst in bytes, use paced_sender.set_destination_rate() to also pace single destinations
+    def enable_pacing(self, rate, burst, queue_size=1024, drop_policy=DropPolicy.DROP_OLDEST):
+        self.disable_pacing()
+        self.paced_sender = PacedSender(self, rate, burst, queue_size, drop_policy)
+        return self.paced_sender
+
+    def disable_pacing(self):
+        paced_sender = self.paced_sender
+        self.paced_sender = None
+        if paced_sender is not None:
+            paced_sender.close()
+
+    def get_pacing_stats(self):
+        if self.paced_sender is None:
+            return None
+        return self.paced_sender.get_stats()
+
     def gethostbyname(self, arg):
         return self.sock.gethostbyname(arg)
 
@@ -0,0 +1,240 @@
+#!/usr/bin/python
+"""
+@file async_udp_group.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief AsyncUDPGroup Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+AsyncUDPGroup Class.
+"""
+import asyncio
+import multiprocessing
+import os
+import socket
+import threading
+
+from .callback_interface import *
+from .async_controller import AsyncController
+from .event_log import *
+
+STAT_RECEIVED = 0
+STAT_RECEIVED_BYTES = 1
+STAT_SENT = 2
+STAT_SENT_BYTES = 3
+STAT_SIZE = 4
+
+'''
+Interfaces
+variables
+- callback
+- worker_count
+functions
+- def close() # stop every worker and close its socket
+- def get_stats() # list of per-worker counters
+- def get_total_stats() # counters summed over the workers
+infos
+- every worker binds its own SO_REUSEPORT socket to the same port and runs its
+  own event loop, the kernel spreads the flows (by address hash) across them
+- on_received is called on the worker's thread (or process) with the
+  AsyncUDPReceiver of that worker, reply with receiver.send(hostname,port,data)
+- use_process=True runs the workers in spawned processes so the callback is not
+  bound to one GIL, the callback object is pickled into each worker process (its
+  class must be importable there, scripts need the __main__ guard) and the worker
+  starts with fresh EventLog and AsyncController singletons of its own
+'''
+
+
+class AsyncUDPReceiver(asyncio.DatagramProtocol):
+    def __init__(self, group, worker_id, loop):
+        self.MAX_MTU = group.MAX_MTU
+        self.group = group
+        self.worker_id = worker_id
+        self.callback = group.callback
+        self.loop = loop
+        self.transport = None
+        self.stats = group.stats
+        self.stat_offset = worker_id * STAT_SIZE
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.stats[self.stat_offset + STAT_RECEIVED] += 1
+        self.stats[self.stat_offset + STAT_RECEIVED_BYTES] += len(data)
+        try:
+            if data:
+                self.callback.on_received(self, addr, data)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+    def error_received(self, exc):
+        EventLog.instance().error(self, exc)
+
+    def send(self, hostname, port, data):
+        if len(data) <= self.MAX_MTU:
+            self.transport.sendto(data, (hostname, port))
+            self.stats[self.stat_offset + STAT_SENT] += 1
+            self.stats[self.stat_offset + STAT_SENT_BYTES] += len(data)
+        else:
+            raise ValueError("The data size is too large")
+
+
+class AsyncUDPGroup(object):
+    def __init__(self, port, callback, worker_count=None, bindaddress='', use_process=False):
+        self.MAX_MTU = 1500
+        self.is_closing = False
+        self.port = port
+        self.bindaddress = bindaddress
+        self.callback = None
+        if callback is not None and isinstance(callback, IUdpCallback):
+            self.callback = callback
+        else:
+            raise Exception('callback is None or not an instance of IUdpCallback class')
+        if not hasattr(socket, 'SO_REUSEPORT'):
+            raise Exception('SO_REUSEPORT is not supported on this platform')
+        self.worker_count = worker_count
+        if self.worker_count is None:
+            self.worker_count = os.cpu_count() or 1
+        self.use_process = use_process
+
+        # one counter slot per worker, each slot is only written by its own worker
+        self.stats = multiprocessing.RawArray('Q', self.worker_count * STAT_SIZE)
+
+        # bind every socket before any worker starts so the kernel balances over all of them at once
+        self.sock_list = []
+        for _ in range(self.worker_count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            # with port 0 the first bind picks the port the others share
+            sock.bind((bindaddress, self.port))
+            sock.setblocking(False)
+            self.sock_list.append(sock)
+            self.port = sock.getsockname()[1]
+
+        self.stop_pipe_list = []
+        self.worker_list = []
+        # a spawned worker takes a while to import, return once every worker reads its socket
+        context = multiprocessing.get_context('spawn')
+        ready_list = []
+        for worker_id in range(self.worker_count):
+            # the read end of a Pipe, unlike a bare descriptor, can be handed to a spawned process
+            stop_read, stop_write = multiprocessing.Pipe(duplex=False)
+            self.stop_pipe_list.append(stop_write)
+            ready = context.Event()
+            ready_list.append(ready)
+            args = (worker_id, self.sock_list[worker_id], stop_read, ready)
+            if self.use_process:
+                # not fork, the child would inherit the locks and singletons of threads it does not have
+                worker = context.Process(target=self.run_worker, args=args, daemon=True)
+            else:
+                worker = threading.Thread(target=self.run_worker, args=args, daemon=True)
+            worker.start()
+            self.worker_list.append(worker)
+            if self.use_process:
+                # the worker process owns its copies now
+                stop_read.close()
+                self.sock_list[worker_id].close()
+        for ready in ready_list:
+            ready.wait()
+
+        AsyncController.instance().add(self)
+        if self.callback is not None:
+            self.callback.on_started(self)
+
+    # what a spawned worker gets of the group, its socket and stop pipe travel as arguments
+    def __getstate__(self):
+        return {'MAX_MTU': self.MAX_MTU, 'is_closing': False, 'port': self.port, 'bindaddress': self.bindaddress,
+                'callback': self.callback, 'worker_count': self.worker_count, 'use_process': self.use_process,
+                'stats': self.stats, 'sock_list': [], 'stop_pipe_list': [], 'worker_list': []}
+
+    def run_worker(self, worker_id, sock, stop_read, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        def on_stop():
+            loop.remove_reader(stop_read.fileno())
+            loop.stop()
+
+        try:
+            loop.add_reader(stop_read.fileno(), on_stop)
+            coro = loop.create_datagram_endpoint(lambda: AsyncUDPReceiver(self, worker_id, loop), sock=sock)
+            (transport, _) = loop.run_until_complete(coro)
+            ready.set()
+            loop.run_forever()
+            transport.close()
+            loop.run_until_complete(asyncio.sleep(0))
+        except Exception as e:
+            EventLog.instance().error(self, e)
+        finally:
+            ready.set()
+            stop_read.close()
+            loop.close()
+
+    def close(self):
+        if not self.is_closing:
+            self.handle_close()
+
+    def handle_close(self):
+        EventLog.instance().emit(EventType.CLOSE, self, 'asyncUdpGroup close called')
+        self.is_closing = True
+        for stop_write in self.stop_pipe_list:
+            try:
+                stop_write.send_bytes(b'\0')
+                stop_write.close()
+            except Exception as e:
+                EventLog.instance().error(self, e)
+        for worker in self.worker_list:
+            worker.join()
+        self.stop_pipe_list = []
+        self.worker_list = []
+        AsyncController.instance().discard(self)
+        try:
+            if self.callback is not None:
+                self.callback.on_stopped(self)
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+    def get_stats(self):
+        stats_list = []
+        for worker_id in range(self.worker_count):
+            offset = worker_id * STAT_SIZE
+            stats_list.append({'worker_id': worker_id,
+                               'received': self.stats[offset + STAT_RECEIVED],
+                               'received_bytes': self.stats[offset + STAT_RECEIVED_BYTES],
+                               'sent': self.stats[offset + STAT_SENT],
+                               'sent_bytes': self.stats[offset + STAT_SENT_BYTES]})
+        return stats_list
+
+    def get_total_stats(self):
+        total = {'received': 0, 'received_bytes': 0, 'sent': 0, 'sent_bytes': 0}
+        for stats in self.get_stats():
+            for key in total:
+                total[key] += stats[key]
+        return total
@@ -0,0 +1,72 @@
+#!/usr/bin/python
+"""
+@file async_unix_client.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Asynchronous Unix Socket Client Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Asynchronous Unix Socket Client Class.
+"""
+import socket
+
+from .async_tcp_client import *
+
+'''
+Interfaces
+variables
+- path
+- addr = path
+- callback
+functions
+- def send(data, channel=0, priority=Priority.NORMAL)
+- def send_many(data_list, channel=0, priority=Priority.NORMAL)
+- def send_file(path_or_fd, offset=0, count=None, progress_callback=None, channel=0, priority=Priority.NORMAL)
+- def send_fds(fds, data=b'', channel=0, priority=Priority.NORMAL)
+- def close() # close the socket
+infos
+- AsyncTcpClient over an AF_UNIX stream socket connected to path, the other options
+  are the ones of AsyncTcpClient
+'''
+
+
+class AsyncUnixClient(AsyncTcpClient):
+    pass_fds = True
+
+    def __init__(self, path, callback, **kwargs):
+        self.path = path
+        kwargs['no_delay'] = False
+        AsyncTcpClient.__init__(self, path, None, callback, **kwargs)
+
+    def get_address(self):
+        return self.path
+
+    def create_socket(self, no_delay):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
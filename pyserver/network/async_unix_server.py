@@ -0,0 +1,110 @@
+#!/usr/bin/python
+"""
+@file async_unix_server.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Asynchronous Unix Socket Server Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Asynchronous Unix Socket Server Class.
+"""
+import os
+import socket
+import stat
+
+from .async_tcp_server import *
+
+'''
+Interfaces
+variable
+- addr
+- callback
+function
+- def send(data, channel=0, priority=Priority.NORMAL)
+- def send_many(data_list, channel=0, priority=Priority.NORMAL)
+- def send_file(path_or_fd, offset=0, count=None, progress_callback=None, channel=0, priority=Priority.NORMAL)
+- def send_fds(fds, data=b'', channel=0, priority=Priority.NORMAL)
+- def close() # close the socket
+'''
+
+
+class AsyncUnixSocket(AsyncTcpSocket):
+    pass_fds = True
+
+
+'''
+Interfaces
+variables
+- path
+- callback
+- acceptor
+functions
+- def close() # close the socket and remove the path, unless it was handed off
+- def getSockList()
+- def shutdownAllClient()
+infos
+- AsyncTcpServer over an AF_UNIX stream socket bound to path, a stale socket file
+  at path is replaced, the other options are the ones of AsyncTcpServer
+- the accepted sockets can pass descriptors (send_fds/on_fds_received)
+'''
+
+
+class AsyncUnixServer(AsyncTcpServer):
+    def __init__(self, path, callback, acceptor, **kwargs):
+        self.path = path
+        kwargs['no_delay'] = False
+        AsyncTcpServer.__init__(self, path, callback, acceptor, **kwargs)
+
+    def create_socket(self, bind_addr):
+        try:
+            if stat.S_ISSOCK(os.stat(self.path).st_mode):
+                os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        sock.listen(5)
+        return sock
+
+    def create_protocol(self):
+        return AsyncUnixSocket(self)
+
+    def get_listener_key(self, bind_addr):
+        return self.path
+
+    def handle_close(self):
+        AsyncTcpServer.handle_close(self)
+        if self.is_handed_off:
+            # the path belongs to the replacement process now
+            return
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
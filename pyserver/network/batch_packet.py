@@ -0,0 +1,90 @@
+#!/usr/bin/python
+"""
+@file batch_packet.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief BatchPacket Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+BatchPacket Class.
+"""
+from struct import *
+
+batchCode = 0xF0B8F0B8
+SIZE_BATCH_HEADER = 6
+SIZE_BATCH_ENTRY = 2
+MAX_BATCH_ENTRY = 0xFFFF
+
+_batch_header = Struct('= I H')
+
+'''
+Packet layout
+- batch header: batchCode (I), message count (H)
+- length table: one (H) per message
+- payloads: messages concatenated in order
+'''
+
+
+class BatchPacket(object):
+    @staticmethod
+    def to_batch_packet(messages):
+        if len(messages) == 0 or len(messages) > MAX_BATCH_ENTRY:
+            return None
+        lengths = [len(message) for message in messages]
+        if max(lengths) > MAX_BATCH_ENTRY:
+            return None
+        byte_arr = _batch_header.pack(batchCode, len(messages))
+        byte_arr += pack('= %dH' % len(lengths), *lengths)
+        return byte_arr + b''.join(messages)
+
+    @staticmethod
+    def is_batch_packet(packet):
+        return len(packet) >= SIZE_BATCH_HEADER and _batch_header.unpack_from(packet)[0] == batchCode
+
+    @staticmethod
+    def to_messages(packet):
+        if not BatchPacket.is_batch_packet(packet):
+            return None
+        _, count = _batch_header.unpack_from(packet)
+        offset = SIZE_BATCH_HEADER + SIZE_BATCH_ENTRY * count
+        if len(packet) < offset:
+            return None
+        lengths = unpack_from('= %dH' % count, packet, SIZE_BATCH_HEADER)
+        if offset + sum(lengths) != len(packet):
+            return None
+        messages = []
+        for length in lengths:
+            messages.append(packet[offset:offset + length])
+            offset += length
+        return messages
+
+    @staticmethod
+    def get_packet_size(message_count, payload_size):
+        return SIZE_BATCH_HEADER + SIZE_BATCH_ENTRY * message_count + payload_size
@@ -35,6 +35,7 @@ THE SOFTWARE.
 
 Interfaces for Callback Class.
 """
+import os
 
 
 # UDP related callback object
@@ -49,9 +50,23 @@ class IUdpCallback(object):
     def on_received(self, server, addr, data):
         pass
 
+    # For batched datagrams (see MulticastBatcher), override to handle the whole batch at once
+    def on_received_batch(self, server, addr, data_list):
+        for data in data_list:
+            self.on_received(server, addr, data)
+
     def on_sent(self, server, status, data):
         pass
 
+    # For Multicast Only (group_demux=True), called with the destination group of the datagram
+    def on_group_received(self, server, multicast_addr, addr, data):
+        self.on_received(server, addr, data)
+
+    # For Multicast Only (group_demux=True and unbatch=True)
+    def on_group_received_batch(self, server, multicast_addr, addr, data_list):
+        for data in data_list:
+            self.on_group_received(server, multicast_addr, addr, data)
+
     # For Multicast Only
     def on_join(self, server, multicast_addr):
         pass
@@ -72,6 +87,32 @@ class ITcpSocketCallback(object):
     def on_received(self, sock, data):
         pass
 
+    # Called for every message with the channel it was sent on (always 0 unless protocol version 2)
+    def on_channel_received(self, sock, channel, data):
+        self.on_received(sock, data)
+
+    # Called for every batch frame (see send_many), override to handle the whole batch at once
+    def on_received_batch(self, sock, channel, data_list):
+        for data in data_list:
+            self.on_channel_received(sock, channel, data)
+
+    # Called with SpoolMode.STREAM for every piece of a message above spool_threshold, is_last
+    # marks the end of the message (with empty data)
+    def on_stream_received(self, sock, channel, data, offset, is_last):
+        pass
+
+    # Called instead of the is_last piece when a streamed message is cut off (the connection
+    # closed or the message hit a limit), offset is the number of bytes delivered
+    def on_stream_aborted(self, sock, channel, offset):
+        pass
+
+    # Called for a message sent with send_fds (unix sockets), the descriptors belong to the
+    # callback, the default closes them and handles data as any other message
+    def on_fds_received(self, sock, channel, data, fds):
+        for fd in fds:
+            os.close(fd)
+        self.on_channel_received(sock, channel, data)
+
     def on_sent(self, sock, status, data):
         pass
 
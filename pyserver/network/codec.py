@@ -0,0 +1,137 @@
+#!/usr/bin/python
+"""
+@file codec.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Codec Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Codec Class.
+"""
+from collections import namedtuple
+from struct import Struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# struct format -> numpy dtype (standard sizes, see byte_order)
+_numpy_type_map = {'b': 'i1', 'B': 'u1', 'h': 'i2', 'H': 'u2', 'i': 'i4', 'I': 'u4', 'l': 'i4', 'L': 'u4',
+                   'q': 'i8', 'Q': 'u8', 'e': 'f2', 'f': 'f4', 'd': 'f8', '?': '?', 's': 'S'}
+
+'''
+Interfaces
+functions
+- def encode(obj) # object -> bytes, called by send/send_many
+- def decode(data) # bytes (or mmap) -> object, handed to on_channel_received/on_received_batch
+'''
+
+
+class ICodec(object):
+    def encode(self, obj):
+        return obj
+
+    def decode(self, data):
+        return data
+
+
+'''
+Interfaces
+variables
+- record_struct # precompiled struct.Struct of one record
+- record_type # namedtuple of the field names
+functions
+- def encode(obj) # one record, or a sequence of records with is_array
+- def decode(data) # one record, or a list of records with is_array
+- def get_record_size()
+infos
+- fields is a list of (name, format) with one struct format per field ('I', 'd', '8s', ...),
+  byte_order is '<', '>' or '!' so sizes are standard and there is no padding
+- records are namedtuples, plain tuples with as_tuple (cheaper), and with use_numpy
+  (NumPy installed) an is_array message decodes to a structured array viewing the
+  payload without copying (read-only), numpy arrays of the same dtype encode directly
+'''
+
+
+class StructCodec(ICodec):
+    def __init__(self, fields, byte_order='<', is_array=False, as_tuple=False, use_numpy=False):
+        if byte_order not in ('<', '>', '!'):
+            raise Exception('byte_order must be one of <, > or !')
+        if use_numpy and numpy is None:
+            raise Exception('use_numpy requires numpy')
+        self.fields = list(fields)
+        self.is_array = is_array
+        self.as_tuple = as_tuple
+        self.record_struct = Struct(byte_order + ''.join([field_format for _, field_format in self.fields]))
+        self.record_type = namedtuple('Record', [name for name, _ in self.fields])
+        self.dtype = None
+        if use_numpy:
+            numpy_order = '>' if byte_order == '!' else byte_order
+            dtype_list = []
+            for name, field_format in self.fields:
+                numpy_type = _numpy_type_map.get(field_format[-1])
+                if numpy_type is None:
+                    raise Exception('format %s has no numpy type' % field_format)
+                if field_format[-1] == 's':
+                    dtype_list.append((name, numpy_type + (field_format[:-1] or '1')))
+                else:
+                    if len(field_format) > 1:
+                        raise Exception('repeated format %s has no numpy type' % field_format)
+                    dtype_list.append((name, numpy_order + numpy_type))
+            self.dtype = numpy.dtype(dtype_list)
+
+    def get_record_size(self):
+        return self.record_struct.size
+
+    def encode(self, obj):
+        if not self.is_array:
+            return self.record_struct.pack(*obj)
+        if self.dtype is not None and isinstance(obj, numpy.ndarray):
+            return obj.astype(self.dtype, copy=False).tobytes()
+        record_size = self.record_struct.size
+        pack_into = self.record_struct.pack_into
+        data = bytearray(record_size * len(obj))
+        offset = 0
+        for record in obj:
+            pack_into(data, offset, *record)
+            offset += record_size
+        return data
+
+    def decode(self, data):
+        if not self.is_array:
+            if self.as_tuple:
+                return self.record_struct.unpack(data)
+            return self.record_type._make(self.record_struct.unpack(data))
+        if self.dtype is not None:
+            return numpy.frombuffer(data, dtype=self.dtype)
+        if self.as_tuple:
+            return list(self.record_struct.iter_unpack(data))
+        return list(map(self.record_type._make, self.record_struct.iter_unpack(data)))
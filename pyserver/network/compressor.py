@@ -0,0 +1,132 @@
+#!/usr/bin/python
+"""
+@file compressor.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief ZlibCompressor Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+ZlibCompressor Class.
+"""
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_COMPRESS_LEVEL = 6
+DEFAULT_COMPRESS_THRESHOLD = 256
+DEFAULT_OFFLOAD_THRESHOLD = 64 * 1024
+DEFAULT_DICTIONARY_SIZE = 32 * 1024
+MAX_DICTIONARY_SIZE = 32 * 1024  # deflate window
+DICTIONARY_GRAM_SIZE = 8
+
+'''
+Interfaces
+variables
+- level
+- zdict # preset dictionary, both peers must use the same one
+- threshold # messages shorter than this are sent raw
+- offload_threshold # messages at least this long are compressed on the worker thread pool
+functions
+- def compress(data)
+- def decompress(data, max_size=None) # raises once the output would exceed max_size bytes
+- def train_dictionary(samples, size) # static, builds a zdict from sample messages
+infos
+- every message is compressed on its own (no shared stream state) so frames
+  can be dropped, reordered across channels or relayed independently
+- zlib releases the GIL while compressing, so the offloaded work does not
+  block the event loop thread
+'''
+
+
+class ZlibCompressor(object):
+    executor = None
+
+    def __init__(self, level=DEFAULT_COMPRESS_LEVEL, zdict=None, threshold=DEFAULT_COMPRESS_THRESHOLD,
+                 offload_threshold=DEFAULT_OFFLOAD_THRESHOLD):
+        if zdict is not None and len(zdict) > MAX_DICTIONARY_SIZE:
+            zdict = zdict[-MAX_DICTIONARY_SIZE:]
+        self.level = level
+        self.zdict = zdict
+        self.threshold = threshold
+        self.offload_threshold = offload_threshold
+
+    @staticmethod
+    def get_executor():
+        if ZlibCompressor.executor is None:
+            ZlibCompressor.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='pyserver-compress')
+        return ZlibCompressor.executor
+
+    def compress(self, data):
+        if self.zdict is None:
+            return zlib.compress(data, self.level)
+        compress_obj = zlib.compressobj(self.level, zlib.DEFLATED, zlib.MAX_WBITS, 9, zlib.Z_DEFAULT_STRATEGY,
+                                        self.zdict)
+        return compress_obj.compress(data) + compress_obj.flush()
+
+    def decompress(self, data, max_size=None):
+        if self.zdict is None:
+            if max_size is None:
+                return zlib.decompress(data)
+            decompress_obj = zlib.decompressobj(zlib.MAX_WBITS)
+        else:
+            decompress_obj = zlib.decompressobj(zlib.MAX_WBITS, self.zdict)
+        if max_size is None:
+            return decompress_obj.decompress(data) + decompress_obj.flush()
+        # stop one byte past the limit instead of inflating whatever the peer sent
+        result = decompress_obj.decompress(data, max_size + 1)
+        if len(result) > max_size or len(decompress_obj.unconsumed_tail) > 0:
+            raise Exception('decompressed message exceeds max_message_size')
+        result += decompress_obj.flush()
+        if len(result) > max_size:
+            raise Exception('decompressed message exceeds max_message_size')
+        return result
+
+    # returns a concurrent.futures.Future of compress(data)
+    def compress_async(self, data):
+        return ZlibCompressor.get_executor().submit(self.compress, data)
+
+    @staticmethod
+    def train_dictionary(samples, size=DEFAULT_DICTIONARY_SIZE):
+        # keep the byte sequences shared by most samples, deflate finds a match faster
+        # the closer it is to the end of the dictionary, so the most common go last
+        size = min(size, MAX_DICTIONARY_SIZE)
+        gram_count = Counter()
+        for sample in samples:
+            grams = set()
+            for idx in range(0, len(sample) - DICTIONARY_GRAM_SIZE + 1):
+                grams.add(bytes(sample[idx:idx + DICTIONARY_GRAM_SIZE]))
+            gram_count.update(grams)
+        gram_list = []
+        for gram, count in gram_count.most_common(size // DICTIONARY_GRAM_SIZE):
+            if count < 2:
+                break
+            gram_list.append(gram)
+        gram_list.reverse()
+        return b''.join(gram_list)
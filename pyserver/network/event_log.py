@@ -0,0 +1,222 @@
+#!/usr/bin/python
+"""
+@file event_log.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Event Log Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Event Log Class.
+"""
+import atexit
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from pyserver.util.enum import Enum
+from pyserver.util.singleton import Singleton
+
+EventType = Enum(['CONNECT', 'CLOSE', 'ERROR', 'RESYNC', 'INFO'])
+
+DEFAULT_LOG_RATE = 100.0
+DEFAULT_LOG_BURST = 200
+DEFAULT_LOG_QUEUE = 10000
+
+'''
+Interfaces
+functions
+- def on_event(event_type, source, message, exc=None) # source is the module (or None),
+  exc the exception of an EventType.ERROR, called on the thread the event happened on
+'''
+
+
+class IEventHook(object):
+    def on_event(self, event_type, source, message, exc=None):
+        pass
+
+
+'''
+Interfaces
+variables
+- suppressed_count # events dropped by the rate limit or a full queue
+- written_count
+functions
+- def flush(timeout=None) # waits until the queued events are written, False on timeout
+- def close()
+infos
+- on_event only takes a token and appends to a queue, a writer thread formats the events
+  (tracebacks included) and writes them to stream (sys.stdout by default)
+- rate events per second are let through with bursts of up to burst events, the rest is
+  counted and reported as one line once the writer catches up
+'''
+
+
+class QueueLogger(IEventHook):
+    def __init__(self, stream=None, rate=DEFAULT_LOG_RATE, burst=DEFAULT_LOG_BURST, max_queue=DEFAULT_LOG_QUEUE):
+        if rate <= 0 or burst < 1:
+            raise ValueError('rate and burst must be positive')
+        self.stream = stream
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)
+        self.queue = deque()
+        self.tokens = float(burst)
+        self.last_time = time.monotonic()
+        self.suppressed_count = 0
+        self.reported_count = 0
+        self.written_count = 0
+        self.is_writing = False
+        self.is_closing = False
+        self.thread = None
+
+    def on_event(self, event_type, source, message, exc=None):
+        now = time.monotonic()
+        with self.lock:
+            self.tokens = min(self.burst, self.tokens + (now - self.last_time) * self.rate)
+            self.last_time = now
+            if self.tokens < 1.0 or len(self.queue) >= self.max_queue or self.is_closing:
+                self.suppressed_count += 1
+                return
+            self.tokens -= 1.0
+            self.queue.append((time.time(), event_type, source, message, exc))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='pyserver-event-log')
+                self.thread.daemon = True
+                self.thread.start()
+                atexit.register(self.flush, 1.0)
+            self.cond.notify()
+
+    @staticmethod
+    def format_event(event):
+        timestamp, event_type, source, message, exc = event
+        line = '%s.%03d %s %s %s' % (time.strftime('%H:%M:%S', time.localtime(timestamp)),
+                                     int(timestamp * 1000) % 1000, EventType[event_type],
+                                     '-' if source is None else type(source).__name__, message)
+        if exc is not None and exc.__traceback__ is not None:
+            line += '\n' + ''.join(traceback.format_exception(type(exc), exc, exc.__traceback__)).rstrip()
+        return line + '\n'
+
+    def run(self):
+        while True:
+            with self.lock:
+                while len(self.queue) == 0 and self.suppressed_count == self.reported_count and \
+                        not self.is_closing:
+                    self.is_writing = False
+                    self.cond.notify_all()
+                    self.cond.wait()
+                if len(self.queue) == 0 and self.is_closing:
+                    self.is_writing = False
+                    self.cond.notify_all()
+                    return
+                self.is_writing = True
+                event_list = list(self.queue)
+                self.queue.clear()
+                suppressed = self.suppressed_count - self.reported_count
+                self.reported_count = self.suppressed_count
+            text_list = [self.format_event(event) for event in event_list]
+            if suppressed > 0:
+                text_list.append('%d events suppressed by the rate limit\n' % suppressed)
+            try:
+                stream = self.stream if self.stream is not None else sys.stdout
+                stream.write(''.join(text_list))
+                stream.flush()
+            except Exception:
+                # nowhere left to report it
+                pass
+            self.written_count += len(event_list)
+
+    def flush(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while len(self.queue) > 0 or self.is_writing:
+                if self.thread is None:
+                    return True
+                remain = None if deadline is None else deadline - time.monotonic()
+                if remain is not None and remain <= 0:
+                    return False
+                self.cond.wait(remain)
+        return True
+
+    def close(self):
+        self.flush(1.0)
+        with self.lock:
+            self.is_closing = True
+            self.cond.notify_all()
+
+
+'''
+Interfaces
+variables
+- hook # IEventHook events go to, None drops them
+functions
+- def set_hook(hook) # IEventHook or None
+- def get_hook()
+- def emit(event_type, source, message, exc=None)
+- def error(source, exc, message=None) # EventType.ERROR, message defaults to str(exc)
+infos
+- the network modules report through the EventLog instead of printing, by default to a
+  QueueLogger so a burst of closes or errors neither floods stdout nor blocks the loop
+- set_hook(None) turns it off, emit then returns right away
+- see pyserver.bench.event_log_overhead for what it costs
+'''
+
+
+@Singleton
+class EventLog(object):
+    def __init__(self):
+        self.hook = QueueLogger()
+
+    def set_hook(self, hook):
+        if hook is not None and not isinstance(hook, IEventHook):
+            raise Exception('hook is not an instance of IEventHook class')
+        self.hook = hook
+
+    def get_hook(self):
+        return self.hook
+
+    def emit(self, event_type, source, message, exc=None):
+        hook = self.hook
+        if hook is None:
+            return
+        try:
+            hook.on_event(event_type, source, message, exc)
+        except Exception:
+            # a failing hook must not take the module down with it
+            pass
+
+    def error(self, source, exc, message=None):
+        hook = self.hook
+        if hook is None:
+            return
+        self.emit(EventType.ERROR, source, str(exc) if message is None else message, exc)
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+"""
+@file file_transfer.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief File Transfer Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+File Transfer Class.
+"""
+import os
+
+DEFAULT_SLICE_SIZE = 4 * 1024 * 1024
+MAX_FILE_FRAME_SIZE = 0xFFFFFFFF
+
+'''
+Interfaces
+variables
+- offset
+- count
+- sent
+- progress_callback # progress_callback(sock, sent, count) after every slice
+functions
+- def send_slice(loop, transport) # coroutine, sends up to slice_size bytes of the body
+- def get_slice_size() # bytes the next send_slice sends
+- def is_done()
+- def close()
+infos
+- path_or_fd is a path, an os file descriptor or a file object, paths are opened and
+  closed here, descriptors and file objects stay open (their position is moved)
+- the body goes out with loop.sendfile (os.sendfile on plain sockets, chunked reads
+  otherwise) so the file is never held in memory
+- under protocol version 2 every slice is a frame of its own (FLAG_FRAGMENT) so other
+  frames can go in between, under version 1 the file is one frame and count is limited
+  to MAX_FILE_FRAME_SIZE by the 32-bit length (checked by the connection)
+'''
+
+
+class FileTransfer(object):
+    def __init__(self, path_or_fd, offset=0, count=None, progress_callback=None, slice_size=DEFAULT_SLICE_SIZE):
+        if isinstance(path_or_fd, int):
+            self.file = os.fdopen(path_or_fd, 'rb', closefd=False)
+        elif hasattr(path_or_fd, 'fileno'):
+            self.file = path_or_fd
+        else:
+            self.file = open(path_or_fd, 'rb')
+        self.should_close = self.file is not path_or_fd
+        try:
+            size = os.fstat(self.file.fileno()).st_size
+            if offset < 0 or offset > size:
+                raise ValueError('offset out of range')
+            if count is None:
+                count = size - offset
+            if count < 0 or offset + count > size:
+                raise ValueError('count out of range')
+        except Exception:
+            self.close()
+            raise
+        self.offset = offset
+        self.count = count
+        self.sent = 0
+        self.progress_callback = progress_callback
+        self.slice_size = slice_size
+
+    def __len__(self):
+        return self.count
+
+    def is_done(self):
+        return self.sent >= self.count
+
+    def get_slice_size(self):
+        return min(self.slice_size, self.count - self.sent)
+
+    async def send_slice(self, loop, transport):
+        size = self.get_slice_size()
+        sent = await loop.sendfile(transport, self.file, self.offset + self.sent, size)
+        self.sent += sent
+        if sent < size:
+            raise Exception('file ended before count bytes were sent')
+
+    def close(self):
+        if self.should_close:
+            self.should_close = False
+            self.file.close()
@@ -0,0 +1,230 @@
+#!/usr/bin/python
+"""
+@file frame_decoder.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief FrameDecoder Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+FrameDecoder Class.
+"""
+from .preamble import *
+
+'''
+Interfaces
+variables
+- resync_count # times the stream had to be searched for the next preamble
+- error # what stopped the decoder (max_message_size, a failing spool), None while it reads
+functions
+- def feed(data) # returns the list of completed frames (flags, msg_type, channel, payload)
+- def reset()
+infos
+- a header announcing more than max_message_size bytes stops the decoder before its payload
+  is read, feed still returns the frames completed before it and sets error, later feeds
+  return nothing until reset
+- with a spool_factory, the payload of a frame of at least spool_threshold bytes is not
+  buffered but written piece by piece to spool_factory(flags, msg_type, channel, size)
+  as it arrives, the frame completes with the spool's finish() (skipped when None),
+  a spool_factory returning None leaves the frame buffered
+- the chunks of a fragmented message (FLAG_FRAGMENT and the last chunk of the same channel
+  and priority) are never spooled here, whoever joins them decides about spooling
+'''
+
+
+class FrameDecoder(object):
+    def __init__(self, max_message_size=None, spool_threshold=None, spool_factory=None):
+        self.buffer = bytearray()
+        # bytes the buffer must hold before the next frame can complete
+        self.need_size = SIZE_PACKET_LENGTH
+        self.resync_count = 0
+        self.error = None
+        self.max_message_size = max_message_size
+        self.spool_threshold = spool_threshold
+        self.spool_factory = spool_factory
+        # frame currently written to a spool
+        self.spool = None
+        self.spool_header = None
+        self.spool_remain = 0
+        # channel, priority of the fragmented messages whose last chunk is still to come
+        self.fragment_key_set = set([])
+
+    def reset(self):
+        self.buffer = bytearray()
+        self.need_size = SIZE_PACKET_LENGTH
+        self.fragment_key_set = set([])
+        self.error = None
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
+
+    def feed(self, data):
+        frames = []
+        if self.error is not None:
+            return frames
+        try:
+            while True:
+                if self.spool is not None:
+                    data = self.feed_spool(data, frames)
+                    if len(data) == 0:
+                        return frames
+                data = self.feed_buffer(data, frames)
+                if data is None:
+                    return frames
+        except Exception as e:
+            # the stream cannot be read past this point, the frames before it still count
+            self.error = e
+            return frames
+
+    def feed_spool(self, data, frames):
+        view = memoryview(data)
+        size = min(len(view), self.spool_remain)
+        if size > 0:
+            self.spool.write(view[:size])
+            self.spool_remain -= size
+        if self.spool_remain == 0:
+            spool = self.spool
+            self.spool = None
+            payload = spool.finish()
+            if payload is not None:
+                frames.append(self.spool_header + (payload,))
+        return view[size:]
+
+    # returns the data following a header that starts a spool, None once everything is buffered
+    def feed_buffer(self, data, frames):
+        buffer = self.buffer
+        buffer += data
+        size = len(buffer)
+        if size < self.need_size:
+            return None
+        offset = 0
+        rest = None
+        while size - offset >= SIZE_PACKET_LENGTH:
+            header = Preamble.to_header(buffer, offset)
+            if header is None:
+                # garbage in the stream, skip to the next preamble (or keep a possible partial one)
+                self.resync_count += 1
+                found = buffer.find(Preamble.get_preamble_code(), offset + 1)
+                if found < 0:
+                    offset = max(offset + 1, size - len(Preamble.get_preamble_code()) + 1)
+                    break
+                offset = found
+                continue
+            should_receive, flags, msg_type, channel = header
+            if self.max_message_size is not None and should_receive > self.max_message_size:
+                raise Exception('frame of %d bytes exceeds max_message_size' % should_receive)
+            key = None
+            if flags & FLAG_FRAGMENT or (self.fragment_key_set and
+                                         (channel, flags & FLAG_PRIORITY_MASK) in self.fragment_key_set):
+                key = (channel, flags & FLAG_PRIORITY_MASK)
+            elif self.spool_factory is not None and should_receive >= self.spool_threshold:
+                spool = self.spool_factory(flags, msg_type, channel, should_receive)
+                if spool is not None:
+                    self.spool = spool
+                    self.spool_header = (flags, msg_type, channel)
+                    self.spool_remain = should_receive
+                    rest = bytes(buffer[offset + SIZE_PACKET_LENGTH:])
+                    offset = size
+                    break
+            end = offset + SIZE_PACKET_LENGTH + should_receive
+            if end > size:
+                break
+            if key is not None:
+                # only once the chunk is complete, an incomplete one is looked at again
+                if flags & FLAG_FRAGMENT:
+                    self.fragment_key_set.add(key)
+                else:
+                    self.fragment_key_set.discard(key)
+            frames.append((flags, msg_type, channel, bytes(buffer[offset + SIZE_PACKET_LENGTH:end])))
+            offset = end
+        if offset > 0:
+            del buffer[:offset]
+        remain = len(buffer)
+        if remain >= SIZE_PACKET_LENGTH:
+            header = Preamble.to_header(buffer)
+            self.need_size = SIZE_PACKET_LENGTH if header is None else SIZE_PACKET_LENGTH + header[0]
+        else:
+            self.need_size = SIZE_PACKET_LENGTH
+        return rest
+
+
+'''
+Interfaces
+variables
+- frame_count # frames completed so far
+functions
+- def feed(data) # walks the headers of the stream, returns the number of frames completed
+infos
+- only headers are read (a partial one is kept between feeds), payloads are skipped
+  without being copied, for forwarding a framed stream as it is
+- raises on a preamble mismatch or a header above max_message_size, a forwarded
+  stream cannot be resynchronized
+'''
+
+
+class FrameScanner(object):
+    def __init__(self, max_message_size=None):
+        self.header = bytearray()
+        # payload bytes of the current frame still to come
+        self.remain = 0
+        self.frame_count = 0
+        self.max_message_size = max_message_size
+
+    def feed(self, data):
+        size = len(data)
+        offset = 0
+        count = 0
+        while offset < size:
+            if self.remain > 0:
+                step = min(self.remain, size - offset)
+                self.remain -= step
+                offset += step
+                if self.remain == 0:
+                    count += 1
+                continue
+            if len(self.header) == 0 and size - offset >= SIZE_PACKET_LENGTH:
+                header = Preamble.to_header(data, offset)
+                offset += SIZE_PACKET_LENGTH
+            else:
+                step = min(SIZE_PACKET_LENGTH - len(self.header), size - offset)
+                self.header += data[offset:offset + step]
+                offset += step
+                if len(self.header) < SIZE_PACKET_LENGTH:
+                    break
+                header = Preamble.to_header(self.header)
+                self.header = bytearray()
+            if header is None:
+                raise Exception('preamble mismatch in forwarded stream')
+            if self.max_message_size is not None and header[0] > self.max_message_size:
+                raise Exception('frame of %d bytes exceeds max_message_size' % header[0])
+            self.remain = header[0]
+            if self.remain == 0:
+                count += 1
+        self.frame_count += count
+        return count
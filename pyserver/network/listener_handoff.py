@@ -0,0 +1,190 @@
+#!/usr/bin/python
+"""
+@file listener_handoff.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief ListenerHandoff Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Listening Socket Handoff Class.
+"""
+import os
+import socket
+import stat
+import threading
+
+from pyserver.util.singleton import Singleton
+from .preamble import *
+from .unix_socket import *
+from .event_log import *
+
+HANDOFF_PATH_ENV = 'PYSERVER_HANDOFF_PATH'
+DEFAULT_HANDOFF_TIMEOUT = 10.0
+DEFAULT_DRAIN_DEADLINE = 30.0
+
+'''
+Interfaces
+functions
+- def handoff(path, start_replacement=None, timeout=DEFAULT_HANDOFF_TIMEOUT, drain_deadline=DEFAULT_DRAIN_DEADLINE)
+  # old process: passes every running server's listening socket to the process connecting
+  # to path, then drains the servers, start_replacement(path) starts that process
+- def wait_drained(timeout=None) # old process: True once the handed off servers stopped
+- def take_listener(key) # new process: the inherited listening socket of a server, or None
+infos
+- a process started with PYSERVER_HANDOFF_PATH in its environment connects to that path
+  on its first server creation and takes the listeners over (SCM_RIGHTS), servers created
+  with the same address/path then accept on the inherited socket instead of binding
+- the listening socket stays open throughout, connections arriving during the handoff
+  wait in its backlog instead of being refused
+'''
+
+
+@Singleton
+class ListenerHandoff(object):
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.server_set = set([])
+        self.handed_off_list = []
+        self.inherited_map = {}
+        path = os.environ.pop(HANDOFF_PATH_ENV, None)
+        if path is not None:
+            try:
+                self.inherited_map = self.receive(path)
+                EventLog.instance().emit(EventType.INFO, self,
+                                         'listenerHandoff inherited %s' % list(self.inherited_map.keys()))
+            except Exception as e:
+                EventLog.instance().error(self, e)
+
+    def add(self, server):
+        with self.lock:
+            self.server_set.add(server)
+
+    def discard(self, server):
+        with self.lock:
+            self.server_set.discard(server)
+
+    def take_listener(self, key):
+        with self.lock:
+            return self.inherited_map.pop(key, None)
+
+    @staticmethod
+    def receive(path, timeout=DEFAULT_HANDOFF_TIMEOUT):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        fds = []
+        try:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            buffer = b''
+            should_receive = None
+            while should_receive is None or len(buffer) < SIZE_PACKET_LENGTH + should_receive:
+                data, ancdata, flags, addr = sock.recvmsg(MAX_READ_SIZE, FD_ANCILLARY_SIZE)
+                for fd_list in FdMessage.to_fd_lists(ancdata):
+                    fds += fd_list
+                if not data:
+                    raise Exception('handoff connection closed early')
+                buffer += data
+                if should_receive is None and len(buffer) >= SIZE_PACKET_LENGTH:
+                    header = Preamble.to_header(buffer)
+                    if header is None:
+                        raise Exception('invalid handoff header')
+                    should_receive = header[0]
+            key_list = buffer[SIZE_PACKET_LENGTH:].decode('utf-8').split('\n')
+            if len(key_list) != len(fds):
+                raise Exception('handoff sent %d keys for %d descriptors' % (len(key_list), len(fds)))
+            listeners = {}
+            for key, fd in zip(key_list, fds):
+                listeners[key] = socket.socket(fileno=fd)
+            fds = []
+            sock.sendall(Preamble.to_preamble_packet(0))
+            return listeners
+        finally:
+            for fd in fds:
+                os.close(fd)
+            sock.close()
+
+    def handoff(self, path, start_replacement=None, timeout=DEFAULT_HANDOFF_TIMEOUT,
+                drain_deadline=DEFAULT_DRAIN_DEADLINE):
+        with self.lock:
+            server_list = [server for server in self.server_set if not server.is_closing and not server.is_draining]
+        if len(server_list) == 0:
+            raise Exception('no running server to hand off')
+        if len(server_list) > MAX_FDS:
+            raise Exception('at most %d listeners can be handed off' % MAX_FDS)
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn = None
+        try:
+            listener.bind(path)
+            listener.listen(1)
+            listener.settimeout(timeout)
+            if start_replacement is not None:
+                start_replacement(path)
+            conn, addr = listener.accept()
+            conn.settimeout(timeout)
+            payload = '\n'.join([server.listener_key for server in server_list]).encode('utf-8')
+            message = FdMessage([server.sock.fileno() for server in server_list], payload)
+            try:
+                if message.send(conn, Preamble.to_preamble_packet(len(payload))) != SIZE_PACKET_LENGTH + len(payload):
+                    raise Exception('handoff message was cut short')
+            finally:
+                message.close()
+            # the replacement owns the listeners once it acknowledges
+            ack = b''
+            while len(ack) < SIZE_PACKET_LENGTH:
+                data = conn.recv(SIZE_PACKET_LENGTH - len(ack))
+                if not data:
+                    raise Exception('replacement closed the handoff without taking the listeners')
+                ack += data
+        finally:
+            if conn is not None:
+                conn.close()
+            listener.close()
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        with self.lock:
+            self.handed_off_list += server_list
+        for server in server_list:
+            server.is_handed_off = True
+            server.drain(drain_deadline)
+        return server_list
+
+    def wait_drained(self, timeout=None):
+        with self.lock:
+            server_list = list(self.handed_off_list)
+        for server in server_list:
+            if not server.stopped_event.wait(timeout):
+                return False
+        return True
@@ -0,0 +1,267 @@
+#!/usr/bin/python
+"""
+@file loop_monitor.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief LoopMonitor Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Event Loop Monitor Class.
+"""
+import json
+import sys
+import threading
+import time
+import weakref
+from collections import deque
+
+from .async_controller import AsyncController
+from .metrics import Histogram, SECONDS_BUCKETS
+# noinspection PyDeprecation
+import traceback
+
+DEFAULT_LAG_INTERVAL = 0.1
+DEFAULT_SLOW_CALLBACK_THRESHOLD = 0.05
+DEFAULT_STALL_THRESHOLD = 0.1
+DEFAULT_SAMPLE_INTERVAL = 0.01
+DEFAULT_MAX_RECORDS = 256
+MAX_STACK_DEPTH = 32
+# module attributes holding user callbacks
+CALLBACK_ATTRIBUTES = ('callback', 'callback_obj', 'acceptor')
+
+'''
+Interfaces
+functions
+- def get_stats() # lag and callback histograms, slow callbacks and stalls
+- def dump(path) # get_stats() as json
+- def reset()
+- def close()
+infos
+- lag: a timer every lag_interval seconds, the histogram holds how late it ran
+- every on_* method of the callbacks (callback/callback_obj/acceptor) of the modules added to
+  the AsyncController is timed, one histogram per callback class and method, a call taking
+  slow_callback_threshold or more is recorded with its module, an on_* method called from
+  within another timed one (e.g. a default forwarding to on_channel_received) counts towards
+  the outer call only
+- sample_stacks=True starts a watchdog thread, while the loop is stall_threshold behind it
+  samples the loop thread's stack every sample_interval, each stall keeps its stacks
+  (collapsed, outermost first) with their sample counts
+- only one monitor at a time, it registers itself with the AsyncController
+'''
+
+
+class LoopMonitor(object):
+    def __init__(self, lag_interval=DEFAULT_LAG_INTERVAL, slow_callback_threshold=DEFAULT_SLOW_CALLBACK_THRESHOLD,
+                 sample_stacks=False, stall_threshold=DEFAULT_STALL_THRESHOLD, sample_interval=DEFAULT_SAMPLE_INTERVAL,
+                 max_records=DEFAULT_MAX_RECORDS):
+        self.lag_interval = lag_interval
+        self.slow_callback_threshold = slow_callback_threshold
+        self.stall_threshold = stall_threshold
+        self.sample_interval = sample_interval
+        self.is_closing = False
+        self.lock = threading.RLock()
+        self.lag_histogram = Histogram(SECONDS_BUCKETS)
+        self.max_lag = 0.0
+        # callback class.method -> Histogram
+        self.callback_map = {}
+        self.slow_callback_list = deque(maxlen=max_records)
+        self.stall_list = deque(maxlen=max_records)
+        self.current_stall = None
+        self.wrapped_set = weakref.WeakSet()
+        # per thread, set while a timed callback runs
+        self.timing_state = threading.local()
+        self.loop = AsyncController.instance().loop
+        self.tick_handle = None
+        self.expected_time = None
+        self.last_tick_time = time.perf_counter()
+        self.loop_thread_id = None
+        self.loop.call_soon_threadsafe(self.schedule_tick)
+        AsyncController.instance().set_monitor(self)
+        self.watchdog = None
+        self.stop_event = threading.Event()
+        if sample_stacks:
+            self.watchdog = threading.Thread(target=self.run_watchdog, name='LoopMonitor')
+            self.watchdog.daemon = True
+            self.watchdog.start()
+
+    def schedule_tick(self):
+        if self.is_closing:
+            return
+        self.expected_time = self.loop.time() + self.lag_interval
+        self.tick_handle = self.loop.call_at(self.expected_time, self.on_tick)
+
+    def on_tick(self):
+        lag = max(0.0, self.loop.time() - self.expected_time)
+        self.lag_histogram.observe(lag)
+        if lag > self.max_lag:
+            self.max_lag = lag
+        self.last_tick_time = time.perf_counter()
+        self.loop_thread_id = threading.get_ident()
+        self.schedule_tick()
+
+    # called by AsyncController.add
+    def watch(self, module):
+        for name in CALLBACK_ATTRIBUTES:
+            callback = getattr(module, name, None)
+            if callback is not None:
+                self.wrap(callback)
+
+    def wrap(self, callback):
+        with self.lock:
+            try:
+                if callback in self.wrapped_set:
+                    return
+                self.wrapped_set.add(callback)
+            except TypeError:
+                # not weak referenceable
+                return
+            for name in dir(type(callback)):
+                if not name.startswith('on_'):
+                    continue
+                method = getattr(callback, name)
+                if not callable(method):
+                    continue
+                try:
+                    setattr(callback, name, self.make_timed(callback, name, method))
+                except AttributeError:
+                    pass
+
+    def unwrap(self, callback):
+        for name in list(vars(callback)):
+            if name.startswith('on_') and getattr(vars(callback)[name], 'monitor', None) is self:
+                delattr(callback, name)
+
+    def make_timed(self, callback, name, method):
+        callback_name = '%s.%s' % (type(callback).__name__, name)
+        with self.lock:
+            histogram = self.callback_map.get(callback_name)
+            if histogram is None:
+                histogram = Histogram(SECONDS_BUCKETS)
+                self.callback_map[callback_name] = histogram
+        monitor = self
+
+        def timed(*args, **kwargs):
+            state = monitor.timing_state
+            if getattr(state, 'is_timing', False):
+                return method(*args, **kwargs)
+            state.is_timing = True
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                state.is_timing = False
+                histogram.observe(elapsed)
+                if elapsed >= monitor.slow_callback_threshold:
+                    monitor.record_slow_callback(callback_name, args[0] if len(args) > 0 else None, elapsed)
+
+        timed.monitor = self
+        return timed
+
+    def record_slow_callback(self, callback_name, module, elapsed):
+        module_name = None
+        if module is not None:
+            module_name = type(module).__name__
+            addr = getattr(module, 'addr', None)
+            if addr is not None:
+                module_name = '%s %s' % (module_name, addr)
+        self.slow_callback_list.append({'time': time.time(), 'callback': callback_name, 'module': module_name,
+                                        'seconds': elapsed})
+
+    def run_watchdog(self):
+        while not self.stop_event.wait(self.sample_interval):
+            behind = time.perf_counter() - self.last_tick_time - self.lag_interval
+            if behind < self.stall_threshold:
+                if self.current_stall is not None:
+                    self.current_stall['seconds'] = time.time() - self.current_stall['time']
+                    self.stall_list.append(self.current_stall)
+                    self.current_stall = None
+                continue
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            stack = ';'.join(['%s:%d %s' % (entry.filename, entry.lineno, entry.name)
+                              for entry in traceback.extract_stack(frame, MAX_STACK_DEPTH)])
+            if self.current_stall is None:
+                self.current_stall = {'time': time.time() - behind, 'seconds': behind, 'samples': 0, 'stacks': {}}
+            stall = self.current_stall
+            stall['samples'] += 1
+            stall['stacks'][stack] = stall['stacks'].get(stack, 0) + 1
+
+    @staticmethod
+    def to_summary(histogram):
+        summary = histogram.to_dict()
+        summary['p50'] = histogram.get_quantile(0.5)
+        summary['p99'] = histogram.get_quantile(0.99)
+        return summary
+
+    def get_stats(self):
+        with self.lock:
+            callback_list = list(self.callback_map.items())
+        stall_list = list(self.stall_list)
+        if self.current_stall is not None:
+            stall_list.append(self.current_stall)
+        lag = self.to_summary(self.lag_histogram)
+        lag['max'] = self.max_lag
+        return {'lag': lag,
+                'callbacks': dict([(name, self.to_summary(histogram)) for name, histogram in callback_list
+                                   if histogram.count > 0]),
+                'slow_callbacks': list(self.slow_callback_list),
+                'stalls': stall_list}
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.get_stats(), f, indent=2, default=str)
+
+    def reset(self):
+        self.lag_histogram = Histogram(SECONDS_BUCKETS)
+        self.max_lag = 0.0
+        with self.lock:
+            for histogram in self.callback_map.values():
+                histogram.counts = [0] * len(histogram.counts)
+                histogram.sum = 0
+                histogram.count = 0
+        self.slow_callback_list.clear()
+        self.stall_list.clear()
+
+    def close(self):
+        if self.is_closing:
+            return
+        self.is_closing = True
+        self.stop_event.set()
+        AsyncController.instance().set_monitor(None)
+        if self.tick_handle is not None:
+            self.loop.call_soon_threadsafe(self.tick_handle.cancel)
+        with self.lock:
+            for callback in list(self.wrapped_set):
+                self.unwrap(callback)
+            self.wrapped_set = weakref.WeakSet()
+        # per thread, set while a timed callback runs
+        self.timing_state = threading.local()
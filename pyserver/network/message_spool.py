@@ -0,0 +1,135 @@
+#!/usr/bin/python
+"""
+@file message_spool.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Message Spool Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Message Spool Class.
+"""
+import mmap
+import tempfile
+
+'''
+Interfaces
+functions
+- def write(data) # append the next piece of the message
+- def finish() # the message to dispatch, or None when it was already handed over
+- def close() # drop an unfinished message
+infos
+- MessageSpool appends to an unlinked temporary file (spool_dir) and finishes with a
+  read-only mmap of it, the mapping lives as long as the callback keeps a reference
+- MessageStream hands every piece to callback.on_stream_received as it arrives, closing
+  it before finish() calls callback.on_stream_aborted
+- PrefixSpool keeps the first prefix_size bytes of a message out of the spool it wraps and
+  hands them to on_prefix when the spooled message is finished (the trace header of a
+  FLAG_TRACED frame), a message finished as bytes comes back whole instead
+'''
+
+
+class MessageSpool(object):
+    def __init__(self, spool_dir=None):
+        self.file = tempfile.TemporaryFile(dir=spool_dir)
+        self.size = 0
+
+    def write(self, data):
+        self.file.write(data)
+        self.size += len(data)
+
+    def finish(self):
+        if self.size == 0:
+            self.close()
+            return b''
+        self.file.flush()
+        payload = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.close()
+        return payload
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class MessageStream(object):
+    def __init__(self, sock, callback, channel):
+        self.sock = sock
+        self.callback = callback
+        self.channel = channel
+        self.size = 0
+
+    def write(self, data):
+        if self.callback is not None:
+            self.callback.on_stream_received(self.sock, self.channel, bytes(data), self.size, False)
+        self.size += len(data)
+
+    def finish(self):
+        callback = self.callback
+        self.callback = None
+        if callback is not None:
+            callback.on_stream_received(self.sock, self.channel, b'', self.size, True)
+        return None
+
+    # the message ends before its last piece (connection closed or a limit hit)
+    def close(self):
+        callback = self.callback
+        self.callback = None
+        if callback is not None:
+            callback.on_stream_aborted(self.sock, self.channel, self.size)
+
+
+class PrefixSpool(object):
+    def __init__(self, spool, prefix_size, on_prefix):
+        self.spool = spool
+        self.prefix = bytearray()
+        self.prefix_size = prefix_size
+        self.on_prefix = on_prefix
+
+    def write(self, data):
+        missing = self.prefix_size - len(self.prefix)
+        if missing > 0:
+            view = memoryview(data)
+            self.prefix += view[:missing]
+            data = view[missing:]
+            if len(data) == 0:
+                return
+        self.spool.write(data)
+
+    def finish(self):
+        payload = self.spool.finish()
+        if isinstance(payload, bytes):
+            return bytes(self.prefix) + payload
+        if payload is not None:
+            self.on_prefix(bytes(self.prefix))
+        return payload
+
+    def close(self):
+        self.spool.close()
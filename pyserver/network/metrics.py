@@ -0,0 +1,277 @@
+#!/usr/bin/python
+"""
+@file metrics.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief MetricsRegistry Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Metrics Registry Class.
+"""
+import threading
+from bisect import bisect_left
+
+from pyserver.util.singleton import Singleton
+from .async_controller import AsyncController
+
+SECONDS_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+COUNT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+BYTES_BUCKETS = (0, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+COUNTER_FIELDS = ('bytes_in', 'bytes_out', 'messages_in', 'messages_out', 'reads', 'resync', 'dropped')
+HISTOGRAM_FIELDS = (('frames_per_read', COUNT_BUCKETS), ('write_buffer_depth', BYTES_BUCKETS),
+                    ('callback_seconds', SECONDS_BUCKETS))
+
+'''
+Interfaces
+variables
+- bounds # upper bounds of the buckets, one more bucket takes the rest
+- counts
+- sum
+- count
+functions
+- def observe(value)
+- def merge(histogram)
+- def get_quantile(q) # upper bound of the bucket holding the q quantile
+- def to_dict()
+'''
+
+
+class Histogram(object):
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, histogram):
+        for index, count in enumerate(histogram.counts):
+            self.counts[index] += count
+        self.sum += histogram.sum
+        self.count += histogram.count
+
+    def get_quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        total = 0
+        for index, count in enumerate(self.counts):
+            total += count
+            if total >= rank and count > 0:
+                return self.bounds[index] if index < len(self.bounds) else float('inf')
+        return float('inf')
+
+    def to_dict(self):
+        return {'bounds': list(self.bounds), 'counts': list(self.counts), 'sum': self.sum, 'count': self.count}
+
+
+'''
+Interfaces
+variables
+- kind # 'tcp', 'unix', 'udp' or 'multicast'
+- name # peer or bound address
+- bytes_in/bytes_out/messages_in/messages_out/reads/resync/dropped
+- frames_per_read/write_buffer_depth/callback_seconds # Histogram, callback_seconds is timed per
+  read (all the frames of a tcp read, one datagram)
+functions
+- def set_source(function) # returns a dict of counters the module keeps itself
+- def collect() # counters and histograms as a dict
+infos
+- the module bumps the attributes directly on the loop thread, no lock
+'''
+
+
+class ModuleMetrics(object):
+    def __init__(self, kind, name=None):
+        self.kind = kind
+        self.name = name
+        self.source = None
+        for field in COUNTER_FIELDS:
+            setattr(self, field, 0)
+        for field, bounds in HISTOGRAM_FIELDS:
+            setattr(self, field, Histogram(bounds))
+
+    def set_source(self, function):
+        self.source = function
+
+    def collect(self):
+        values = {}
+        for field in COUNTER_FIELDS:
+            values[field] = getattr(self, field)
+        if self.source is not None:
+            values.update(self.source())
+        for field, bounds in HISTOGRAM_FIELDS:
+            histogram = Histogram(bounds)
+            histogram.merge(getattr(self, field))
+            values[field] = histogram
+        return values
+
+
+'''
+Interfaces
+functions
+- def create(kind, name=None) # ModuleMetrics of a new module, None while disabled
+- def release(metrics) # the module closed, its counters go into the totals of its kind
+- def set_enabled(flag) # applies to the modules created afterwards
+- def snapshot(detail=False) # {kind: counters, histograms and connection churn}, detail adds
+  the live modules one by one
+- def to_prometheus(prefix='pyserver') # text exposition format
+- def reset()
+infos
+- counters only grow, a closed module's counts stay in the totals of its kind
+- see pyserver.bench.metrics_overhead for what it costs
+'''
+
+
+@Singleton
+class MetricsRegistry(object):
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.is_enabled = True
+        self.metrics_set = set([])
+        # kind -> [opened, closed, totals of the closed modules]
+        self.kind_map = {}
+
+    def set_enabled(self, flag):
+        self.is_enabled = flag
+
+    def get_kind(self, kind):
+        entry = self.kind_map.get(kind)
+        if entry is None:
+            entry = [0, 0, None]
+            self.kind_map[kind] = entry
+        return entry
+
+    def reset(self):
+        with self.lock:
+            self.metrics_set = set([])
+            self.kind_map = {}
+
+    def create(self, kind, name=None):
+        if not self.is_enabled:
+            return None
+        metrics = ModuleMetrics(kind, name)
+        with self.lock:
+            self.metrics_set.add(metrics)
+            self.get_kind(kind)[0] += 1
+        return metrics
+
+    def release(self, metrics):
+        if metrics is None:
+            return
+        values = metrics.collect()
+        with self.lock:
+            if metrics not in self.metrics_set:
+                return
+            self.metrics_set.discard(metrics)
+            entry = self.get_kind(metrics.kind)
+            entry[1] += 1
+            entry[2] = self.add_values(entry[2], values)
+
+    @staticmethod
+    def add_values(total, values):
+        if total is None:
+            total = {}
+            for field in COUNTER_FIELDS:
+                total[field] = 0
+            for field, bounds in HISTOGRAM_FIELDS:
+                total[field] = Histogram(bounds)
+        if values is not None:
+            for field in COUNTER_FIELDS:
+                total[field] += values[field]
+            for field, bounds in HISTOGRAM_FIELDS:
+                total[field].merge(values[field])
+        return total
+
+    def snapshot(self, detail=False):
+        with self.lock:
+            metrics_list = list(self.metrics_set)
+            kind_list = [(kind, entry[0], entry[1], entry[2]) for kind, entry in self.kind_map.items()]
+        result = {}
+        for kind, opened, closed, closed_total in kind_list:
+            total = self.add_values(None, closed_total)
+            result[kind] = total
+            total['opened'] = opened
+            total['closed'] = closed
+            total['active'] = opened - closed
+        module_list = []
+        for metrics in metrics_list:
+            values = metrics.collect()
+            self.add_values(result[metrics.kind], values)
+            if detail:
+                values['kind'] = metrics.kind
+                values['name'] = metrics.name
+                module_list.append(values)
+        for kind in result:
+            for field, bounds in HISTOGRAM_FIELDS:
+                result[kind][field] = result[kind][field].to_dict()
+        if detail:
+            for values in module_list:
+                for field, bounds in HISTOGRAM_FIELDS:
+                    values[field] = values[field].to_dict()
+            result['modules'] = module_list
+        result['controller'] = {'modules': len(AsyncController.instance().module_set)}
+        return result
+
+    def to_prometheus(self, prefix='pyserver'):
+        snapshot = self.snapshot()
+        line_list = []
+        for kind in sorted(snapshot):
+            values = snapshot[kind]
+            if kind == 'controller':
+                for field in sorted(values):
+                    name = '%s_controller_%s' % (prefix, field)
+                    line_list.append('# TYPE %s gauge' % name)
+                    line_list.append('%s %s' % (name, values[field]))
+                continue
+            for field in ('opened', 'closed') + COUNTER_FIELDS:
+                name = '%s_%s_%s_total' % (prefix, kind, field)
+                line_list.append('# TYPE %s counter' % name)
+                line_list.append('%s %s' % (name, values[field]))
+            name = '%s_%s_active' % (prefix, kind)
+            line_list.append('# TYPE %s gauge' % name)
+            line_list.append('%s %s' % (name, values['active']))
+            for field, bounds in HISTOGRAM_FIELDS:
+                histogram = values[field]
+                name = '%s_%s_%s' % (prefix, kind, field)
+                line_list.append('# TYPE %s histogram' % name)
+                cumulative = 0
+                for index, count in enumerate(histogram['counts']):
+                    cumulative += count
+                    le = '+Inf' if index == len(bounds) else repr(bounds[index])
+                    line_list.append('%s_bucket{le="%s"} %d' % (name, le, cumulative))
+                line_list.append('%s_sum %s' % (name, histogram['sum']))
+                line_list.append('%s_count %d' % (name, histogram['count']))
+        return '\n'.join(line_list) + '\n'
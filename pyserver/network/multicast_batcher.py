@@ -0,0 +1,125 @@
+#!/usr/bin/python
+"""
+@file multicast_batcher.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief MulticastBatcher Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+MulticastBatcher Class.
+"""
+import threading
+
+from .batch_packet import *
+from .event_log import *
+
+SIZE_UDP_IP_HEADER = 28  # IPv4 header (20) + UDP header (8)
+
+'''
+Interfaces
+variables
+- multicast
+- addr = (hostname,port)
+- max_size
+- flush_interval
+functions
+- def send(data) # queue data into the pending batch
+- def flush() # send the pending batch now
+- def close() # flush and stop the timer
+'''
+
+
+class MulticastBatcher(object):
+    # multicast: AsyncMulticast (or AsyncUDP) used to send the packed datagrams
+    # max_size: datagram payload limit, defaults to the MTU minus IP/UDP headers
+    # flush_interval: seconds to hold a partial batch before sending it (0 flushes every loop iteration)
+    def __init__(self, multicast, hostname, port, max_size=None, flush_interval=0.0005):
+        self.multicast = multicast
+        self.hostname = hostname
+        self.port = port
+        self.addr = (hostname, port)
+        self.lock = threading.RLock()
+        self.max_size = max_size
+        if self.max_size is None:
+            self.max_size = multicast.MAX_MTU - SIZE_UDP_IP_HEADER
+        self.flush_interval = flush_interval
+        self.pending = []
+        self.pending_size = 0
+        self.timer_handle = None
+        self.timer_armed = False
+        self.is_closing = False
+        self.loop = multicast.loop
+
+    def send(self, data):
+        if self.is_closing:
+            raise Exception('batcher is closed')
+        with self.lock:
+            if BatchPacket.get_packet_size(1, len(data)) > self.max_size:
+                # too big for a batch header, keep the ordering and send it raw
+                self.flush()
+                self.multicast.send(self.hostname, self.port, data)
+                return
+            if BatchPacket.get_packet_size(len(self.pending) + 1, self.pending_size + len(data)) > self.max_size:
+                self.flush()
+            self.pending.append(data)
+            self.pending_size += len(data)
+            if not self.timer_armed:
+                self.timer_armed = True
+                self.loop.call_soon_threadsafe(self.arm_timer)
+
+    def arm_timer(self):
+        with self.lock:
+            if self.timer_armed and self.timer_handle is None:
+                self.timer_handle = self.loop.call_later(self.flush_interval, self.on_timer)
+
+    def on_timer(self):
+        with self.lock:
+            self.timer_handle = None
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            if self.timer_handle is not None:
+                self.timer_handle.cancel()
+                self.timer_handle = None
+            self.timer_armed = False
+            if len(self.pending) == 0:
+                return
+            messages = self.pending
+            self.pending = []
+            self.pending_size = 0
+        try:
+            self.multicast.send(self.hostname, self.port, BatchPacket.to_batch_packet(messages))
+        except Exception as e:
+            EventLog.instance().error(self, e)
+
+    def close(self):
+        self.is_closing = True
+        self.flush()
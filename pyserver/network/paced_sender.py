@@ -0,0 +1,234 @@
+#!/usr/bin/python
+"""
+@file paced_sender.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief PacedSender Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+PacedSender Class.
+"""
+import threading
+from collections import OrderedDict, deque
+
+from .server_conf import *
+from .event_log import *
+
+'''
+Interfaces
+variables
+- server # AsyncUDP or AsyncMulticast
+- rate # bytes per second for the whole socket
+- burst # bytes that may leave back to back
+functions
+- def send(hostname, port, data, priority) # queue a datagram
+- def set_destination_rate(hostname, port, rate, burst) # extra bucket for one destination
+- def remove_destination_rate(hostname, port)
+- def get_stats()
+- def close() # drop the queued datagrams
+infos
+- datagrams leave from the event loop when both the socket bucket and the
+  destination bucket (if any) hold enough tokens
+- priorities are strict (Priority.HIGH first), destinations of the same
+  priority are served round-robin
+- queue_size bounds the datagrams queued over all priorities, drop_policy picks
+  the victim when it is full: DROP_NEWEST drops the incoming datagram,
+  DROP_OLDEST drops the oldest datagram of the lowest priority queued that is
+  not above the incoming one
+'''
+
+
+class TokenBucket(object):
+    def __init__(self, rate, burst, now):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.last_time = now
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_time) * self.rate)
+        self.last_time = now
+
+    # a datagram larger than the burst only waits for a full bucket and leaves it negative
+    def get_wait_time(self, size):
+        need = min(size, self.burst)
+        if self.tokens >= need:
+            return 0.0
+        return (need - self.tokens) / self.rate
+
+    def consume(self, size):
+        self.tokens -= size
+
+
+class PacedSender(object):
+    def __init__(self, server, rate, burst, queue_size=1024, drop_policy=DropPolicy.DROP_OLDEST):
+        if rate <= 0 or burst <= 0:
+            raise Exception('rate and burst must be positive')
+        self.server = server
+        self.loop = server.loop
+        self.lock = threading.RLock()
+        self.rate = rate
+        self.burst = burst
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.bucket = TokenBucket(rate, burst, self.loop.time())
+        self.destination_bucket_map = {}
+        # per priority: destination -> deque of datagrams, in round-robin order
+        self.queue_list = [OrderedDict() for _ in Priority]
+        self.queued_count = 0
+        self.sent_count = 0
+        self.sent_bytes = 0
+        self.dropped_count = 0
+        self.is_pump_scheduled = False
+        self.timer_handle = None
+        self.is_closing = False
+
+    def set_destination_rate(self, hostname, port, rate, burst):
+        if rate <= 0 or burst <= 0:
+            raise Exception('rate and burst must be positive')
+        with self.lock:
+            self.destination_bucket_map[(hostname, port)] = TokenBucket(rate, burst, self.loop.time())
+
+    def remove_destination_rate(self, hostname, port):
+        with self.lock:
+            self.destination_bucket_map.pop((hostname, port), None)
+        self.schedule_pump()
+
+    def send(self, hostname, port, data, priority=Priority.NORMAL):
+        if self.is_closing:
+            raise Exception('paced sender is closed')
+        addr = (hostname, port)
+        with self.lock:
+            if self.queued_count >= self.queue_size and not self.drop_one(priority):
+                self.dropped_count += 1
+                return False
+            queue_map = self.queue_list[priority]
+            if addr not in queue_map:
+                queue_map[addr] = deque()
+            queue_map[addr].append(data)
+            self.queued_count += 1
+        self.schedule_pump()
+        return True
+
+    def drop_one(self, priority):
+        if self.drop_policy == DropPolicy.DROP_NEWEST:
+            return False
+        for victim_priority in range(len(self.queue_list) - 1, priority - 1, -1):
+            queue_map = self.queue_list[victim_priority]
+            if len(queue_map) == 0:
+                continue
+            # the oldest datagram of the class is at the head of one of its destination queues,
+            # take the destination that waited longest (front of the round-robin order)
+            addr = next(iter(queue_map))
+            queue_map[addr].popleft()
+            if len(queue_map[addr]) == 0:
+                del queue_map[addr]
+            self.queued_count -= 1
+            self.dropped_count += 1
+            return True
+        return False
+
+    def schedule_pump(self):
+        with self.lock:
+            if self.is_pump_scheduled:
+                return
+            self.is_pump_scheduled = True
+        self.loop.call_soon_threadsafe(self.pump)
+
+    def pump(self):
+        with self.lock:
+            self.is_pump_scheduled = False
+            if self.timer_handle is not None:
+                self.timer_handle.cancel()
+                self.timer_handle = None
+            if self.is_closing:
+                return
+            now = self.loop.time()
+            self.bucket.refill(now)
+            for bucket in self.destination_bucket_map.values():
+                bucket.refill(now)
+            wait_time = None
+            for queue_map in self.queue_list:
+                # strict priority, this class drains as far as the buckets allow before the next one
+                is_progress = True
+                while is_progress and len(queue_map) > 0:
+                    is_progress = False
+                    for addr in list(queue_map.keys()):
+                        queue = queue_map[addr]
+                        size = len(queue[0])
+                        destination_bucket = self.destination_bucket_map.get(addr)
+                        if destination_bucket is not None:
+                            destination_wait = destination_bucket.get_wait_time(size)
+                            if destination_wait > 0:
+                                # only this destination waits, the others may still go
+                                wait_time = destination_wait if wait_time is None else min(wait_time, destination_wait)
+                                continue
+                        socket_wait = self.bucket.get_wait_time(size)
+                        if socket_wait > 0:
+                            # the socket is out of tokens, nothing of this or a lower priority may go
+                            self.timer_handle = self.loop.call_later(socket_wait, self.pump)
+                            return
+                        data = queue.popleft()
+                        self.queued_count -= 1
+                        self.bucket.consume(size)
+                        if destination_bucket is not None:
+                            destination_bucket.consume(size)
+                        # round-robin, one datagram per destination per turn
+                        if len(queue) == 0:
+                            del queue_map[addr]
+                        else:
+                            queue_map.move_to_end(addr)
+                        is_progress = True
+                        try:
+                            self.server.transport.sendto(data, addr)
+                            self.sent_count += 1
+                            self.sent_bytes += size
+                        except Exception as e:
+                            EventLog.instance().error(self, e)
+            if wait_time is not None:
+                # everything left waits on a destination bucket
+                self.timer_handle = self.loop.call_later(wait_time, self.pump)
+
+    def get_stats(self):
+        with self.lock:
+            return {'queued': self.queued_count,
+                    'sent': self.sent_count,
+                    'sent_bytes': self.sent_bytes,
+                    'dropped': self.dropped_count}
+
+    def close(self):
+        with self.lock:
+            self.is_closing = True
+            if self.timer_handle is not None:
+                self.timer_handle.cancel()
+                self.timer_handle = None
+            self.dropped_count += self.queued_count
+            self.queue_list = [OrderedDict() for _ in Priority]
+            self.queued_count = 0
@@ -40,27 +40,64 @@ from struct import *
 SIZE_PACKET_LENGTH = 16
 preambleCode = 0x00F0F0F0F0F0F0F8
 
+PROTOCOL_VERSION_1 = 1  # reserved field is always zero
+PROTOCOL_VERSION_2 = 2  # reserved field carries flags, message type and channel
+
+FLAG_COMPRESSED = 0x01
+FLAG_BATCHED = 0x02
+FLAG_RPC = 0x04
+FLAG_FRAGMENT = 0x08  # more chunks of the same message follow on this channel and priority
+FLAG_PRIORITY_SHIFT = 4
+FLAG_PRIORITY_MASK = 0x30  # priority class of a data frame (Priority)
+FLAG_FDS = 0x40  # file descriptors (SCM_RIGHTS) ride on the frame's bytes, unix sockets only
+FLAG_TRACED = 0x80  # the payload starts with a trace header (see tracing)
+
+MAX_CHANNEL = 0xFFFF
+
+_preamble_code = pack('= Q', preambleCode)
+_preamble_v1 = Struct('= Q I I')
+_preamble_v2 = Struct('= Q I B B H')
+
+'''
+Header layout (16 bytes)
+- v1: preambleCode (Q), should_receive (I), reserved (I) = 0
+- v2: preambleCode (Q), should_receive (I), flags (B), message type (B), channel (H)
+a v1 header reads as a v2 header with no flags, MessageType.DATA and channel 0
+v2 data frames carry their priority class in flags bits 4-5, a message larger than the chunk
+size is split into frames flagged FLAG_FRAGMENT followed by one last frame without it, a frame
+flagged FLAG_TRACED carries a trace header (see tracing) in front of the message bytes
+'''
+
 
 class Preamble(object):
     @staticmethod
-    def to_preamble_packet(should_receive):
+    def to_preamble_packet(should_receive, flags=0, msg_type=0, channel=0):
         if should_receive < 0:
             return None
-        byte_arr = pack('= Q', preambleCode)
-        byte_arr += pack('= I', should_receive)
-        byte_arr += pack('= I', 0)
-        return byte_arr
+        return _preamble_v2.pack(preambleCode, should_receive, flags, msg_type, channel)
 
     @staticmethod
     def to_should_receive(preamble_packet):
-        preamble, should_receive, dummy = unpack('= Q I I', preamble_packet)
+        preamble, should_receive, dummy = _preamble_v1.unpack(preamble_packet)
         if preamble != preambleCode or should_receive < 0:
             return -1
         return should_receive
 
+    # returns (should_receive, flags, msg_type, channel) or None if the preamble does not match
+    @staticmethod
+    def to_header(preamble_packet, offset=0):
+        preamble, should_receive, flags, msg_type, channel = _preamble_v2.unpack_from(preamble_packet, offset)
+        if preamble != preambleCode:
+            return None
+        return should_receive, flags, msg_type, channel
+
+    @staticmethod
+    def get_preamble_code():
+        return _preamble_code
+
     @staticmethod
     def check_preamble(preamble_packet):
-        correct_preamble = pack('= Q', preambleCode)
+        correct_preamble = _preamble_code
         prev_trav = 0
         for prev_trav in range(len(preamble_packet)):
             contains = True
@@ -39,3 +39,10 @@ from pyserver.util.enum import *
 
 State = Enum(['SUCCESS', 'FAIL_SOCKET_ERROR'])
 PacketType = Enum(['SIZE', 'DATA'])
+# message type field of the v2 preamble
+MessageType = Enum(['DATA', 'HANDSHAKE', 'TRACE_ECHO'])
+# lower value is served first
+Priority = Enum(['HIGH', 'NORMAL', 'LOW'])
+DropPolicy = Enum(['DROP_OLDEST', 'DROP_NEWEST'])
+# how a message above spool_threshold is handed to the callback
+SpoolMode = Enum(['MMAP', 'STREAM'])
@@ -0,0 +1,252 @@
+#!/usr/bin/python
+"""
+@file shm_ring.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Shared Memory Ring Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Shared Memory Ring Class.
+"""
+import os
+from struct import Struct
+from multiprocessing import shared_memory
+
+DEFAULT_RING_SIZE = 4 * 1024 * 1024
+SIZE_RING_HEADER = 256
+# head, tail and flags on their own cache lines
+_head_offset = 0
+_tail_offset = 64
+_capacity_offset = 128
+_writer_waiting_offset = 192
+_position = Struct('= Q')
+_flag = Struct('= I')
+# payload length, channel, reserved
+_record = Struct('= I H H')
+SIZE_RECORD_HEADER = _record.size
+
+'''
+Interfaces
+variables
+- name # shared memory name to attach from the other process
+- capacity
+functions
+- def write(data, channel=0) # False when the ring has no room for it
+- def write_many(data_list, channel=0) # number of messages written
+- def read() # list of (channel, payload) written since the last read
+- def is_empty()
+- def set_writer_waiting(is_waiting) / def is_writer_waiting()
+- def close()
+- def unlink() # remove the name, mappings stay valid
+infos
+- single producer, single consumer: head is only written by the producer, tail only
+  by the consumer, both are positions that only grow (index = position & (capacity - 1))
+- records are a 8-byte header (length, channel) and the payload, wrapping around the end
+- the producer sets writer_waiting when the ring is full, the consumer that frees room
+  then wakes the producer up
+'''
+
+
+class ShmRing(object):
+    def __init__(self, name=None, size=DEFAULT_RING_SIZE, create=False):
+        if create:
+            if size <= 0 or size & (size - 1) != 0:
+                raise Exception('ring size must be a power of two')
+            self.shm = shared_memory.SharedMemory(create=True, size=SIZE_RING_HEADER + size)
+            self.shm.buf[:SIZE_RING_HEADER] = bytes(SIZE_RING_HEADER)
+            _position.pack_into(self.shm.buf, _capacity_offset, size)
+        else:
+            self.shm = ShmRing.attach(name)
+        self.is_owner = create
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        self.capacity = _position.unpack_from(self.buf, _capacity_offset)[0]
+        self.mask = self.capacity - 1
+        # own side of the positions, the other one is read from shared memory
+        self.head = _position.unpack_from(self.buf, _head_offset)[0]
+        self.tail = _position.unpack_from(self.buf, _tail_offset)[0]
+
+    @staticmethod
+    def attach(name):
+        try:
+            return shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            pass
+        # the creating process owns the segment, keep it out of this process's resource tracker
+        # (python < 3.13 registers attached segments too and would unlink them on exit)
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+    def copy_in(self, position, data):
+        index = position & self.mask
+        size = len(data)
+        first = min(size, self.capacity - index)
+        self.buf[SIZE_RING_HEADER + index:SIZE_RING_HEADER + index + first] = data[:first]
+        if first < size:
+            self.buf[SIZE_RING_HEADER:SIZE_RING_HEADER + size - first] = data[first:]
+
+    def copy_out(self, position, size):
+        index = position & self.mask
+        first = min(size, self.capacity - index)
+        data = bytes(self.buf[SIZE_RING_HEADER + index:SIZE_RING_HEADER + index + first])
+        if first < size:
+            data += bytes(self.buf[SIZE_RING_HEADER:SIZE_RING_HEADER + size - first])
+        return data
+
+    def write(self, data, channel=0):
+        size = SIZE_RECORD_HEADER + len(data)
+        tail = _position.unpack_from(self.buf, _tail_offset)[0]
+        if self.capacity - (self.head - tail) < size:
+            return False
+        self.copy_in(self.head, _record.pack(len(data), channel, 0))
+        self.copy_in(self.head + SIZE_RECORD_HEADER, memoryview(data).cast('B'))
+        self.head += size
+        # publish after the record is complete
+        _position.pack_into(self.buf, _head_offset, self.head)
+        return True
+
+    def write_many(self, data_list, channel=0):
+        tail = _position.unpack_from(self.buf, _tail_offset)[0]
+        free = self.capacity - (self.head - tail)
+        head = self.head
+        count = 0
+        for data in data_list:
+            size = SIZE_RECORD_HEADER + len(data)
+            if free < size:
+                break
+            self.copy_in(head, _record.pack(len(data), channel, 0))
+            self.copy_in(head + SIZE_RECORD_HEADER, memoryview(data).cast('B'))
+            head += size
+            free -= size
+            count += 1
+        if count > 0:
+            self.head = head
+            _position.pack_into(self.buf, _head_offset, head)
+        return count
+
+    def read(self):
+        head = _position.unpack_from(self.buf, _head_offset)[0]
+        tail = self.tail
+        message_list = []
+        while tail < head:
+            size, channel, _ = _record.unpack(self.copy_out(tail, SIZE_RECORD_HEADER))
+            message_list.append((channel, self.copy_out(tail + SIZE_RECORD_HEADER, size)))
+            tail += SIZE_RECORD_HEADER + size
+        if tail != self.tail:
+            self.tail = tail
+            _position.pack_into(self.buf, _tail_offset, tail)
+        return message_list
+
+    def is_empty(self):
+        return _position.unpack_from(self.buf, _head_offset)[0] == _position.unpack_from(self.buf, _tail_offset)[0]
+
+    # the producer's view: everything written before the last write was already consumed
+    def is_drained(self, position):
+        return _position.unpack_from(self.buf, _tail_offset)[0] >= position
+
+    def set_writer_waiting(self, is_waiting):
+        _flag.pack_into(self.buf, _writer_waiting_offset, 1 if is_waiting else 0)
+
+    def is_writer_waiting(self):
+        return _flag.unpack_from(self.buf, _writer_waiting_offset)[0] != 0
+
+    def close(self):
+        if self.shm is not None:
+            self.buf = None
+            try:
+                self.shm.close()
+            except BufferError:
+                # a memoryview of the mapping is still alive, the mapping goes with it
+                pass
+            self.shm = None
+
+    def unlink(self):
+        if self.is_owner:
+            self.is_owner = False
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+'''
+Interfaces
+variables
+- read_fd # registered with loop.add_reader by the waiting side
+- write_fd # signalled by the other side
+functions
+- def signal()
+- def drain()
+- def close()
+infos
+- an eventfd (read_fd == write_fd) where available, a pipe otherwise
+'''
+
+
+class ShmNotifier(object):
+    def __init__(self, read_fd=None, write_fd=None):
+        if read_fd is None and write_fd is None:
+            if hasattr(os, 'eventfd'):
+                read_fd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+                write_fd = read_fd
+            else:
+                read_fd, write_fd = os.pipe()
+                os.set_blocking(read_fd, False)
+                os.set_blocking(write_fd, False)
+        self.read_fd = read_fd
+        self.write_fd = write_fd
+
+    def signal(self):
+        try:
+            os.write(self.write_fd, b'\x01\x00\x00\x00\x00\x00\x00\x00')
+        except BlockingIOError:
+            # the counter (or pipe) is already full, the reader will wake up anyway
+            pass
+
+    def drain(self):
+        try:
+            os.read(self.read_fd, 4096)
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        for fd in set([self.read_fd, self.write_fd]):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.read_fd = None
+        self.write_fd = None
@@ -0,0 +1,168 @@
+#!/usr/bin/python
+"""
+@file socket_buffer.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief SocketBuffer Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+SocketBuffer Class.
+"""
+import socket
+from struct import *
+
+try:
+    import fcntl
+    import termios
+except ImportError:
+    # not posix, get_queue_depth only has SO_MEMINFO
+    fcntl = None
+    termios = None
+
+SO_RXQ_OVFL = getattr(socket, 'SO_RXQ_OVFL', 40)  # Linux values, not exported by every python build
+SO_MEMINFO = getattr(socket, 'SO_MEMINFO', 55)
+SO_RCVBUFFORCE = getattr(socket, 'SO_RCVBUFFORCE', 33)
+SO_SNDBUFFORCE = getattr(socket, 'SO_SNDBUFFORCE', 32)
+SK_MEMINFO_RMEM_ALLOC = 0
+SK_MEMINFO_VARS = 9
+
+DEFAULT_MAX_BUFFER_SIZE = 16 * 1024 * 1024
+
+_drop_counter = Struct('= I')
+
+'''
+Interfaces
+variables
+- sock
+- drop_count # datagrams the kernel dropped because the receive buffer was full
+functions
+- def set_recv_buffer_size(size)
+- def set_send_buffer_size(size)
+- def enable_drop_counter() # ask the kernel for SO_RXQ_OVFL ancillary data
+- def update(ancdata) # feed the ancillary data of every recvmsg
+- def get_queue_depth() # bytes waiting in the receive queue
+- def get_stats()
+infos
+- linux reports twice the requested size (bookkeeping overhead) and caps the
+  request at net.core.rmem_max/wmem_max unless the process has CAP_NET_ADMIN
+- the drop counter and the queue depth need linux (or at least posix), elsewhere
+  enable_drop_counter returns False and get_queue_depth None
+'''
+
+
+class SocketBuffer(object):
+    # auto_tune: double the receive buffer (up to max_buffer_size) whenever new drops are seen
+    def __init__(self, sock, recv_buffer_size=None, send_buffer_size=None, auto_tune=False,
+                 max_buffer_size=DEFAULT_MAX_BUFFER_SIZE):
+        self.sock = sock
+        self.auto_tune = auto_tune
+        self.max_buffer_size = max_buffer_size
+        self.drop_count = 0
+        self.last_drop_counter = None
+        self.grow_count = 0
+        self.has_drop_counter = False
+        if recv_buffer_size is not None:
+            self.set_recv_buffer_size(recv_buffer_size)
+        if send_buffer_size is not None:
+            self.set_send_buffer_size(send_buffer_size)
+
+    @staticmethod
+    def set_buffer_option(sock, force_option, option, size):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, force_option, size)
+        except OSError:
+            sock.setsockopt(socket.SOL_SOCKET, option, size)
+
+    def set_recv_buffer_size(self, size):
+        SocketBuffer.set_buffer_option(self.sock, SO_RCVBUFFORCE, socket.SO_RCVBUF, size)
+
+    def set_send_buffer_size(self, size):
+        SocketBuffer.set_buffer_option(self.sock, SO_SNDBUFFORCE, socket.SO_SNDBUF, size)
+
+    def get_recv_buffer_size(self):
+        return self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+    def get_send_buffer_size(self):
+        return self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+
+    def enable_drop_counter(self):
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+            self.has_drop_counter = True
+        except OSError:
+            self.has_drop_counter = False
+        return self.has_drop_counter
+
+    @staticmethod
+    def get_ancillary_size():
+        if not hasattr(socket, 'CMSG_SPACE'):
+            return 0
+        return socket.CMSG_SPACE(_drop_counter.size)
+
+    def update(self, ancdata):
+        for cmsg_level, cmsg_type, cmsg_data in ancdata:
+            if cmsg_level == socket.SOL_SOCKET and cmsg_type == SO_RXQ_OVFL:
+                # the kernel sends the running total of drops for the socket
+                counter = _drop_counter.unpack_from(cmsg_data)[0]
+                if self.last_drop_counter is None:
+                    self.last_drop_counter = 0
+                dropped = (counter - self.last_drop_counter) & 0xFFFFFFFF
+                self.last_drop_counter = counter
+                if dropped > 0:
+                    self.drop_count += dropped
+                    if self.auto_tune:
+                        self.grow()
+                return
+
+    def grow(self):
+        # getsockopt reports the doubled size, the request is half of it
+        size = self.get_recv_buffer_size()
+        if size >= self.max_buffer_size:
+            return
+        self.set_recv_buffer_size(min(size, self.max_buffer_size))
+        self.grow_count += 1
+
+    def get_queue_depth(self):
+        try:
+            meminfo = self.sock.getsockopt(socket.SOL_SOCKET, SO_MEMINFO, 4 * SK_MEMINFO_VARS)
+            return unpack_from('= I', meminfo, 4 * SK_MEMINFO_RMEM_ALLOC)[0]
+        except OSError:
+            if fcntl is None:
+                return None
+            # only the size of the next datagram
+            return unpack('= i', fcntl.ioctl(self.sock.fileno(), termios.FIONREAD, b'\0\0\0\0'))[0]
+
+    def get_stats(self):
+        return {'drops': self.drop_count,
+                'has_drop_counter': self.has_drop_counter,
+                'queue_depth': self.get_queue_depth(),
+                'recv_buffer_size': self.get_recv_buffer_size(),
+                'send_buffer_size': self.get_send_buffer_size(),
+                'grow_count': self.grow_count}
@@ -0,0 +1,210 @@
+#!/usr/bin/python
+"""
+@file tracing.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Tracer Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Latency Tracing Class.
+"""
+import itertools
+import random
+import time
+from struct import Struct
+
+from pyserver.util.enum import Enum
+from .metrics import Histogram, SECONDS_BUCKETS
+
+TraceClock = Enum(['MONOTONIC', 'WALL'])
+
+TRACE_FLAG_ECHO = 0x01  # the receiver sends a MessageType.TRACE_ECHO frame back
+TRACE_FLAG_WALL = 0x02  # timestamps are time.time(), otherwise time.monotonic()
+
+# trace id, enqueue time, write time, trace flags
+_trace_header = Struct('= Q d d I')
+SIZE_TRACE_HEADER = _trace_header.size
+# trace id, write time of the traced frame, receiver hold time, trace flags
+_trace_echo = Struct('= Q d d I')
+
+'''
+Header layout
+- a v2 data frame flagged FLAG_TRACED starts its payload with the trace header (28 bytes):
+  trace id (Q), enqueue time (d), write time (d), trace flags (I)
+  only the first frame of a chunked message carries it
+- a MessageType.TRACE_ECHO frame carries trace id (Q), write time (d), hold (d), trace flags (I),
+  hold being the receiver's time from reading the frame to after its callback
+'''
+
+
+def get_clock(trace_flags):
+    return time.time() if trace_flags & TRACE_FLAG_WALL else time.monotonic()
+
+
+'''
+Interfaces
+functions
+- def should_sample(channel, data) # True to trace the message
+'''
+
+
+class ITraceSampler(object):
+    def should_sample(self, channel, data):
+        return False
+
+
+class RateSampler(ITraceSampler):
+    def __init__(self, rate):
+        if rate < 0.0 or rate > 1.0:
+            raise ValueError('rate must be between 0 and 1')
+        self.rate = rate
+
+    def should_sample(self, channel, data):
+        return random.random() < self.rate
+
+
+class CountSampler(ITraceSampler):
+    def __init__(self, every):
+        if every < 1:
+            raise ValueError('every must be at least 1')
+        self.every = every
+        self.count = 0
+
+    def should_sample(self, channel, data):
+        self.count += 1
+        if self.count >= self.every:
+            self.count = 0
+            return True
+        return False
+
+
+'''
+Interfaces
+variables
+- queue_seconds # sender: enqueue to write
+- one_way_seconds # write to the receiver reading it, needs synchronized clocks across hosts
+- receive_seconds # receiver: read to the callback
+- round_trip_seconds # sender: write to the echo arriving
+- remote_seconds # hold time the echo reported
+- network_seconds # round trip minus the remote hold
+- traced_count/echo_count/skew_count # skew: one way times below zero, counted as zero
+functions
+- def to_dict()
+'''
+
+
+class TraceStats(object):
+    def __init__(self):
+        self.queue_seconds = Histogram(SECONDS_BUCKETS)
+        self.one_way_seconds = Histogram(SECONDS_BUCKETS)
+        self.receive_seconds = Histogram(SECONDS_BUCKETS)
+        self.round_trip_seconds = Histogram(SECONDS_BUCKETS)
+        self.remote_seconds = Histogram(SECONDS_BUCKETS)
+        self.network_seconds = Histogram(SECONDS_BUCKETS)
+        self.traced_count = 0
+        self.echo_count = 0
+        self.skew_count = 0
+
+    def add_trace(self, enqueue_time, write_time, read_time, dispatch_time):
+        self.traced_count += 1
+        self.queue_seconds.observe(write_time - enqueue_time)
+        one_way = read_time - write_time
+        if one_way < 0:
+            self.skew_count += 1
+            one_way = 0.0
+        self.one_way_seconds.observe(one_way)
+        self.receive_seconds.observe(dispatch_time - read_time)
+
+    def add_echo(self, round_trip, hold):
+        self.echo_count += 1
+        self.round_trip_seconds.observe(round_trip)
+        self.remote_seconds.observe(hold)
+        self.network_seconds.observe(max(0.0, round_trip - hold))
+
+    def to_dict(self):
+        result = {'traced_count': self.traced_count, 'echo_count': self.echo_count, 'skew_count': self.skew_count}
+        for name in ('queue_seconds', 'one_way_seconds', 'receive_seconds', 'round_trip_seconds',
+                     'remote_seconds', 'network_seconds'):
+            histogram = getattr(self, name)
+            summary = histogram.to_dict()
+            summary['p50'] = histogram.get_quantile(0.5)
+            summary['p99'] = histogram.get_quantile(0.99)
+            result[name] = summary
+        return result
+
+
+'''
+Interfaces
+variables
+- sampler # ITraceSampler, picks the messages send/send_many trace
+- clock # TraceClock, MONOTONIC compares within a host, WALL across synchronized hosts
+- echo # ask the receiver for a TRACE_ECHO to measure round trips
+- stats # TraceStats of every connection using the tracer, each connection also keeps its own
+functions
+- def sample(channel, data) # trace (id, enqueue time, trace flags) or None
+infos
+- pass as tracer= to the tcp server/client, protocol version 2 only, the receiving side
+  records traces whether it has a tracer or not
+'''
+
+
+class Tracer(object):
+    def __init__(self, sampler, clock=TraceClock.MONOTONIC, echo=False):
+        if sampler is None or not isinstance(sampler, ITraceSampler):
+            raise Exception('sampler is None or not an instance of ITraceSampler class')
+        self.sampler = sampler
+        self.clock = clock
+        self.echo = echo
+        self.trace_flags = (TRACE_FLAG_ECHO if echo else 0) | (TRACE_FLAG_WALL if clock == TraceClock.WALL else 0)
+        # process unique ids, random high half
+        self.trace_ids = itertools.count((random.getrandbits(31) << 32) + 1)
+        self.stats = TraceStats()
+
+    def sample(self, channel, data):
+        if not self.sampler.should_sample(channel, data):
+            return None
+        return next(self.trace_ids), get_clock(self.trace_flags), self.trace_flags
+
+    @staticmethod
+    def to_header(trace):
+        trace_id, enqueue_time, trace_flags = trace
+        return _trace_header.pack(trace_id, enqueue_time, get_clock(trace_flags), trace_flags)
+
+    @staticmethod
+    def from_header(payload):
+        return _trace_header.unpack_from(payload)
+
+    @staticmethod
+    def to_echo(trace_id, write_time, hold, trace_flags):
+        return _trace_echo.pack(trace_id, write_time, hold, trace_flags)
+
+    @staticmethod
+    def from_echo(payload):
+        return _trace_echo.unpack_from(payload)
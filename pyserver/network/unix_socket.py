@@ -0,0 +1,96 @@
+#!/usr/bin/python
+"""
+@file unix_socket.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief Unix Socket Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Unix Socket Class.
+"""
+import os
+import socket
+from array import array
+
+MAX_FDS = 253  # SCM_MAX_FD
+# no descriptor passing where the platform has no ancillary data
+FD_ANCILLARY_SIZE = socket.CMSG_SPACE(MAX_FDS * array('i').itemsize) if hasattr(socket, 'CMSG_SPACE') else 0
+MAX_READ_SIZE = 256 * 1024
+
+'''
+Interfaces
+variables
+- fds # duplicates of the descriptors given to send_fds, closed once sent or dropped
+- data
+functions
+- def send(sock, header) # sendmsg of header + data with the descriptors, returns the bytes sent
+- def close()
+- def to_fd_lists(ancdata) # static, one list of descriptors per SCM_RIGHTS message
+infos
+- the descriptors are duplicated when queued so the caller may close its own right away
+'''
+
+
+class FdMessage(object):
+    def __init__(self, fds, data=b''):
+        if len(fds) == 0 or len(fds) > MAX_FDS:
+            raise ValueError('between 1 and %d descriptors can be sent at once' % MAX_FDS)
+        self.fds = []
+        try:
+            for fd in fds:
+                self.fds.append(os.dup(fd))
+        except Exception:
+            self.close()
+            raise
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def send(self, sock, header):
+        return sock.sendmsg([header, self.data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array('i', self.fds))])
+
+    def close(self):
+        for fd in self.fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self.fds = []
+
+    @staticmethod
+    def to_fd_lists(ancdata):
+        fd_lists = []
+        for level, cmsg_type, cmsg_data in ancdata:
+            if level == socket.SOL_SOCKET and cmsg_type == socket.SCM_RIGHTS:
+                fds = array('i')
+                fds.frombytes(cmsg_data[:len(cmsg_data) - len(cmsg_data) % fds.itemsize])
+                fd_lists.append(list(fds))
+        return fd_lists
@@ -0,0 +1,147 @@
+#!/usr/bin/python
+"""
+@file write_scheduler.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief WriteScheduler Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+WriteScheduler Class.
+"""
+from collections import OrderedDict, deque
+
+from .server_conf import *
+
+DEFAULT_PRIORITY_WEIGHTS = (8, 4, 1)  # Priority.HIGH, Priority.NORMAL, Priority.LOW
+DEFAULT_QUANTUM = 1
+
+'''
+Interfaces
+functions
+- def push(channel, item, priority=Priority.NORMAL) # queue an outbound item for the channel
+- def push_front(channel, item, priority=Priority.NORMAL) # put an item back in front of the channel
+- def pop(is_ready=None) # next (ready) item
+- def clear() # drop everything, returns the dropped items
+infos
+- priority classes share the transport by deficit round-robin, each turn a class may
+  send weight * quantum of cost (cost(item), 1 per item by default) so a backlog of
+  bulk frames in Priority.LOW delays a Priority.HIGH frame by at most one LOW turn
+- within a class one busy channel cannot starve the others once the transport
+  pushes back, every channel with queued items gets one item per turn
+'''
+
+
+class WriteScheduler(object):
+    def __init__(self, weights=DEFAULT_PRIORITY_WEIGHTS, quantum=DEFAULT_QUANTUM, cost=None):
+        if len(weights) != len(Priority) or min(weights) <= 0:
+            raise Exception('weights must hold one positive weight per priority')
+        # per priority: channel -> deque of items, in round-robin order
+        self.queue_map_list = [OrderedDict() for _ in Priority]
+        self.quantum_list = [weight * quantum for weight in weights]
+        self.deficit_list = [0] * len(Priority)
+        self.cost = cost
+        self.current = 0
+        self.is_turn_started = False
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, channel, item, priority=Priority.NORMAL):
+        queue_map = self.queue_map_list[priority]
+        queue = queue_map.get(channel)
+        if queue is None:
+            queue = deque()
+            queue_map[channel] = queue
+        queue.append(item)
+        self.size += 1
+
+    def push_front(self, channel, item, priority=Priority.NORMAL):
+        queue_map = self.queue_map_list[priority]
+        queue = queue_map.get(channel)
+        if queue is None:
+            queue = deque()
+            queue_map[channel] = queue
+        queue.appendleft(item)
+        self.size += 1
+
+    def next_class(self):
+        self.current = (self.current + 1) % len(self.queue_map_list)
+        self.is_turn_started = False
+
+    # is_ready(item) lets a channel whose next item is not ready yet keep its turn and order
+    def pop(self, is_ready=None):
+        if self.size == 0:
+            return None
+        idle_count = 0
+        while idle_count < len(self.queue_map_list):
+            priority = self.current
+            queue_map = self.queue_map_list[priority]
+            for channel, queue in queue_map.items():
+                if is_ready is None or is_ready(queue[0]):
+                    break
+            else:
+                # nothing to send in this class, it does not bank credit while idle
+                self.deficit_list[priority] = 0
+                self.next_class()
+                idle_count += 1
+                continue
+            idle_count = 0
+            if not self.is_turn_started:
+                self.is_turn_started = True
+                self.deficit_list[priority] += self.quantum_list[priority]
+            cost = 1 if self.cost is None else self.cost(queue[0])
+            if self.deficit_list[priority] < cost:
+                self.next_class()
+                continue
+            self.deficit_list[priority] -= cost
+            item = queue.popleft()
+            if len(queue) == 0:
+                del queue_map[channel]
+                if len(queue_map) == 0:
+                    self.deficit_list[priority] = 0
+                    self.next_class()
+            else:
+                queue_map.move_to_end(channel)
+            self.size -= 1
+            return item
+        return None
+
+    def clear(self):
+        items = []
+        for queue_map in self.queue_map_list:
+            for queue in queue_map.values():
+                items.extend(queue)
+        self.queue_map_list = [OrderedDict() for _ in Priority]
+        self.deficit_list = [0] * len(Priority)
+        self.current = 0
+        self.is_turn_started = False
+        self.size = 0
+        return items
@@ -5,3 +5,4 @@ from .singleton import *
 from .subproc_controller import *
 from .timeout import *
 from .timer import *
+from .worker_pool import *
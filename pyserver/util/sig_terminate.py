@@ -33,33 +33,100 @@ THE SOFTWARE.
 
 @section DESCRIPTION
 
-call set_sigterm() to terminate the python with Ctrl+C
+call set_sigterm() to terminate the python with Ctrl+C, the connections get shutdown_deadline
+seconds to flush (see AsyncController.shutdown), a second Ctrl+C exits right away
+call set_sigterm(enable_reload=True) to also reload on SIGHUP, the listening sockets are
+handed off to a new instance of the process (reload_arg, the same command line by default)
+and this one exits once its connections drained or drain_deadline passed
 """
 import signal
+import sys
+import tempfile
+import threading
 
-from pyserver.network.async_controller import AsyncController
+from pyserver.network.async_controller import AsyncController, DEFAULT_SHUTDOWN_DEADLINE
+from pyserver.network.event_log import *
+from pyserver.network.listener_handoff import *
 
 from .subproc_controller import *
+from .worker_pool import NEW_PROCESS_GROUP
 
 
-def set_sigterm(signal_event=None):
+def set_sigterm(signal_event=None, enable_reload=False, reload_arg=None, drain_deadline=DEFAULT_DRAIN_DEADLINE,
+                shutdown_deadline=DEFAULT_SHUTDOWN_DEADLINE):
     # Setting console ctrl+c exit
     signal_triggered = [False]
+    reload_triggered = [False]
+
+    def stop_all():
+        result = AsyncController.instance().shutdown(shutdown_deadline)
+        EventLog.instance().emit(EventType.INFO, AsyncController.instance(),
+                                 '%d messages flushed, %d dropped, %d aborted' %
+                                 (result['flushed'], result['dropped'], result['aborted']))
+        AsyncController.instance().join()
+        SubProcController.instance().kill_all()
 
     # noinspection PyUnusedLocal
     def handler(signum, frame):
         print('Ctrl+C detected!')
-        AsyncController.instance().stop()
-        AsyncController.instance().join()
-        SubProcController.instance().kill_all()
+        if signal_triggered[0]:
+            # also while the first one is still flushing
+            print('You pressed Ctrl+C again! Exiting...')
+            # noinspection PyProtectedMember
+            os._exit(1)
+        signal_triggered[0] = True
+        stop_all()
 
-        if not signal_triggered[0] and signal_event is not None:
+        if signal_event is not None:
             print('You pressed Ctrl+C! Signaling event...')
             signal_event.set()
         else:
             print('You pressed Ctrl+C! Exiting...')
             # noinspection PyProtectedMember
             os._exit(1)
-        signal_triggered[0] = True
+
+    def start_replacement(path):
+        arg = reload_arg
+        if arg is None:
+            # orig_argv (3.10+) keeps the interpreter options, argv starts at the script
+            arg = [sys.executable] + (sys.orig_argv[1:] if hasattr(sys, 'orig_argv') else sys.argv)
+        env = dict(os.environ)
+        env[HANDOFF_PATH_ENV] = path
+        # not tracked by SubProcController, it outlives this process
+        subprocess.Popen(arg, env=env, **NEW_PROCESS_GROUP)
+
+    # off the main thread, the handoff waits for the replacement to connect
+    def reload_and_exit():
+        path = os.path.join(tempfile.gettempdir(), 'pyserver-handoff-%d.sock' % os.getpid())
+        try:
+            ListenerHandoff.instance().handoff(path, start_replacement, drain_deadline=drain_deadline)
+        except Exception as e:
+            # keep serving on the current listeners, a later SIGHUP tries again
+            print(e)
+            traceback.print_exc()
+            reload_triggered[0] = False
+            return
+        ListenerHandoff.instance().wait_drained()
+        stop_all()
+        if signal_event is not None:
+            print('Reload drained! Signaling event...')
+            signal_event.set()
+        else:
+            print('Reload drained! Exiting...')
+            # noinspection PyProtectedMember
+            os._exit(0)
+
+    # noinspection PyUnusedLocal
+    def reload_handler(signum, frame):
+        if reload_triggered[0]:
+            print('SIGHUP detected! Already reloading...')
+            return
+        print('SIGHUP detected! Reloading...')
+        reload_triggered[0] = True
+        thread = threading.Thread(target=reload_and_exit)
+        thread.daemon = True
+        thread.start()
 
     signal.signal(signal.SIGINT, handler)
+    if enable_reload:
+        signal.signal(signal.SIGHUP, reload_handler)
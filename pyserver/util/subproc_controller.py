@@ -38,6 +38,7 @@ SubProcController Class.
 import threading
 
 from .singleton import Singleton
+from .worker_pool import WorkerPool
 # noinspection PyDeprecation
 import traceback
 import copy
@@ -50,9 +51,18 @@ class SubProcController(object):
     def __init__(self):
         self.lock = threading.RLock()
         self.sub_proc_map = {}
+        self.worker_pool_map = {}
 
     def kill_all(self):
         with self.lock:
+            for key in self.worker_pool_map:
+                try:
+                    self.worker_pool_map[key].close(timeout=1.0)
+                    print(key, ' closing...')
+                except Exception as e:
+                    print(e)
+                    traceback.print_exc()
+            self.worker_pool_map = {}
             delete_set = copy.copy(self.sub_proc_map)
             for key in delete_set:
                 try:
@@ -79,12 +89,33 @@ class SubProcController(object):
                 traceback.print_exc()
         return proc
 
+    # handler is a module level function, run in worker_count pre-started python workers
+    def create_worker_pool(self, pool_name, handler, worker_count=None, max_rss=None, max_tasks=None):
+        with self.lock:
+            if pool_name in self.worker_pool_map or pool_name in self.sub_proc_map:
+                raise Exception('pool_name already exists!')
+            pool = WorkerPool(handler, worker_count, max_rss, max_tasks)
+            self.worker_pool_map[pool_name] = pool
+        return pool
+
+    def get_worker_pool(self, pool_name):
+        with self.lock:
+            return self.worker_pool_map.get(pool_name)
+
     def kill(self, proc_name):
         print('subProcController kill called')
         with self.lock:
             try:
-                if isinstance(proc_name, str):
-                    if proc_name in self.sub_proc_map:
+                if isinstance(proc_name, WorkerPool):
+                    for key in self.worker_pool_map:
+                        if self.worker_pool_map[key] == proc_name:
+                            del self.worker_pool_map[key]
+                            break
+                    proc_name.close()
+                elif isinstance(proc_name, str):
+                    if proc_name in self.worker_pool_map:
+                        self.worker_pool_map.pop(proc_name).close()
+                    elif proc_name in self.sub_proc_map:
                         self.sub_proc_map[proc_name].terminate()
                         del self.sub_proc_map[proc_name]
                 else:
@@ -0,0 +1,438 @@
+#!/usr/bin/python
+"""
+@file worker_pool.py
+@author Woong Gyu La a.k.a Chris. <juhgiyo@gmail.com>
+        <http://github.com/juhgiyo/pyserver>
+@date October 19, 2026
+@brief WorkerPool Interface
+@version 0.1
+
+@section LICENSE
+
+The MIT License (MIT)
+
+Copyright (c) 2016 Woong Gyu La <juhgiyo@gmail.com>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+@section DESCRIPTION
+
+Pre-started Worker Pool Class.
+"""
+import os
+import sys
+import socket
+import selectors
+import subprocess
+import threading
+import traceback
+import pickle
+import importlib
+import types
+import itertools
+from concurrent.futures import Future
+
+try:
+    import resource
+except ImportError:
+    # not posix, get_rss reports 0 and max_rss never recycles a worker
+    resource = None
+
+from pyserver.network.preamble import Preamble
+from pyserver.network.frame_decoder import FrameDecoder
+
+MAX_READ_SIZE = 256 * 1024
+_pickle_protocol = pickle.HIGHEST_PROTOCOL
+_stop_frame = Preamble.to_preamble_packet(0)
+_worker_command = 'import sys; from pyserver.util.worker_pool import worker_main; ' \
+                  'worker_main(int(sys.argv[1]), sys.argv[2])'
+# Popen keywords that put a child in its own process group (a Ctrl+C at the terminal only
+# reaches the parent) without preexec_fn, which is unsafe once threads run, process_group is 3.11+
+NEW_PROCESS_GROUP = {'process_group': 0} if sys.version_info >= (3, 11) else {'start_new_session': True}
+
+'''
+Interfaces
+variables
+- handler # importable function run by the workers, or 'module:function'
+- worker_count
+- max_rss # bytes, a worker above it is retired once its tasks are done
+- max_tasks # tasks a worker runs before it is retired
+functions
+- def submit(*args, **kwargs) # returns a concurrent.futures.Future, thread-safe
+- def get_stats()
+- def close(timeout=None)
+infos
+- workers are fresh python processes connected over a socketpair, tasks and results are
+  pickled into preamble frames
+- a task goes to the worker with the fewest tasks in flight
+- a worker that exits is replaced and the futures of its tasks in flight fail
+- from a network callback: pool.submit(data).add_done_callback(lambda f: sock.send(f.result()))
+  or await asyncio.wrap_future(pool.submit(data)) inside the loop
+'''
+
+
+def to_handler_path(handler):
+    if isinstance(handler, str):
+        return handler
+    module = handler.__module__
+    name = handler.__qualname__
+    if '<' in name:
+        raise Exception('handler must be a module level function!')
+    if module == '__main__':
+        main = sys.modules['__main__']
+        spec = getattr(main, '__spec__', None)
+        if spec is not None:
+            module = spec.name
+        else:
+            # plain script, the worker runs it without its __main__ block
+            module = os.path.abspath(main.__file__)
+    return module + ':' + name
+
+
+def load_handler(handler_path):
+    module, name = handler_path.rsplit(':', 1)
+    if os.path.isfile(module):
+        # run the parent's script as __main__ minus its main block, like multiprocessing spawn
+        obj = types.ModuleType('__pyserver_worker__')
+        obj.__file__ = module
+        sys.modules['__main__'] = sys.modules['__pyserver_worker__'] = obj
+        with open(module, 'rb') as f:
+            exec(compile(f.read(), module, 'exec'), obj.__dict__)
+    else:
+        obj = importlib.import_module(module)
+    for attr in name.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def get_rss():
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except Exception:
+        if resource is None:
+            return 0
+        # peak instead of current, in kilobytes on linux and bytes on mac
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class PoolWorker(object):
+    def __init__(self, pool, index):
+        self.index = index
+        parent_sock, child_sock = socket.socketpair()
+        try:
+            self.proc = subprocess.Popen([sys.executable, '-c', _worker_command,
+                                          str(child_sock.fileno()), pool.handler_path],
+                                         pass_fds=(child_sock.fileno(),), env=pool.env, **NEW_PROCESS_GROUP)
+        except Exception:
+            parent_sock.close()
+            raise
+        finally:
+            child_sock.close()
+        parent_sock.setblocking(False)
+        self.sock = parent_sock
+        self.decoder = FrameDecoder()
+        self.out_buffer = bytearray()
+        # task_id -> future
+        self.in_flight = {}
+        self.task_count = 0
+        self.rss = 0
+        self.is_retiring = False
+        self.is_stopping = False
+
+    def write(self, frame):
+        if not self.out_buffer:
+            try:
+                sent = self.sock.send(frame)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            if sent == len(frame):
+                return True
+            frame = memoryview(frame)[sent:]
+        self.out_buffer += frame
+        return False
+
+    def flush(self):
+        try:
+            sent = self.sock.send(self.out_buffer)
+        except (BlockingIOError, InterruptedError):
+            return
+        del self.out_buffer[:sent]
+
+
+class WorkerPool(object):
+    def __init__(self, handler, worker_count=None, max_rss=None, max_tasks=None):
+        if worker_count is None:
+            worker_count = os.cpu_count() or 1
+        if worker_count < 1:
+            raise Exception('worker_count must be at least 1!')
+        self.handler_path = to_handler_path(handler)
+        self.worker_count = worker_count
+        self.max_rss = max_rss
+        self.max_tasks = max_tasks
+        # workers import the handler with the parent's module search path
+        self.env = dict(os.environ)
+        self.env['PYTHONPATH'] = os.pathsep.join([os.path.abspath(path) if path else os.getcwd()
+                                                  for path in sys.path])
+        self.lock = threading.RLock()
+        self.task_ids = itertools.count()
+        self.worker_list = []
+        self.retired_list = []
+        self.restart_count = 0
+        self.crash_count = 0
+        self.is_closing = False
+        self.selector = selectors.DefaultSelector()
+        self.wake_r, self.wake_w = socket.socketpair()
+        self.wake_r.setblocking(False)
+        self.wake_w.setblocking(False)
+        self.selector.register(self.wake_r, selectors.EVENT_READ, None)
+        try:
+            for index in range(worker_count):
+                self.start_worker(index)
+        except Exception:
+            self.close()
+            raise
+        self.thread = threading.Thread(target=self.run, name='WorkerPool')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def start_worker(self, index):
+        worker = PoolWorker(self, index)
+        with self.lock:
+            if index < len(self.worker_list):
+                self.worker_list[index] = worker
+            else:
+                self.worker_list.append(worker)
+            # the selector is only touched by the pool thread once it runs
+            self.selector.register(worker.sock, selectors.EVENT_READ, worker)
+        return worker
+
+    def wake(self):
+        try:
+            self.wake_w.send(b'\0')
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def submit(self, *args, **kwargs):
+        future = Future()
+        task_id = next(self.task_ids)
+        payload = pickle.dumps((task_id, args, kwargs), _pickle_protocol)
+        frame = Preamble.to_preamble_packet(len(payload)) + payload
+        with self.lock:
+            if self.is_closing:
+                raise Exception('WorkerPool is closed!')
+            # least loaded, ties go to the lower index
+            worker = min(self.worker_list, key=lambda w: len(w.in_flight))
+            worker.in_flight[task_id] = future
+            worker.task_count += 1
+            if not worker.write(frame):
+                self.wake()
+        return future
+
+    def run(self):
+        while True:
+            with self.lock:
+                if self.is_closing and not self.retired_list and \
+                        all(not worker.in_flight for worker in self.worker_list):
+                    break
+                # retire workers first so the replacement registers before the next select
+                for worker in list(self.worker_list):
+                    self.check_retire(worker)
+                for worker in self.worker_list + self.retired_list:
+                    events = selectors.EVENT_READ
+                    if worker.out_buffer:
+                        events |= selectors.EVENT_WRITE
+                    try:
+                        self.selector.modify(worker.sock, events, worker)
+                    except (KeyError, ValueError):
+                        pass
+            for key, mask in self.selector.select(timeout=1.0):
+                worker = key.data
+                if worker is None:
+                    try:
+                        while self.wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, InterruptedError):
+                        pass
+                    continue
+                if mask & selectors.EVENT_WRITE:
+                    with self.lock:
+                        worker.flush()
+                if mask & selectors.EVENT_READ:
+                    self.read_worker(worker)
+        with self.lock:
+            for worker in self.worker_list + self.retired_list:
+                self.stop_worker(worker)
+            for worker in self.worker_list + self.retired_list:
+                self.close_worker(worker, 'WorkerPool closed')
+            self.worker_list = []
+            self.retired_list = []
+            self.selector.close()
+            self.wake_r.close()
+            self.wake_w.close()
+
+    def check_retire(self, worker):
+        if worker.is_retiring or self.is_closing:
+            return
+        if (self.max_rss is not None and worker.rss > self.max_rss) or \
+                (self.max_tasks is not None and worker.task_count >= self.max_tasks):
+            worker.is_retiring = True
+            self.retired_list.append(worker)
+            try:
+                self.start_worker(worker.index)
+                self.restart_count += 1
+            except Exception as e:
+                # keep the old worker serving rather than shrinking the pool
+                print(e)
+                traceback.print_exc()
+                worker.is_retiring = False
+                self.retired_list.remove(worker)
+                return
+        if worker.is_retiring and not worker.in_flight:
+            self.stop_worker(worker)
+
+    def stop_worker(self, worker):
+        if not worker.is_stopping:
+            worker.is_stopping = True
+            worker.write(_stop_frame)
+
+    def read_worker(self, worker):
+        try:
+            data = worker.sock.recv(MAX_READ_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self.handle_worker_exit(worker)
+            return
+        for flags, msg_type, channel, payload in worker.decoder.feed(data):
+            try:
+                task_id, ok, value, rss = pickle.loads(payload)
+            except Exception as e:
+                # e.g. an exception type the parent cannot import
+                print(e)
+                traceback.print_exc()
+                self.handle_worker_exit(worker)
+                return
+            with self.lock:
+                future = worker.in_flight.pop(task_id, None)
+                worker.rss = rss
+                if worker.is_retiring and not worker.in_flight:
+                    self.stop_worker(worker)
+            if future is None or future.cancelled():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def handle_worker_exit(self, worker):
+        with self.lock:
+            if worker in self.retired_list:
+                self.retired_list.remove(worker)
+                self.close_worker(worker, 'retired worker exited')
+                return
+            if worker.is_stopping:
+                # pool is closing, run() cleans up
+                self.selector.unregister(worker.sock)
+                return
+            self.crash_count += 1
+            self.close_worker(worker, 'worker %d exited' % worker.proc.pid)
+            if self.is_closing:
+                return
+            try:
+                self.start_worker(worker.index)
+                self.restart_count += 1
+            except Exception as e:
+                print(e)
+                traceback.print_exc()
+
+    def close_worker(self, worker, reason):
+        try:
+            self.selector.unregister(worker.sock)
+        except (KeyError, ValueError):
+            pass
+        worker.sock.close()
+        try:
+            worker.proc.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            worker.proc.kill()
+            worker.proc.wait()
+        in_flight = worker.in_flight
+        worker.in_flight = {}
+        for future in in_flight.values():
+            if not future.cancelled():
+                future.set_exception(Exception(reason + ' with the task in flight'))
+
+    def get_stats(self):
+        with self.lock:
+            return {'workers': [{'pid': worker.proc.pid, 'in_flight': len(worker.in_flight),
+                                 'task_count': worker.task_count, 'rss': worker.rss}
+                                for worker in self.worker_list],
+                    'retiring': len(self.retired_list),
+                    'restart_count': self.restart_count,
+                    'crash_count': self.crash_count}
+
+    # waits for the tasks in flight, new submits fail
+    def close(self, timeout=None):
+        with self.lock:
+            if self.is_closing:
+                return
+            self.is_closing = True
+        thread = getattr(self, 'thread', None)
+        if thread is None:
+            for worker in self.worker_list:
+                self.stop_worker(worker)
+                self.close_worker(worker, 'WorkerPool closed')
+            self.worker_list = []
+            self.selector.close()
+            self.wake_r.close()
+            self.wake_w.close()
+            return
+        self.wake()
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+
+
+def worker_main(fd, handler_path):
+    sock = socket.socket(fileno=fd)
+    handler = load_handler(handler_path)
+    decoder = FrameDecoder()
+    while True:
+        data = sock.recv(MAX_READ_SIZE)
+        if not data:
+            break
+        for flags, msg_type, channel, payload in decoder.feed(data):
+            if not payload:
+                sock.close()
+                return
+            task_id, args, kwargs = pickle.loads(payload)
+            try:
+                result = (task_id, True, handler(*args, **kwargs))
+            except Exception as e:
+                result = (task_id, False, e)
+            try:
+                payload = pickle.dumps(result + (get_rss(),), _pickle_protocol)
+            except Exception as e:
+                payload = pickle.dumps((task_id, False, Exception(repr(e)), get_rss()), _pickle_protocol)
+            sock.sendall(Preamble.to_preamble_packet(len(payload)) + payload)
+    sock.close()
+